@@ -1,288 +1,277 @@
 import streamlit as st
-from streamlit_option_menu import option_menu
+
+# 페이지 설정은 반드시 첫 번째 Streamlit 명령이어야 하므로 맨 위에서 한 번만 합니다.
+st.set_page_config(page_title="링쿡 - Lincook", page_icon="🔗", layout="wide")
+
 import auth
+import bulk_import
+import credentials
 import database as db
-import google.generativeai as genai
-import re
-import requests
-import yt_dlp
-import instaloader
+import fridge
+import jobs
+import link_preview
+import quantity
+import recipe_cache
+import structured
+import url_canon
+from chef import GEMINI_MODEL_NAME
 import json
 import time
-from bs4 import BeautifulSoup
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api.formatters import TextFormatter
 
-# ⭐ [추가] 앱이 켜질 때마다 DB 테이블이 있는지 확실하게 체크!
-db.init_db()
+# ⭐ DB 테이블 확인은 첫 쿼리 때 프로세스당 한 번만 자동으로 합니다. (database.get_pool)
+# 추출기(yt-dlp, instaloader, bs4, requests)와 Gemini SDK는 실제로 쓸 때 불러옵니다. 로그인 화면은 이것들이 필요 없어요.
 
 # ==========================================
 # 1. 기본 설정 및 API 연결
 # ==========================================
-st.set_page_config(
-    page_title="링쿡(Lincook) - 스마트 셰프",
-    page_icon="🍳",
-    layout="wide"
-)
-
-# 비밀번호 관리 (secrets.toml)
-model = None
-
-try:
-    # 2. secrets.toml에 있는 이름(GOOGLE_API_KEY)과 똑같이 맞춰줍니다.
-    if "GOOGLE_API_KEY" in st.secrets:
-        api_key = st.secrets["GOOGLE_API_KEY"]
-        genai.configure(api_key=api_key)
-        
-        # 3. 모델을 생성해서 'model' 변수에 담습니다.
-        model = genai.GenerativeModel('gemini-1.5-flash')
-    else:
-        st.error("secrets.toml에서 API 키를 찾을 수 없습니다.")
+@st.cache_resource(show_spinner=False)
+def load_model():
+    """(모델, 에러 메시지)를 돌려줍니다. 첫 호출 때만 Gemini SDK를 불러오고, 이후엔 프로세스 전체가 같은 모델을 씁니다."""
+    try:
+        # secrets.toml에 있는 이름(GOOGLE_API_KEY)과 똑같이 맞춰줍니다.
+        if "GOOGLE_API_KEY" not in st.secrets:
+            return None, "secrets.toml에서 API 키를 찾을 수 없습니다."
+        import google.generativeai as genai
+        genai.configure(api_key=st.secrets["GOOGLE_API_KEY"])
+        return genai.GenerativeModel(GEMINI_MODEL_NAME), None
+    except Exception as e:
+        return None, f"API 키 설정 중 오류가 발생했습니다: {e}"
 
-except Exception as e:
-    st.warning(f"API 키 설정 중 오류가 발생했습니다: {e}")
+def get_model():
+    # 작업 워커 스레드에서 불립니다. 에러 메시지는 작업 실패 사유로 화면에 표시돼요.
+    return load_model()[0]
 
 
 # ==========================================
 # 🛒 장보기 계산기 함수
 # ==========================================
-def generate_shopping_list(selected_recipes):
-    shopping_dict = {}
-    for recipe in selected_recipes:
-        ingredients = recipe.get('ingredients')
-        if isinstance(ingredients, str):
-            try: ingredients = json.loads(ingredients)
-            except: continue 
-        if ingredients:
-            for ing in ingredients:
-                if isinstance(ing, dict):
-                    name = ing.get('name', '').strip()
-                    amount = ing.get('amount', '').strip()
-                    if name in shopping_dict: shopping_dict[name].append(amount)
-                    else: shopping_dict[name] = [amount]
+def generate_shopping_list(recipe_ids, user_id):
+    """같은 재료는 단위를 맞춰 더해서 "간장: 75ml + 약간" 처럼 보여줍니다."""
     final_list = []
-    for name, amounts in shopping_dict.items():
-        combined_amount = " + ".join(amounts)
-        final_list.append(f"{name}: {combined_amount}")
+    for name, totals, leftovers in db.get_shopping_list(recipe_ids, user_id):
+        amounts = quantity.format_amounts(totals, leftovers)
+        final_list.append(f"{name}: {amounts}" if amounts else name)
     return final_list
 
+def ingredients_to_text(ingredients):
+    """수정 폼용: [{"name", "amount"}, ...] -> "돼지고기 300g, 대파 1/2대" """
+    return ", ".join(f"{i['name']} {i['amount']}".strip() for i in ingredients)
+
+def text_to_ingredients(text):
+    """수정 폼에서 받은 "돼지고기 300g, 대파" 를 저장 형식(JSON 리스트)으로 바꿉니다."""
+    items = [structured.split_ingredient(part) for part in text.split(',') if part.strip()]
+    return json.dumps(items, ensure_ascii=False)
+
 # ==========================================
 # 🖼️ 링크 미리보기 카드 함수 (수정됨!)
 # ==========================================
-def show_link_card(url):
+def show_link_card(url, preview=None):
     """
     URL을 입력받아 유튜브면 영상을, 그 외면 썸네일 카드를 보여줍니다.
+    카드 내용은 저장해둔 미리보기(preview: og_title/og_description/og_image)로만 그리고, 네트워크 요청은 하지 않습니다.
     """
     if not url: return
+    canon = url_canon.canonicalize(url)
 
     # 1. 유튜브 처리
-    if "youtube.com" in url or "youtu.be" in url:
-        st.video(url)
+    if canon and canon.platform == "youtube":
+        st.video(canon.canonical_url)
         return
 
-    # 2. 일반 링크 (블로그/인스타) 썸네일 카드 만들기
-    try:
-        # 인스타그램은 보안 이슈로 버튼 처리
-        if "instagram.com" in url:
-            st.link_button("📸 인스타그램 원본 보기", url, use_container_width=True)
-            return
+    # 2. 인스타그램은 보안 이슈로 버튼 처리
+    if canon and canon.platform == "instagram":
+        st.link_button("📸 인스타그램 원본 보기", canon.canonical_url, use_container_width=True)
+        return
 
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+    # 3. 미리보기가 아직 없으면(예전 데이터, 백그라운드 갱신 전) 깔끔한 버튼 보여주기
+    if not preview or not any(preview.values()):
+        st.link_button("👉 원본 링크 바로가기", url, use_container_width=True)
+        return
+
+    image_url = preview.get('og_image')
+    title = preview.get('og_title') or "원본 링크 확인하기"
+    desc = preview.get('og_description') or ""
+
+    # 카드 UI 렌더링
+    with st.container(border=True):
+        if image_url:
+            # [핵심 수정] 마크다운 대신 HTML <img> 태그 사용 (referrerpolicy="no-referrer" 추가)
+            # 이렇게 해야 네이버가 이미지를 차단하지 않습니다.
+            st.markdown(
+                f"""
+                <a href="{url}" target="_blank" style="text-decoration: none; color: inherit;">
+                    <img src="{image_url}" style="width: 100%; border-radius: 8px; margin-bottom: 10px;" referrerpolicy="no-referrer">
+                </a>
+                """, 
+                unsafe_allow_html=True
+            )
         
-        # 네이버 블로그 주소 처리 (PC/Mobile 구분)
-        target_url = url
-        if "blog.naver.com" in url:
-            if "m.blog.naver.com" not in url:
-                target_url = url.replace("blog.naver.com", "m.blog.naver.com")
+        # 제목 (클릭 가능)
+        st.markdown(f"**[{title}]({url})**")
         
-        response = requests.get(target_url, headers=headers, timeout=5)
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # 메타 태그 추출
-        og_image = soup.select_one('meta[property="og:image"]')
-        og_title = soup.select_one('meta[property="og:title"]')
-        og_desc = soup.select_one('meta[property="og:description"]')
+        # 설명
+        if desc:
+            st.caption(desc[:80] + "..." if len(desc) > 80 else desc)
+        else:
+            st.caption(url)
 
-        image_url = og_image['content'] if og_image else None
-        title = og_title['content'] if og_title else "원본 링크 확인하기"
-        desc = og_desc['content'] if og_desc else ""
 
-        # 카드 UI 렌더링
-        with st.container(border=True):
-            if image_url:
-                # [핵심 수정] 마크다운 대신 HTML <img> 태그 사용 (referrerpolicy="no-referrer" 추가)
-                # 이렇게 해야 네이버가 이미지를 차단하지 않습니다.
-                st.markdown(
-                    f"""
-                    <a href="{url}" target="_blank" style="text-decoration: none; color: inherit;">
-                        <img src="{image_url}" style="width: 100%; border-radius: 8px; margin-bottom: 10px;" referrerpolicy="no-referrer">
-                    </a>
-                    """, 
-                    unsafe_allow_html=True
-                )
-            
-            # 제목 (클릭 가능)
-            st.markdown(f"**[{title}]({url})**")
-            
-            # 설명
-            if desc:
-                st.caption(desc[:80] + "..." if len(desc) > 80 else desc)
-            else:
-                st.caption(url)
-
-    except Exception:
-        # 에러 나면 깔끔한 버튼 보여주기
-        st.link_button("👉 원본 링크 바로가기", url, use_container_width=True)
+# ==========================================
+# 📚 요리책 목록 도우미 (페이지 단위 + 본문 지연 로딩)
+# ==========================================
+# 목록은 recipe_cache가 세션에 둔 페이지를 쓰고, '더 보기'는 보여줄 페이지 수만 늘립니다. (새 페이지만 keyset으로 조회)
+def visible_recipes(page_key, library, list_key):
+    """(지금 보여줄 레시피들, 더 있는지)"""
+    pages = st.session_state.setdefault(f"pages_{page_key}", 1)
+    return library.page(list_key, pages * db.RECIPE_PAGE_SIZE)
+
+def show_more_button(page_key, has_more):
+    if has_more and st.button("더 보기 ⬇️", key=f"more_{page_key}", use_container_width=True):
+        st.session_state[f"pages_{page_key}"] += 1
+        st.rerun()
+
+def show_recipe_body(recipe_id, label, key):
+    """토글을 켰을 때만 본문을 DB에서 불러와 보여줍니다. (expander는 접혀 있어도 내부 코드가 실행됨)"""
+    if not st.toggle(label, key=key): return None
+    recipe = db.get_recipe(recipe_id, st.session_state['user_id'])
+    if recipe:
+        source_url = recipe.get('source_url') or recipe.get('link') or recipe.get('url')
+        show_link_card(source_url, link_preview.from_recipe(recipe))
+        st.markdown(recipe['content'])
+    return recipe
+
+def recipe_to_generated_data(recipe):
+    """DB에 저장된 레시피를 '레시피 링쿡!' 결과 카드 형식으로 바꿉니다."""
+    return {
+        "title": recipe.get('title'), "markdown_content": recipe.get('content'),
+        "cuisine_type": recipe.get('cuisine_type'), "dish_type": recipe.get('dish_type'),
+        "ingredients": db.get_recipe_ingredients([recipe['id']], recipe['user_id']).get(recipe['id'], []),
+    }
+
+def get_checked_recipe_ids(library):
+    ids = set()
+    for key, checked in st.session_state.items():
+        if checked and (key.startswith("chk_fav_") or key.startswith("chk_folder_")):
+            ids.add(int(key.rsplit("_", 1)[1]))
+    # 이미 지운 레시피의 체크 상태가 세션에 남아 있을 수 있어요.
+    return library.existing_ids(ids)
+
+
+def set_current_recipe(recipe):
+    """저장된 레시피를 '레시피 링쿡!' 결과 카드에 띄웁니다."""
+    st.session_state['generated_data'] = recipe_to_generated_data(recipe)
+    st.session_state['current_url'] = recipe['source_url']
+    st.session_state['current_source'] = recipe['source_type']
+    st.session_state['current_preview'] = link_preview.from_recipe(recipe)
+    st.session_state['current_saved_id'] = recipe['id']
 
 
 # ==========================================
-# 🕵️‍♂️ 크롤링 및 AI 함수들
+# 🧾 변환 작업 상태판
 # ==========================================
+JOB_POLL_SECONDS = 1   # AI가 스트리밍으로 쓰는 내용을 따라 그리려고 짧게 잡음 (진행 중인 작업이 있을 때만 확인)
+JOB_STATUS_LIMIT = 5
+JOB_STATUS_ICONS = {"queued": "⏳", "running": "👨‍🍳", "done": "✅", "failed": "😓"}
+
+def show_job_rows(job_list):
+    for job in job_list:
+        icon = JOB_STATUS_ICONS.get(job['status'], "•")
+        st.markdown(f"{icon} **{job['stage'] or job['status']}** · {job['url'][:60]}")
+        if job['status'] == "failed" and job['error']: st.caption(job['error'])
+        elif job['status'] == "queued" and job['attempts']: st.caption(f"{job['attempts']}번째 시도 실패, 곧 다시 시도해요: {job['error']}")
+        elif job['status'] == "done" and job['llm_total']:
+            st.caption(f"AI 첫 내용 {job['llm_first_content'] or 0:.1f}초 · 전체 {job['llm_total']:.1f}초")
+
+def show_partial_recipe(fields):
+    """AI가 아직 쓰는 중인 레시피를 도착한 필드까지만 그립니다. (제목 -> 재료 -> 본문 순으로 채워짐)"""
+    with st.container(border=True):
+        st.subheader(f"✍️ {fields.get('title') or '제목을 쓰는 중...'}")
+        if fields.get('cuisine_type') or fields.get('dish_type'):
+            st.markdown(f"**{fields.get('cuisine_type', '')}** | **{fields.get('dish_type', '')}**")
+        ingredients = [i for i in fields.get('ingredients') or [] if isinstance(i, dict)]
+        if ingredients:
+            st.info("🥕 핵심 재료: " + ", ".join(f"{i.get('name', '')}({i.get('amount', '')})" for i in ingredients))
+        if fields.get('markdown_content'): st.markdown(fields['markdown_content'] + " ▌")
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def poll_jobs(user_id):
+    """진행 중인 작업이 있을 때만 그리는 상태판. 이 부분만 몇 초마다 다시 실행되고, 나머지 화면은 그대로입니다."""
+    job_list = db.list_user_jobs(user_id, JOB_STATUS_LIMIT)
+    show_job_rows(job_list)
+    pending = next((job for job in job_list if job['id'] == st.session_state.get('pending_job_id')), None)
+    if pending and pending['status'] == "running" and pending['partial']:
+        show_partial_recipe(json.loads(pending['partial']))
+    if not any(job['status'] in jobs.ACTIVE_STATUSES for job in job_list):
+        st.rerun()   # 다 끝나면 전체 화면을 다시 그려서 결과를 보여주고 확인을 멈춥니다.
+
+def check_pending_job(user_id):
+    """방금 넣은 작업이 끝났으면 결과 카드에 띄웁니다."""
+    job_id = st.session_state.get('pending_job_id')
+    if not job_id: return
+    job = db.get_job(job_id, user_id)
+    if job and job['status'] in jobs.ACTIVE_STATUSES: return
+    del st.session_state['pending_job_id']
+    if not job: return
+    recipe = db.get_recipe(job['recipe_id'], user_id) if job['status'] == "done" else None
+    if recipe:
+        set_current_recipe(recipe)
+        st.toast("요리책에 저장되었습니다! 📚")
+    else: st.error(job['error'] or "레시피를 만들지 못했어요.")
 
-def get_instagram_content(url):
-    shortcode_match = re.search(r'/(?:p|reel|tv)/([A-Za-z0-9_-]+)', url)
-    if not shortcode_match: return None, "올바른 인스타그램 주소가 아닙니다."
-    shortcode = shortcode_match.group(1)
-    try:
-        L = instaloader.Instaloader()
-        post = instaloader.Post.from_shortcode(L.context, shortcode)
-        return f"작성자: {post.owner_username}\n\n내용:\n{post.caption}", "인스타그램"
-    except Exception as e:
-        return None, f"인스타그램 접속 실패: {e}"
-
-def extract_video_id(url):
-    if "youtube.com" not in url and "youtu.be" not in url: return None
-    patterns = [r'(?:v=|\/)([0-9A-Za-z_-]{11}).*', r'(?:youtu\.be\/)([0-9A-Za-z_-]{11})']
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match: return match.group(1)
-    return None
-
-def get_youtube_data(url):
-    video_id = extract_video_id(url)
-    if not video_id: return None, "유튜브 ID 추출 실패"
-    try:
-        transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['ko', 'en'])
-        formatter = TextFormatter()
-        return formatter.format_transcript(transcript), "유튜브 자막"
-    except Exception:
-        try:
-            ydl_opts = {'quiet': True, 'skip_download': True}
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                data = f"영상 제목: {info.get('title')}\n\n설명:\n{info.get('description')}"
-                return data, "유튜브 영상 설명"
-        except Exception as e:
-            return None, f"추출 실패: {e}"
-
-def get_blog_content(url):
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        if "blog.naver.com" in url:
-            # iframe 처리 (PC 주소일 경우)
-            iframe = soup.select_one('iframe#mainFrame')
-            if iframe:
-                real_url = "https://blog.naver.com" + iframe['src']
-                response = requests.get(real_url, headers=headers)
-                soup = BeautifulSoup(response.text, 'html.parser')
-            
-            main_content = soup.select_one('.se-main-container') or soup.select_one('#postViewArea')
-            if main_content:
-                for s in main_content(["script", "style"]): s.extract()
-                return main_content.get_text(separator="\n"), "네이버 블로그"
 
-        for script in soup(["script", "style", "nav", "header", "footer"]): script.extract()
-        return soup.get_text(separator="\n"), "블로그 글"
-    except Exception as e:
-        return None, f"크롤링 에러: {e}"
+# ==========================================
+# 📦 여러 링크 한꺼번에 가져오기
+# ==========================================
+def show_bulk_report(job):
+    report = job.report
+    st.progress(report.processed / report.total if report.total else 1.0, text=report.summary())
+    if report.failures:
+        with st.expander(f"실패한 링크 {len(report.failures)}개"):
+            st.dataframe([{"링크": url, "이유": reason} for url, reason in report.failures], use_container_width=True)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def poll_bulk_import(user_id):
+    job = bulk_import.get(user_id)
+    if job is None: return
+    show_bulk_report(job)
+    if job.done.is_set(): st.rerun()
+
+def show_bulk_import(user_id):
+    job = bulk_import.get(user_id)
+    if job and not job.done.is_set():
+        st.info("📦 가져오는 중이에요. 다른 메뉴로 가셔도 계속 진행돼요.")
+        poll_bulk_import(user_id)
+        return
+    if job:
+        st.success("🏁 가져오기가 끝났어요!")
+        show_bulk_report(job)
+        if st.button("확인", key="bulk_dismiss"): bulk_import.dismiss(user_id); st.rerun()
+        return
 
-import json
+    with st.container(border=True):
+        with st.form("bulk_import_form"):
+            text = st.text_area("🔗 링크 목록 (한 줄에 하나)", height=200, placeholder="북마크에서 링크를 복사해서 붙여넣으세요.")
+            uploaded = st.file_uploader("또는 링크 목록 파일 (.txt)", type=["txt"])
+            submitted = st.form_submit_button("한꺼번에 가져오기 📦", type="primary", use_container_width=True)
+        if submitted:
+            if uploaded: text = f"{text}\n{uploaded.getvalue().decode('utf-8', errors='ignore')}"
+            links, _ = bulk_import.parse_urls(text)
+            if not links: st.warning("링크를 찾지 못했어요. 주소를 다시 확인해주세요.")
+            else:
+                bulk_import.start(user_id, text, get_model)
+                st.rerun()
 
-def cook_recipe(raw_text, source_type, model):
-    try:
-        prompt = f"""
-        당신은 '링쿡(Lincook)'의 스마트 셰프입니다.
-        아래 텍스트({source_type})를 분석해서 다음 정보를 JSON 형식으로 추출하세요.
-        [분석할 텍스트] {raw_text[:15000]}
-        [작성 규칙]
-        1. title: 요리 제목 (명사형)
-        2. markdown_content: 2인분 기준 상세 레시피 (마크다운)
-        3. cuisine_type: 국적 (한식, 중식, 일식, 양식, 아시안, 퓨전, 기타)
-        4. dish_type: 종류 (국/탕/찌개, 구이/스테이크, 볶음, 튀김, 찜/조림, 밥/면, 샐러드, 디저트, 기타)
-        5. ingredients: [{{"name": "재료명", "amount": "수량"}}, ...] (수량은 분수, 영문단위 붙여쓰기)
-        응답은 오직 JSON 형식으로만 주세요.
-        """
-        
-        response = model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
-        
-        # [안전장치 1] 응답 텍스트에서 불필요한 마크다운 기호 제거 (가끔 AI가 ```json 을 붙여서 줌)
-        clean_text = response.text.replace("```json", "").replace("```", "").strip()
-        
-        return json.loads(clean_text)
 
-    except Exception as e:
-        # [안전장치 2] 에러가 발생하면 빨간 박스 대신 콘솔에 이유를 출력하고 None을 반환
-        print(f"⚠️ 레시피 생성 중 오류 발생: {e}")
-        return None
-
-# 🔄 재료 대체 사전
-INGREDIENT_SUBSTITUTES = {
-    "대파": ["쪽파", "실파", "양파", "부추"], "쪽파": ["대파", "실파", "부추"], "양파": ["대파", "샬롯", "양배추"],
-    "마늘": ["마늘가루", "다진마늘"], "다진마늘": ["통마늘", "마늘가루"], "청양고추": ["페페론치노", "홍고추"],
-    "페페론치노": ["청양고추", "건고추"], "감자": ["고구마"], "고구마": ["감자"], "배추": ["양배추", "알배기배추"],
-    "양배추": ["배추", "숙주"], "숙주": ["콩나물"], "콩나물": ["숙주"], "무": ["콜라비"],
-    "돼지고기": ["소고기", "닭고기", "베이컨", "햄", "스팸"], "소고기": ["돼지고기"], "닭고기": ["돼지고기"],
-    "베이컨": ["햄", "스팸"], "햄": ["베이컨", "스팸"], "스팸": ["햄", "참치캔"], "새우": ["오징어", "맛살"],
-    "간장": ["진간장", "참치액", "굴소스"], "굴소스": ["간장", "치킨스톡"], "액젓": ["참치액", "국간장"],
-    "설탕": ["올리고당", "꿀", "물엿", "매실청"], "식초": ["레몬즙"], "맛술": ["미림", "소주"],
-    "식용유": ["포도씨유", "카놀라유"], "밀가루": ["부침가루", "전분"], "전분": ["밀가루", "찹쌀가루"]
-}
-
-def search_recipes_by_fridge(user_ingredients, all_recipes):
-    results = []
-    inputs = [i.strip() for i in user_ingredients.split(',') if i.strip()]
-    if not inputs: return []
-
-    for recipe in all_recipes:
-        score = 0.0
-        matched_details = [] 
-        r_ingredients = recipe['ingredients'] 
-        if isinstance(r_ingredients, str):
-            try:
-                if r_ingredients.startswith('['):
-                     ing_list = json.loads(r_ingredients)
-                     r_ingredients = [item['name'] for item in ing_list]
-            except: pass
-        if not r_ingredients: continue
-        target_str = str(r_ingredients)
-
-        for user_ing in inputs:
-            if user_ing in target_str:
-                score += 1.0
-                matched_details.append(f"{user_ing}")
-                continue 
-            substitutes = INGREDIENT_SUBSTITUTES.get(user_ing, [])
-            for sub in substitutes:
-                if sub in target_str:
-                    score += 0.5
-                    matched_details.append(f"{sub}(대체 0.5)")
-                    break 
-        if score > 0:
-            recipe['match_score'] = score
-            recipe['matched_keywords'] = matched_details
-            results.append(recipe)
-            
-    results.sort(key=lambda x: x['match_score'], reverse=True)
-    return results
+PLATFORM_TOASTS = {"instagram": "📸 인스타그램 감지", "youtube": "🎥 유튜브 감지"}
 
 # ==========================================
 # 🖥️ 화면 구성 (브랜드: Lincook)
 # ==========================================
-st.set_page_config(page_title="링쿡 - Lincook", page_icon="🔗", layout="wide")
 auth.init_session_state()
+# 만료된 로그인 세션은 백그라운드에서 모아서 지웁니다. (프로세스당 한 번만 시작)
+db.start_session_sweeper()
+# 비밀번호 해시 풀과 (없는 아이디 로그인용) 가짜 해시를 미리 준비합니다. 첫 로그인만 느려지지 않도록.
+credentials.start()
 
 # [UI 팁] Streamlit 기본 스타일 숨기기
 hide_st_style = """
@@ -305,6 +294,12 @@ if not st.session_state['is_logged_in']:
         st.markdown("<br>", unsafe_allow_html=True)
         with st.container(border=True): auth.login_ui()
 else:
+    from streamlit_option_menu import option_menu
+    # 링크 미리보기가 비었거나 오래된 레시피는 백그라운드에서 천천히 채웁니다. (프로세스당 한 번만 시작)
+    link_preview.start_background_refresher()
+    # 링크 변환 작업 워커도 프로세스당 한 번만 띄웁니다. (LINCOOK_JOB_WORKERS=0 이면 별도 워커 프로세스가 처리)
+    jobs.start_workers(get_model)
+
     with st.sidebar:
         st.title("🔗 Lincook")
         st.caption(f"Chef **{st.session_state['user_name']}**님의 주방")
@@ -323,103 +318,95 @@ else:
         st.header("🍳 레시피 링쿡 (Lin+Cook)")
         st.caption("링크를 넣으면 AI가 요리책을 만들어 드려요.")
         
-        with st.container(border=True):
-            with st.form("recipe_input_form"):
-                url = st.text_input("🔗 레시피 링크 붙여넣기", placeholder="유튜브, 인스타그램, 블로그 주소...")
-                submitted = st.form_submit_button("요리책 만들기 🚀", type="primary", use_container_width=True)
-
-            if submitted:
-                if not url: st.warning("링크를 입력해주세요!")
-                else:
-                    with st.spinner('👨‍🍳 링크를 분석해서 요리책을 쓰고 있어요...'):
-                        video_id = extract_video_id(url)
-                        if "instagram.com" in url:
-                            st.toast("📸 인스타그램 감지")
-                            raw_text, source_type, model = get_instagram_content(url)
-                        elif video_id: 
-                            st.toast("🎥 유튜브 감지")
-                            raw_text, source_type = get_youtube_data(url)
-                        else:
-                            st.toast("📝 블로그 감지")
-                            raw_text, source_type = get_blog_content(url)
-
-                        if raw_text and "실패" not in str(source_type):
-                            try:
-                                recipe_data = cook_recipe(raw_text, source_type, model)
-                                st.session_state['generated_data'] = recipe_data
-                                st.session_state['current_url'] = url
-                                st.session_state['current_source'] = source_type
-                            except Exception as e: st.error(f"AI 분석 실패: {e}")
-                        else: st.error(f"데이터를 가져올 수 없어요: {source_type}")
-
-        if 'generated_data' in st.session_state:
-            data = st.session_state['generated_data']
+        import_mode = st.radio("가져오기 방식", ["링크 하나", "여러 링크 한꺼번에"], horizontal=True, label_visibility="collapsed")
+        if import_mode == "여러 링크 한꺼번에":
+            show_bulk_import(st.session_state['user_id'])
+        else:
+            with st.container(border=True):
+                with st.form("recipe_input_form"):
+                    url = st.text_input("🔗 레시피 링크 붙여넣기", placeholder="유튜브, 인스타그램, 블로그 주소...")
+                    submitted = st.form_submit_button("요리책 만들기 🚀", type="primary", use_container_width=True)
+
+                if submitted:
+                    canon = url_canon.canonicalize(url)
+                    saved = db.find_recipe_by_url(st.session_state['user_id'], url) if canon else None
+                    if not url: st.warning("링크를 입력해주세요!")
+                    elif not canon: st.warning("올바른 링크가 아니에요. 주소를 다시 확인해주세요.")
+                    elif saved:
+                        # 이미 저장한 링크면 추출/AI 분석을 다시 돌리지 않고 저장된 내용을 보여줍니다.
+                        st.info("📚 이미 내 요리책에 저장된 레시피예요!")
+                        set_current_recipe(saved)
+                    else:
+                        # 변환은 작업 워커가 합니다. 여기서는 작업만 넣고 바로 화면을 돌려줘요.
+                        st.toast(PLATFORM_TOASTS.get(canon.platform, "📝 블로그 감지"))
+                        st.session_state['pending_job_id'] = jobs.submit(st.session_state['user_id'], canon.canonical_url)
+                        st.info("👨‍🍳 요리책을 쓰기 시작했어요! 다른 메뉴로 가셔도 완성되면 요리책에 자동으로 저장돼요.")
+
+                check_pending_job(st.session_state['user_id'])
+                recent_jobs = db.list_user_jobs(st.session_state['user_id'], JOB_STATUS_LIMIT)
+                if any(job['status'] in jobs.ACTIVE_STATUSES for job in recent_jobs): poll_jobs(st.session_state['user_id'])
+                elif recent_jobs:
+                    with st.expander("최근 변환 작업"): show_job_rows(recent_jobs)
+
+            if 'generated_data' in st.session_state:
+                data = st.session_state['generated_data']
     
-            # [방어 코드] 데이터가 비어있으면(None) 에러 내지 말고 안내 메시지 띄우기
-            if data is None:
-                st.warning("😓 AI가 내용을 분석하지 못했습니다. 영상에 자막이 없거나, 내용이 너무 짧을 수 있습니다.")
-            else:
-                st.divider()
-                with st.container(border=True):
-                    c_head, c_btn = st.columns([4, 1])
-                    # 안전하게 .get 사용
-                    with c_head: st.subheader(f"✨ {data.get('title', '제목 없음')}")
-                    st.markdown(f"**{data.get('cuisine_type', '기타')}** | **{data.get('dish_type', '기타')}**")
-            
-                    # 저장 전 미리보기
-                    show_link_card(st.session_state.get('current_url'))
+                # [방어 코드] 데이터가 비어있으면(None) 에러 내지 말고 안내 메시지 띄우기
+                if data is None:
+                    st.warning("😓 AI가 내용을 분석하지 못했습니다. 영상에 자막이 없거나, 내용이 너무 짧을 수 있습니다.")
+                else:
                     st.divider()
-
-                    ing_display = data.get('ingredients')
-                    if isinstance(ing_display, list):
-                        # 리스트 형태일 때 에러 방지 처리
-                        ing_text = ", ".join([f"{i.get('name','')}({i.get('amount','')})" for i in ing_display if isinstance(i, dict)])
-                        st.info(f"🥕 핵심 재료: {ing_text}")
-                    else: 
-                        st.info(f"🥕 핵심 재료: {ing_display}")
+                    with st.container(border=True):
+                        c_head, c_btn = st.columns([4, 1])
+                        # 안전하게 .get 사용
+                        with c_head: st.subheader(f"✨ {data.get('title', '제목 없음')}")
+                        st.markdown(f"**{data.get('cuisine_type', '기타')}** | **{data.get('dish_type', '기타')}**")
             
-                    st.markdown(data.get('markdown_content', '내용이 없습니다.'))
-                    st.divider()
-                    col_save, col_down = st.columns([1, 1])
-                    with col_save:
-                        if st.button("📥 내 요리책에 저장", type="primary", use_container_width=True):
-                            try:
-                                ing_str = json.dumps(data.get('ingredients'), ensure_ascii=False)
-                                db.add_recipe(st.session_state['user_id'], data.get('title'), data.get('markdown_content'),
-                                st.session_state['current_url'], st.session_state['current_source'],
-                                    data.get('cuisine_type'), data.get('dish_type'), ing_str)
-                                st.balloons()
-                                st.toast("저장되었습니다! 📚")
-                            except Exception as e:
-                                st.error("저장 중 오류가 발생했습니다.")
-                    with col_down:
-                        st.download_button("💾 파일로 저장", data.get('markdown_content', ''), "recipe.md", use_container_width=True)
+                        # 저장 전 미리보기
+                        show_link_card(st.session_state.get('current_url'), st.session_state.get('current_preview'))
+                        st.divider()
+
+                        ing_display = data.get('ingredients')
+                        if isinstance(ing_display, list):
+                            # 리스트 형태일 때 에러 방지 처리
+                            ing_text = ", ".join([f"{i.get('name','')}({i.get('amount','')})" for i in ing_display if isinstance(i, dict)])
+                            st.info(f"🥕 핵심 재료: {ing_text}")
+                        else: 
+                            st.info(f"🥕 핵심 재료: {ing_display}")
+            
+                        st.markdown(data.get('markdown_content', '내용이 없습니다.'))
+                        st.divider()
+                        col_save, col_down = st.columns([1, 1])
+                        with col_save:
+                            # 작업 워커가 변환이 끝나면 바로 저장하므로 여기 보이는 레시피는 이미 요리책에 있습니다.
+                            st.success("📚 내 요리책에 저장되어 있어요.")
+                        with col_down:
+                            st.download_button("💾 파일로 저장", data.get('markdown_content', ''), "recipe.md", use_container_width=True)
 
     # --- 메뉴 2: 나의 요리책 ---
     elif selected == "나의 요리책":
         if 'edit_mode_id' not in st.session_state: st.session_state['edit_mode_id'] = None
+        user_id = st.session_state['user_id']
         col_title, col_shop, col_del = st.columns([6, 1.2, 1])
         with col_title: st.header(f"📚 {st.session_state['user_name']}님의 주방")
         
-        my_recipes = db.get_user_recipes(st.session_state['user_id'])
-        checked_recipes = []
-        if my_recipes:
-            for r in my_recipes:
-                if st.session_state.get(f"chk_fav_{r['id']}", False) or st.session_state.get(f"chk_folder_{r['id']}", False):
-                    checked_recipes.append(r)
+        # 목록은 요약 컬럼만 보여준 페이지만큼 세션에 두고(데이터 버전이 바뀔 때만 다시 조회), 본문은 펼칠 때만 불러옵니다.
+        library = recipe_cache.get(st.session_state, user_id)
+        checked_ids = get_checked_recipe_ids(library)
+        folders = library.folders
 
         with col_shop:
             if st.button("🛒 장보기", use_container_width=True):
-                if not checked_recipes: st.toast("먼저 레시피를 선택해주세요!")
+                if not checked_ids: st.toast("먼저 레시피를 선택해주세요!")
                 else: st.session_state['show_shopping_list'] = True
         with col_del:
             if st.button("🗑 삭제", type="primary", use_container_width=True):
-                if not checked_recipes: 
+                if not checked_ids: 
                     st.warning("삭제할 레시피를 선택해주세요!") # toast보다 warning이 더 잘 보임
                 else:
                     try:
                         # 1. 삭제 시도
-                        db.delete_recipes_list([r['id'] for r in checked_recipes], st.session_state['user_id'])
+                        db.delete_recipes_list(checked_ids, user_id)
             
                         # 2. 성공 시 새로고침
                         st.toast("삭제되었습니다.")
@@ -437,16 +424,16 @@ else:
             with c_head: st.subheader("🛒 장보기 체크리스트 (자동 합산)")
             with c_close:
                 if st.button("X", help="닫기"): st.session_state['show_shopping_list'] = False; st.rerun()
-            shopping_items = generate_shopping_list(checked_recipes)
+            shopping_items = generate_shopping_list(checked_ids, user_id)
             if shopping_items:
-                st.info("💡 같은 재료는 모아서 보여드려요.")
+                st.info("💡 같은 재료는 단위를 맞춰 모아서 보여드려요. (1컵=200ml, 1큰술=15ml, 1작은술=5ml)")
                 for item in shopping_items: st.checkbox(item)
             else: st.warning("선택한 레시피에 재료 정보가 없거나, 구버전 데이터입니다.")
 
         st.divider()
-        if not my_recipes: st.info("아직 저장된 레시피가 없어요. '레시피 링쿡!' 메뉴에서 추가해보세요.")
+        if not folders: st.info("아직 저장된 레시피가 없어요. '레시피 링쿡!' 메뉴에서 추가해보세요.")
         else:
-            favorites = [r for r in my_recipes if r['is_favorite'] == 1]
+            favorites, fav_more = visible_recipes("fav", library, recipe_cache.FAVORITES)
             if favorites:
                 st.subheader("⭐ 즐겨찾기")
                 for recipe in favorites:
@@ -456,6 +443,7 @@ else:
                         with c_content:
                             is_editing = (st.session_state['edit_mode_id'] == f"top_{recipe['id']}")
                             if is_editing:
+                                full = db.get_recipe(recipe['id'], user_id) or recipe
                                 st.markdown(f"### ✏️ 수정: {recipe['title']}")
                                 with st.form(f"top_edit_form_{recipe['id']}"):
                                     new_title = st.text_input("제목", value=recipe['title'])
@@ -464,12 +452,12 @@ else:
                                     all_d = ["국/탕/찌개", "구이/스테이크", "볶음", "튀김", "찜/조림", "밥/면", "샐러드", "디저트", "기타"]
                                     with c1: new_cuisine = st.selectbox("종류", all_c, index=all_c.index(recipe['cuisine_type']) if recipe['cuisine_type'] in all_c else 0)
                                     with c2: new_dish = st.selectbox("방식", all_d, index=all_d.index(recipe['dish_type']) if recipe['dish_type'] in all_d else 0)
-                                    new_ingredients = st.text_input("재료", value=recipe['ingredients'])
-                                    new_content = st.text_area("내용", value=recipe['content'], height=200)
+                                    new_ingredients = st.text_input("재료", value=ingredients_to_text(db.get_recipe_ingredients([recipe['id']], user_id)[recipe['id']]))
+                                    new_content = st.text_area("내용", value=full.get('content'), height=200)
                                     col_s, col_c = st.columns([1,1])
                                     with col_s:
                                         if st.form_submit_button("💾 저장", type="primary"):
-                                            db.update_recipe(recipe['id'], st.session_state['user_id'], new_title, new_content, new_cuisine, new_dish, new_ingredients, recipe['folder_name'])
+                                            db.update_recipe(recipe['id'], user_id, new_title, new_content, new_cuisine, new_dish, text_to_ingredients(new_ingredients), recipe['folder_name'])
                                             st.session_state['edit_mode_id'] = None; st.rerun()
                                     with col_c:
                                         if st.form_submit_button("취소"): st.session_state['edit_mode_id'] = None; st.rerun()
@@ -478,24 +466,21 @@ else:
                                 with h: st.markdown(f"#### {recipe['title']}")
                                 with f:
                                     if st.button("★", key=f"top_fav_{recipe['id']}", help="즐겨찾기 해제"):
-                                        db.toggle_favorite(recipe['id'], st.session_state['user_id'], 1); st.rerun()
+                                        db.toggle_favorite(recipe['id'], user_id, 1); st.rerun()
                                 with e:
                                     if st.button("✏️", key=f"top_edt_{recipe['id']}"): st.session_state['edit_mode_id'] = f"top_{recipe['id']}"; st.rerun()
                                 st.caption(f"{recipe['cuisine_type']} | {recipe['dish_type']}")
                                 
-                                with st.expander("레시피 보기"):
-                                    source_url = recipe.get('source_url') or recipe.get('link') or recipe.get('url')
-                                    show_link_card(source_url)
-                                    st.markdown(recipe['content'])
+                                show_recipe_body(recipe['id'], "레시피 보기", key=f"top_open_{recipe['id']}")
+                show_more_button("fav", fav_more)
             st.divider()
 
             st.subheader("📂 레시피 서재")
-            folder_list = [r['folder_name'] for r in my_recipes]
-            all_folders = sorted(list(set(folder_list))) if folder_list else ["기본 폴더"]
+            all_folders = [name for name, _ in folders] or ["기본 폴더"]
             
-            for folder in all_folders:
-                f_recipes = [r for r in my_recipes if r['folder_name'] == folder]
-                with st.expander(f"📂 {folder} ({len(f_recipes)})", expanded=(folder=="기본 폴더")):
+            for folder, count in folders:
+                with st.expander(f"📂 {folder} ({count})", expanded=(folder=="기본 폴더")):
+                    f_recipes, f_more = visible_recipes(f"folder_{folder}", library, recipe_cache.folder_list(folder))
                     for recipe in f_recipes:
                         with st.container(border=True):
                             c_chk, c_content = st.columns([0.5, 9.5])
@@ -503,6 +488,7 @@ else:
                             with c_content:
                                 is_editing = (st.session_state['edit_mode_id'] == recipe['id'])
                                 if is_editing:
+                                    full = db.get_recipe(recipe['id'], user_id) or recipe
                                     st.markdown(f"### ✏️ 수정: {recipe['title']}")
                                     with st.form(f"edit_form_{recipe['id']}"):
                                         new_title = st.text_input("제목", value=recipe['title'])
@@ -511,11 +497,11 @@ else:
                                         with c_f1: sel_f = st.selectbox("폴더", all_f, index=all_folders.index(recipe['folder_name']) if recipe['folder_name'] in all_folders else 0)
                                         with c_f2: new_f_in = st.text_input("새 폴더명", disabled=(sel_f!="+ 새 폴더"))
                                         final_f = new_f_in if sel_f=="+ 새 폴더" and new_f_in else ("기본 폴더" if sel_f=="+ 새 폴더" else sel_f)
-                                        new_content = st.text_area("내용", value=recipe['content'], height=200)
+                                        new_content = st.text_area("내용", value=full.get('content'), height=200)
                                         col_s, col_c = st.columns([1,1])
                                         with col_s:
                                             if st.form_submit_button("💾 저장", type="primary"):
-                                                db.update_recipe(recipe['id'], st.session_state['user_id'], new_title, new_content, recipe['cuisine_type'], recipe['dish_type'], recipe['ingredients'], final_f)
+                                                db.update_recipe(recipe['id'], user_id, new_title, new_content, recipe['cuisine_type'], recipe['dish_type'], full.get('ingredients'), final_f)
                                                 st.session_state['edit_mode_id'] = None; st.rerun()
                                         with col_c:
                                             if st.form_submit_button("취소"): st.session_state['edit_mode_id'] = None; st.rerun()
@@ -524,17 +510,15 @@ else:
                                     with h: st.markdown(f"#### {recipe['title']}")
                                     with f:
                                         fav_icon = "★" if recipe['is_favorite'] else "☆"
-                                        if st.button(fav_icon, key=f"fav_{recipe['id']}"): db.toggle_favorite(recipe['id'], st.session_state['user_id'], recipe['is_favorite']); st.rerun()
+                                        if st.button(fav_icon, key=f"fav_{recipe['id']}"): db.toggle_favorite(recipe['id'], user_id, recipe['is_favorite']); st.rerun()
                                     with e:
                                         if st.button("✏️", key=f"edt_{recipe['id']}"): st.session_state['edit_mode_id'] = recipe['id']; st.rerun()
                                     st.caption(f"{recipe['cuisine_type']} | {recipe['dish_type']}")
                                     
-                                    with st.expander("내용 보기"):
-                                        source_url = recipe.get('source_url') or recipe.get('link') or recipe.get('url')
-                                        show_link_card(source_url)
-                                        st.markdown(recipe['content'])
+                                    if show_recipe_body(recipe['id'], "내용 보기", key=f"open_{recipe['id']}"):
                                         if st.button("🗑 삭제", key=f"del_{recipe['id']}"):
-                                            db.delete_recipe(recipe['id'], st.session_state['user_id']); st.rerun()
+                                            db.delete_recipe(recipe['id'], user_id); st.rerun()
+                    show_more_button(f"folder_{folder}", f_more)
 
     # --- 메뉴 3: 냉장고를 부탁해 ---
     elif selected == "냉장고를 부탁해":
@@ -543,10 +527,10 @@ else:
         with st.container(border=True):
             user_input = st.text_input("재료를 쉼표(,)로 구분해서 입력해주세요.", placeholder="예: 대파, 계란, 스팸")
             if user_input:
-                my_recipes = db.get_user_recipes(st.session_state['user_id'])
-                results = search_recipes_by_fridge(user_input, my_recipes)
+                results, total = fridge.search(st.session_state['user_id'], user_input)
                 if results:
-                    st.success(f"총 {len(results)}개의 요리를 찾았어요! 🍳")
+                    st.success(f"총 {total}개의 요리를 찾았어요! 🍳")
+                    if total > len(results): st.caption(f"점수가 높은 {len(results)}개만 보여드려요.")
                     st.divider()
                     for recipe in results:
                         with st.container(border=True):
@@ -555,11 +539,12 @@ else:
                                 st.subheader(recipe['title'])
                                 tags_html = ""
                                 for k in recipe['matched_keywords']:
-                                    color = "#FFF3CD" if "(대체" in k else "#D4EDDA"
-                                    text_color = "#856404" if "(대체" in k else "#155724"
+                                    substitute = "(대체" in k or "(비슷한 이름)" in k
+                                    color = "#FFF3CD" if substitute else "#D4EDDA"
+                                    text_color = "#856404" if substitute else "#155724"
                                     tags_html += f"<span style='background-color:{color}; color:{text_color}; padding:2px 6px; border-radius:4px; font-size:0.8em; margin-right:4px;'>{k}</span>"
                                 st.markdown(f"✅ 포함된 재료: {tags_html}", unsafe_allow_html=True)
-                                st.caption(f"{recipe['cuisine_type']} | {recipe['ingredients']}")
+                                st.caption(f"{recipe['cuisine_type']} | {', '.join(recipe['ingredient_names'])}")
                             with c2:
                                 st.markdown(f"## ⭐ {recipe['match_score']}점")
                             with st.expander("레시피 바로 보기"):
@@ -29,7 +29,7 @@ def init_session_state():
     if 'new_user_info' not in st.session_state: st.session_state['new_user_info'] = {}
 
 def clear_recipe_data():
-    keys = ['generated_data', 'current_url', 'current_source', 'edit_mode_id']
+    keys = ['generated_data', 'current_url', 'current_source', 'current_preview', 'current_saved_id', 'pending_job_id', 'edit_mode_id', 'recipe_library']
     for k in keys:
         if k in st.session_state: del st.session_state[k]
 
@@ -45,18 +45,26 @@ def validate_password(password):
 def try_auto_login(cookie_manager):
     if st.session_state['is_logged_in']: return
 
-    time.sleep(0.1) 
+    # 쿠키 컴포넌트가 아직 값을 못 받았으면 None입니다. 값이 오면 컴포넌트가 다시 실행시켜 주므로 기다리지 않습니다.
     token = cookie_manager.get(cookie="lincook_auth_token")
     
     if token:
+        # 프로세스 메모리의 세션 캐시 또는 sessions 기본키 조회 한 번
         user = db.get_user_by_token(token)
         if user:
             st.session_state['is_logged_in'] = True
             st.session_state['user_id'] = user['id']
             st.session_state['user_name'] = user['nickname']
+            st.session_state['auth_token'] = token
             return True
     return False
 
+def start_session(cookie_manager, user_id):
+    """이 기기용 세션을 새로 만들어 쿠키에 넣습니다. (다른 기기의 로그인은 그대로)"""
+    token = db.create_session(user_id)
+    st.session_state['auth_token'] = token
+    cookie_manager.set("lincook_auth_token", token, expires_at=datetime.datetime.now() + datetime.timedelta(seconds=db.SESSION_TTL))
+
 # ==========================================
 # 🖥️ 화면 UI
 # ==========================================
@@ -87,8 +95,7 @@ def login_ui():
                     st.session_state['user_id'] = user['id']
                     st.session_state['user_name'] = user['nickname']
                     
-                    token = db.update_auth_token(user['id'])
-                    cookie_manager.set("lincook_auth_token", token, expires_at=datetime.datetime.now() + datetime.timedelta(days=30))
+                    start_session(cookie_manager, user['id'])
                     
                     st.success(f"{user['nickname']}님 환영합니다! 👋")
                     time.sleep(0.5)
@@ -127,8 +134,7 @@ def login_ui():
                             st.session_state['is_logged_in'] = True
                             st.session_state['user_id'] = user['id']
                             st.session_state['user_name'] = user['nickname']
-                            token = db.update_auth_token(user['id'])
-                            cookie_manager.set("lincook_auth_token", token, expires_at=datetime.datetime.now() + datetime.timedelta(days=30))
+                            start_session(cookie_manager, user['id'])
                             st.session_state['signup_success'] = False
                             st.session_state['new_user_info'] = {}
                             st.rerun()
@@ -269,8 +275,10 @@ def logout_ui():
     cookie_manager = get_cookie_manager()
     if st.sidebar.button("🚪 로그아웃"):
         if st.session_state['user_id']:
-            db.delete_auth_token(st.session_state['user_id']) 
+            # 이 기기의 세션만 지웁니다. (다른 기기는 로그인 유지)
+            db.delete_session(st.session_state.get('auth_token') or cookie_manager.get(cookie="lincook_auth_token"))
             cookie_manager.delete("lincook_auth_token") 
+        st.session_state['auth_token'] = None
         
         clear_recipe_data()
         st.session_state['is_logged_in'] = False
@@ -0,0 +1,57 @@
+# bench_credentials.py
+# 해시 비용 설정마다 로그인(비밀번호 검증) 처리량을 잽니다.
+#   - 1코어당 초당 로그인 수 = 워커 1개일 때의 처리량 (해시 계산이 GIL을 놓으므로 코어 수만큼 거의 그대로 늘어납니다)
+#   - 워커 HASH_WORKERS개 + 동시 로그인 요청(클라이언트 스레드) 여러 개일 때의 전체 처리량과 대기 시간
+#   python bench_credentials.py [측정 초]
+import os
+import sys
+import threading
+import time
+
+import credentials
+
+SETTINGS = [
+    ("scrypt", {"SCRYPT_N": 2 ** 13}), ("scrypt", {"SCRYPT_N": 2 ** 14}), ("scrypt", {"SCRYPT_N": 2 ** 15}),
+    ("pbkdf2_sha256", {"PBKDF2_ITERATIONS": 100000}), ("pbkdf2_sha256", {"PBKDF2_ITERATIONS": 300000}),
+    ("pbkdf2_sha256", {"PBKDF2_ITERATIONS": 600000}),
+]
+CLIENTS = 16
+
+def run(encoded, workers, clients, seconds):
+    """(초당 로그인 수, 평균 대기 ms, 최대 대기 ms)"""
+    credentials.shutdown()
+    credentials.HASH_WORKERS = workers
+    latencies, lock = [], threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            ok, _ = credentials.verify_password("correct horse 1", encoded)
+            assert ok
+            with lock: latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - t0
+    return len(latencies) / elapsed, sum(latencies) / len(latencies) * 1000, max(latencies) * 1000
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    workers = credentials.HASH_WORKERS
+    print(f"🏁 CPU {os.cpu_count()}개 | 워커 {workers}개, 동시 로그인 {CLIENTS}개 | 설정마다 {seconds:g}초")
+    for scheme, params in SETTINGS:
+        credentials.SCHEME = scheme
+        for name, value in params.items(): setattr(credentials, name, value)
+        encoded = credentials.hash_password("correct horse 1")
+        label = f"{scheme} " + " ".join(f"{k.split('_', 1)[1]}={v}" for k, v in params.items())
+        per_core, _, _ = run(encoded, 1, 1, seconds)
+        total, avg_ms, max_ms = run(encoded, workers, CLIENTS, seconds)
+        print(f"  {label:<32} 1코어 {per_core:6.1f}회/초 ({1000 / per_core:5.1f}ms) | "
+              f"전체 {total:6.1f}회/초, 대기 평균 {avg_ms:6.0f}ms / 최대 {max_ms:6.0f}ms")
+    credentials.shutdown()
+
+if __name__ == "__main__":
+    main()
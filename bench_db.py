@@ -0,0 +1,89 @@
+# bench_db.py
+# '나의 요리책' 한 번 리런(조회 + 즐겨찾기 토글 + 프로필 조회)을 여러 세션이 동시에 돌릴 때
+# 커넥션 생성 횟수와 p50/p99 지연시간을 비교합니다.
+#   python bench_db.py [세션 수] [세션당 리런 수]
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import database as db
+
+RECIPES_PER_USER = 200
+
+class LegacyPool(db.ConnectionPool):
+    """기존 방식 재현: 매번 새로 connect 하고, 끝나면 close (WAL/PRAGMA 없음)."""
+    def _connect(self):
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        with self._lock:
+            self.stats["connects"] += 1
+        return conn
+
+def seed(n_users):
+    db.init_db()
+    for u in range(n_users):
+        db.add_user(f"user{u}", "pw", f"닉네임{u}", "", "2000-01-01", f"u{u}@lincook.kr", "", "선택 안 함")
+    with db.get_cursor(commit=True) as c:
+        c.execute('SELECT id FROM users')
+        user_ids = [r[0] for r in c.fetchall()]
+        for uid in user_ids:
+            c.executemany(
+                'INSERT INTO recipes (user_id, title, content, ingredients, created_at) VALUES (?, ?, ?, ?, ?)',
+                [(uid, f"레시피 {i}", "# 내용\n" * 50, '[{"name": "대파", "amount": "1대"}]', f"2024-01-01 00:{i // 60:02d}:{i % 60:02d}")
+                 for i in range(RECIPES_PER_USER)])
+    return user_ids
+
+def run(label, pool, user_ids, reruns):
+    db._pool = pool
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def session(uid):
+        local = []
+        for _ in range(reruns):
+            t0 = time.perf_counter()
+            try:
+                recipes = db.get_user_recipes(uid)
+                db.toggle_favorite(recipes[0]['id'], uid, recipes[0]['is_favorite'])
+                db.get_user_info(uid)
+            except sqlite3.OperationalError as e:
+                with lock: errors.append(str(e))
+            local.append(time.perf_counter() - t0)
+        with lock: latencies.extend(local)
+
+    threads = [threading.Thread(target=session, args=(uid,)) for uid in user_ids]
+    t0 = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    total = len(latencies)
+    p50 = latencies[total // 2] * 1000
+    p99 = latencies[min(total - 1, int(total * 0.99))] * 1000
+    print(f"[{label}] 리런 {total}회 / {elapsed:.2f}s | 리런당 connect {pool.stats['connects'] / total:.2f}회 "
+          f"| p50 {p50:.2f}ms | p99 {p99:.2f}ms | locked 에러 {len(errors)}건")
+    pool.close()
+
+def main():
+    n_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    reruns = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_NAME = os.path.join(tmp, "bench.db")
+        user_ids = seed(n_sessions)
+        db.close_pool()
+        # 시드할 때 WAL이 켜졌으므로, 기존 방식 측정 전에 기본 저널 모드로 되돌립니다.
+        conn = sqlite3.connect(db.DB_NAME)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+        print(f"🏁 세션 {n_sessions}개 x 리런 {reruns}회 (유저당 레시피 {RECIPES_PER_USER}개)")
+        run("기존(connect/close)", LegacyPool(db.DB_NAME, size=0), user_ids, reruns)
+        run("풀+WAL", db.ConnectionPool(db.DB_NAME), user_ids, reruns)
+        db._pool = None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# bench_fridge.py
+# 유저 한 명이 레시피 N개를 가지고 있을 때 '냉장고를 부탁해' 검색 한 번에 걸리는 시간을 잽니다.
+#   python bench_fridge.py [레시피 수]
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import database as db
+import fridge
+
+PANTRY = ["대파", "쪽파", "양파", "마늘", "다진마늘", "청양고추", "감자", "고구마", "배추", "양배추", "숙주", "콩나물",
+          "돼지고기", "소고기", "닭고기", "베이컨", "햄", "스팸", "새우", "오징어", "간장", "굴소스", "설탕", "식초",
+          "계란", "두부", "애호박", "당근", "버섯", "고추장", "된장", "참기름", "깨", "김치", "떡", "어묵", "치즈", "우유"]
+QUERIES = ["대파, 계란, 스팸", "돼지고기, 김치", "감자, 당근, 양파", "새우, 버터", "두부"]
+
+def seed(n_recipes):
+    db.add_user("bench", "pw", "벤치", "", "", "bench@lincook.kr", "", "")
+    user_id = db.check_login("bench", "pw")["id"]
+    rng = random.Random(42)
+    with db.get_cursor(commit=True) as c:
+        for i in range(n_recipes):
+            names = rng.sample(PANTRY, rng.randint(3, 8))
+            ingredients = json.dumps([{"name": n, "amount": "1개"} for n in names], ensure_ascii=False)
+            c.execute('INSERT INTO recipes (user_id, title, content, ingredients, created_at) VALUES (?, ?, ?, ?, ?)',
+                      (user_id, f"레시피 {i}", "", ingredients, f"2024-01-01 {i:08d}"))
+            db.index_recipe_ingredients(c, c.lastrowid, user_id, ingredients)
+    return user_id
+
+def main():
+    n_recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_NAME = os.path.join(tmp, "bench.db")
+        db.init_db()
+        t0 = time.perf_counter()
+        user_id = seed(n_recipes)
+        print(f"🏁 레시피 {n_recipes}개 색인: {time.perf_counter() - t0:.1f}s")
+
+        # 첫 검색은 그 재료명들의 레시피 비트맵을 DB에서 읽어오고(레시피를 저장/수정/삭제한 직후도 같음), 그 뒤로는 메모리에서 계산합니다.
+        for query in QUERIES:
+            rounds = 20
+            t0 = time.perf_counter()
+            fridge.search(user_id, query)
+            first_ms = (time.perf_counter() - t0) * 1000
+            t0 = time.perf_counter()
+            for _ in range(rounds):
+                results, total = fridge.search(user_id, query)
+            ms = (time.perf_counter() - t0) / rounds * 1000
+            print(f"  '{query}': 매칭 {total}개, 상위 {len(results)}개 | 첫 검색 {first_ms:.1f}ms, 이후 {ms:.2f}ms/검색")
+        db.close_pool()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# bench_group_commit.py
+# 동시 사용자 여러 명이 즐겨찾기/수정/저장을 계속 누를 때 쓰기 처리량과 대기 시간을 비교합니다.
+#   기존 방식: 호출한 스레드에서 바로 BEGIN/COMMIT (LINCOOK_GROUP_COMMIT=0)
+#   새 방식:   쓰기 전용 스레드가 큐에 쌓인 변경을 한 트랜잭션으로 묶어 커밋 (database.submit_write)
+# synchronous=NORMAL(기본, WAL은 체크포인트 때만 fsync)과 FULL(커밋마다 fsync) 두 경우를 잽니다.
+#   python bench_group_commit.py [동시 사용자 수] [사용자당 쓰기 수]
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import database as db
+
+INGREDIENTS = json.dumps([{"name": "대파", "amount": "1대"}, {"name": "간장", "amount": "2큰술"}], ensure_ascii=False)
+
+def seed(n_users):
+    user_ids = []
+    with db.get_cursor(commit=True) as c:
+        for u in range(n_users):
+            c.execute("INSERT INTO users (username, password, nickname) VALUES (?, 'x', ?)", (f"user{u}", f"닉네임{u}"))
+            user_id = c.lastrowid
+            for i in range(20):
+                db._insert_recipe(c, user_id, f"레시피 {i}", "# 내용", f"https://example.com/{u}/{i}", "web", "한식", "볶음",
+                                  INGREDIENTS, None, f"2024-01-01 00:00:{i:02d}")
+            user_ids.append(user_id)
+    return user_ids
+
+def session(user_id, n_writes, latencies, lock, errors):
+    rng = random.Random(user_id)
+    with db.get_cursor() as c:
+        recipe_ids = [r[0] for r in c.execute('SELECT id FROM recipes WHERE user_id=?', (user_id,)).fetchall()]
+    mine = []
+    for k in range(n_writes):
+        action = rng.random()
+        t0 = time.perf_counter()
+        try:
+            if action < 0.6:
+                db.toggle_favorite(rng.choice(recipe_ids), user_id, rng.randint(0, 1))
+            elif action < 0.85:
+                recipe_id = rng.choice(recipe_ids)
+                db.update_recipe(recipe_id, user_id, f"수정 {k}", "# 내용", "한식", "볶음", INGREDIENTS, "기본 폴더")
+            else:
+                db.add_recipe(user_id, f"새 레시피 {k}", "# 내용", f"https://example.com/new/{user_id}/{k}", "web", "한식", "볶음",
+                              INGREDIENTS)
+        except Exception as e:
+            errors.append(e)
+        mine.append(time.perf_counter() - t0)
+    with lock: latencies.extend(mine)
+
+def run(label, group_commit, synchronous, n_users, n_writes):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_NAME = os.path.join(tmp, "bench.db")
+        db.GROUP_COMMIT = group_commit
+        db.CONNECTION_PRAGMAS = tuple(p for p in BASE_PRAGMAS if not p.startswith("PRAGMA synchronous")) + (f"PRAGMA synchronous={synchronous}",)
+        db.init_db()
+        user_ids = seed(n_users)
+        latencies, lock, errors = [], threading.Lock(), []
+        before = db.write_queue_stats()
+        threads = [threading.Thread(target=session, args=(uid, n_writes, latencies, lock, errors)) for uid in user_ids]
+        t0 = time.perf_counter()
+        for t in threads: t.start()
+        for t in threads: t.join()
+        elapsed = time.perf_counter() - t0
+        after = db.write_queue_stats()
+        latencies.sort()
+        p50, p99 = latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+        batches = after["batches"] - before["batches"]
+        per_commit = f" | 커밋당 {(after['writes'] - before['writes']) / batches:.1f}건" if group_commit and batches else ""
+        print(f"  [{label:<10}] {len(latencies) / elapsed:7.0f}건/초 | p50 {p50:6.2f}ms | p99 {p99:7.2f}ms | "
+              f"최대 {latencies[-1] * 1000:7.1f}ms | 에러 {len(errors)}건{per_commit}")
+        db.close_pool()
+
+BASE_PRAGMAS = db.CONNECTION_PRAGMAS
+
+def main():
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    n_writes = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    print(f"🏁 동시 사용자 {n_users}명 x 쓰기 {n_writes}회 (즐겨찾기 60% / 수정 25% / 새 레시피 15%)")
+    for synchronous in ("NORMAL", "FULL"):
+        print(f" synchronous={synchronous}")
+        run("호출별 커밋", False, synchronous, n_users, n_writes)
+        run("그룹 커밋", True, synchronous, n_users, n_writes)
+
+if __name__ == "__main__":
+    main()
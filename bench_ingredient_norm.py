@@ -0,0 +1,108 @@
+# bench_ingredient_norm.py
+# 합성 한국어 재료명 모음으로 재료명 매칭의 정확도(정밀도/재현율)와 속도를 잽니다.
+#   기존 방식: 띄어쓰기만 지운 이름에 부분 문자열(in) 비교
+#   새 방식:   ingredient_norm.normalize + NgramIndex.lookup (포함 관계 + 자모 유사도)
+#   python bench_ingredient_norm.py [이름 수]
+import random
+import sys
+import time
+
+import ingredient_norm
+
+# 검색어(기본 재료) -> 레시피에 적힐 수 있는 표기. 앞의 수식어/띄어쓰기/괄호/조사/오타 변형을 붙여서 씁니다.
+BASES = {
+    "대파": ["대파", "대 파", "파", "대파채", "대파(흰 부분)"], "양파": ["양파", "적양파", "양파(중)"],
+    "마늘": ["마늘", "다진 마늘", "통마늘", "간마늘"], "계란": ["계란", "달걀", "달걀노른자", "계란을"],
+    "고추": ["고추", "청양고추", "청량고추", "홍고추", "풋고추"], "배추": ["배추", "알배기배추", "절임배추"],
+    "양배추": ["양배추", "양배추채"], "감자": ["감자", "알감자", "햇감자"], "돼지고기": ["돼지고기", "돼지 고기", "돈육"],
+    "소고기": ["소고기", "쇠고기", "다진 소고기", "소고기(양지)"], "두부": ["두부", "부침두부", "두부랑"],
+    "새우": ["새우", "칵테일새우", "냉동 새우"], "버섯": ["표고버섯", "느타리버섯", "새송이버섯"],
+    "간장": ["간장", "진간장", "양조간장"], "호박": ["애호박", "단호박"], "올리브": ["올리브", "블랙올리브"],
+}
+# 검색어와 글자가 겹치지만 다른 재료 (맞으면 오답)
+CONFUSERS = {
+    "대파": [], "양파": [], "파": ["파스타", "파프리카", "양파", "쪽파"],
+    "고추": ["고추장", "고춧가루", "고추기름"], "배추": ["양배추"], "감자": ["돼지감자", "감자전분"],
+    "새우": ["새우젓"], "올리브": ["올리브유"], "마늘": [], "계란": [], "두부": [], "간장": [], "호박": ["호박즙"],
+}
+MODIFIERS = ["", "국산", "냉동", "손질한", "유기농", "삶은", "볶은", "얇게썬"]
+
+def typo(name, rng):
+    """한 글자의 모음을 비슷한 모음으로 바꾼 오타 (양배추 -> 양배치)"""
+    similar = {"ㅐ": "ㅔ", "ㅔ": "ㅐ", "ㅜ": "ㅣ", "ㅣ": "ㅜ", "ㅓ": "ㅕ", "ㅗ": "ㅛ"}
+    chars = list(name)
+    for i in rng.sample(range(len(chars)), len(chars)):
+        code = ord(chars[i]) - 0xAC00
+        if not 0 <= code < 11172: continue
+        cho, jung, jong = code // 588, code % 588 // 28, code % 28
+        vowel = ingredient_norm.JUNGSEONG[jung]
+        if vowel in similar:
+            chars[i] = chr(0xAC00 + cho * 588 + ingredient_norm.JUNGSEONG.index(similar[vowel]) * 28 + jong)
+            return "".join(chars)
+    return name
+
+def build_corpus(size, rng):
+    """[(재료명, 정답 검색어 집합), ...]"""
+    corpus = []
+    while len(corpus) < size:
+        base = rng.choice(list(BASES))
+        variant = rng.choice(BASES[base])
+        if len(variant) >= 3 and rng.random() < 0.1: variant = typo(variant, rng)
+        name = f"{rng.choice(MODIFIERS)} {variant}".strip()
+        corpus.append((name, {base}))
+        if rng.random() < 0.3:
+            query = rng.choice(list(CONFUSERS))
+            if CONFUSERS[query]:
+                confuser = rng.choice(CONFUSERS[query])
+                # 양배추/양파처럼 그 자체가 기본 재료인 것은 자기 검색어의 정답
+                corpus.append((f"{rng.choice(MODIFIERS)} {confuser}".strip(), {confuser} if confuser in BASES else set()))
+    return corpus
+
+def substring_lookup(names, term):
+    term = term.replace(" ", "")
+    return {i for i, name in enumerate(names) if term in name.replace(" ", "")}
+
+def evaluate(name, lookup, corpus, queries):
+    tp = fp = fn = 0
+    t0 = time.perf_counter()
+    for query in queries:
+        found = lookup(query)
+        expected = {i for i, (_, answers) in enumerate(corpus) if query in answers}
+        tp += len(found & expected)
+        fp += len(found - expected)
+        fn += len(expected - found)
+    ms = (time.perf_counter() - t0) / len(queries) * 1000
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    print(f"  {name:<20} 정밀도 {precision:.3f} | 재현율 {recall:.3f} | {ms:.3f}ms/검색")
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = random.Random(42)
+    corpus = build_corpus(size, rng)
+    names = [name for name, _ in corpus]
+    # "파"는 대파를 찾는 검색어로 봅니다 (정답: 대파 표기들)
+    for _, answers in corpus:
+        if "대파" in answers: answers.add("파")
+    queries = list(BASES) + ["파"]
+
+    t0 = time.perf_counter()
+    index = ingredient_norm.NgramIndex()
+    # 실제 DB처럼 정규화한 이름 하나당 id 하나, 레시피 재료 행은 그 id를 가리킵니다.
+    name_ids, rows_by_id = {}, {}
+    for i, name in enumerate(names):
+        key = ingredient_norm.normalize(name)
+        if key not in name_ids:
+            name_ids[key] = len(name_ids) + 1
+            index.add(name_ids[key], key)
+        rows_by_id.setdefault(name_ids[key], []).append(i)
+    print(f"🏁 재료 {len(corpus)}개 (서로 다른 정규화 이름 {len(index)}개) 색인: {(time.perf_counter() - t0) * 1000:.0f}ms")
+
+    def indexed_lookup(term):
+        return {i for name_id, _ in index.lookup(ingredient_norm.normalize(term)) for i in rows_by_id[name_id]}
+
+    evaluate("부분 문자열(in)", lambda term: substring_lookup(names, term), corpus, queries)
+    evaluate("정규화 + n-gram", indexed_lookup, corpus, queries)
+
+if __name__ == "__main__":
+    main()
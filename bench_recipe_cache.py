@@ -0,0 +1,61 @@
+# bench_recipe_cache.py
+# 요리책 화면 한 번 그릴 때(Streamlit 재실행 한 번) 목록 준비에 드는 시간을 잽니다.
+#   기존 방식: 폴더 목록 + 즐겨찾기 첫 페이지 + 폴더마다 첫 페이지를 매번 조회
+#   새 방식:   recipe_cache.get + 목록마다 첫 페이지 (데이터 버전이 같으면 DB 조회 없이 세션에 둔 페이지를 그대로 사용)
+#   python bench_recipe_cache.py [레시피 수] [폴더 수]
+import os
+import sys
+import tempfile
+import time
+
+import database as db
+import recipe_cache
+
+def seed(n_recipes, n_folders):
+    db.add_user("bench", "pw", "벤치", "", "", "bench@lincook.kr", "", "")
+    user_id = db.check_login("bench", "pw")["id"]
+    with db.get_cursor(commit=True) as c:
+        c.executemany('INSERT INTO recipes (user_id, title, content, folder_name, is_favorite, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                      [(user_id, f"레시피 {i}", "본문 " * 200, f"폴더 {i % n_folders}", int(i % 7 == 0), f"2024-01-01 {i:08d}")
+                       for i in range(n_recipes)])
+    return user_id
+
+def old_rerun(user_id):
+    folders = db.get_user_folders(user_id)
+    db.list_user_recipes(user_id, favorites_only=True)
+    for folder, _ in folders: db.list_user_recipes(user_id, folder=folder)
+
+def cached_rerun(store, user_id):
+    library = recipe_cache.get(store, user_id)
+    library.page(recipe_cache.FAVORITES, db.RECIPE_PAGE_SIZE)
+    for folder, _ in library.folders: library.page(recipe_cache.folder_list(folder), db.RECIPE_PAGE_SIZE)
+    return library
+
+def timed(label, fn, rounds):
+    t0 = time.perf_counter()
+    for _ in range(rounds): fn()
+    print(f"  {label:<28} {(time.perf_counter() - t0) / rounds * 1000:.3f}ms/재실행")
+
+def main():
+    n_recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_folders = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_NAME = os.path.join(tmp, "bench.db")
+        db.init_db()
+        user_id = seed(n_recipes, n_folders)
+        print(f"🏁 레시피 {n_recipes}개, 폴더 {n_folders}개")
+        store = {}
+        rounds = 200
+        timed("기존 (매번 조회)", lambda: old_rerun(user_id), rounds)
+        timed("캐시 (변경 없음)", lambda: cached_rerun(store, user_id), rounds)
+
+        # 매번 즐겨찾기를 바꾸는 최악의 경우: 쓰기 1번 + 폴더 목록과 목록마다 첫 페이지 다시 읽기
+        recipe_id = next(iter(store[recipe_cache.SESSION_KEY].by_id))
+        def write_then_rerun():
+            db.toggle_favorite(recipe_id, user_id, store[recipe_cache.SESSION_KEY].by_id[recipe_id]['is_favorite'])
+            cached_rerun(store, user_id)
+        timed("캐시 (매번 변경)", write_then_rerun, 20)
+        db.close_pool()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# bench_shopping.py
+# 레시피 수백 개를 한꺼번에 골랐을 때 장보기 목록(단위 맞춰 합치기)을 만드는 데 걸리는 시간을 잽니다.
+#   python bench_shopping.py [저장할 레시피 수] [고를 레시피 수]
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import database as db
+import quantity
+
+PANTRY = ["간장", "설탕", "다진마늘", "대파", "양파", "고춧가루", "참기름", "식용유", "돼지고기", "소고기", "계란", "두부",
+          "감자", "당근", "물", "소금", "후추", "굴소스", "고추장", "된장", "우유", "버터", "밀가루", "맛술"]
+AMOUNTS = ["1T", "2큰술", "1큰술반", "1t", "1/2작은술", "30ml", "200ml", "1컵", "1 1/2컵", "½컵", "1L",
+           "100g", "300g", "0.5kg", "1근", "1개", "2~3개", "½개", "3쪽", "1대", "한 줌", "두 꼬집", "약간", "적당량", ""]
+
+def seed(n_recipes):
+    db.add_user("bench", "pw", "벤치", "", "", "bench@lincook.kr", "", "")
+    user_id = db.check_login("bench", "pw")["id"]
+    rng = random.Random(42)
+    ids = []
+    with db.get_cursor(commit=True) as c:
+        for i in range(n_recipes):
+            ingredients = json.dumps([{"name": n, "amount": rng.choice(AMOUNTS)} for n in rng.sample(PANTRY, rng.randint(5, 12))],
+                                     ensure_ascii=False)
+            c.execute('INSERT INTO recipes (user_id, title, content, ingredients, created_at) VALUES (?, ?, ?, ?, ?)',
+                      (user_id, f"레시피 {i}", "", ingredients, f"2024-01-01 {i:08d}"))
+            ids.append(c.lastrowid)
+            db.index_recipe_ingredients(c, c.lastrowid, user_id, ingredients)
+    return user_id, ids
+
+def main():
+    n_recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_selected = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_NAME = os.path.join(tmp, "bench.db")
+        db.init_db()
+        t0 = time.perf_counter()
+        user_id, ids = seed(n_recipes)
+        print(f"🏁 레시피 {n_recipes}개 저장: {time.perf_counter() - t0:.1f}s | 수량 파서 캐시 {quantity.cache_info()}")
+
+        selected = random.Random(7).sample(ids, min(n_selected, len(ids)))
+        rounds = 10
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            items = db.get_shopping_list(selected, user_id)
+        ms = (time.perf_counter() - t0) / rounds * 1000
+        print(f"  레시피 {len(selected)}개 장보기: 재료 {len(items)}종 | {ms:.2f}ms/회")
+        for name, totals, leftovers in items[:5]:
+            print(f"    {name}: {quantity.format_amounts(totals, leftovers)}")
+
+        # DB 없이 수량 글자만 모아서 합치는 경로 (캐시가 데워진 상태)
+        amounts = [random.Random(i).choice(AMOUNTS) for i in range(n_selected * 8)]
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            quantity.aggregate(amounts)
+        ms = (time.perf_counter() - t0) / rounds * 1000
+        print(f"  수량 {len(amounts)}개 합치기(aggregate): {ms:.2f}ms/회")
+        db.close_pool()
+
+if __name__ == "__main__":
+    main()
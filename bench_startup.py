@@ -0,0 +1,57 @@
+# bench_startup.py
+# 로그인 화면까지 필요한 "불러오기 + DB 준비" 비용을 새 파이썬 프로세스에서 재서,
+# 예전 app.py(무거운 라이브러리 전부 즉시 import)와 지금(필요할 때 import)을 비교합니다.
+# 각 모드를 여러 번 돌려 중앙값 시간과 최대 RSS를 출력합니다. 설치되지 않은 패키지는 건너뛰고 따로 표시합니다.
+#   python bench_startup.py [반복 횟수]
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 예전 app.py 맨 위에서 로그인 화면 전에 불러오던 것들
+BASELINE_IMPORTS = ["streamlit", "streamlit_option_menu", "extra_streamlit_components", "google.generativeai",
+                    "requests", "yt_dlp", "instaloader", "bs4", "youtube_transcript_api",
+                    "youtube_transcript_api.formatters", "auth", "database"]
+# 지금 app.py가 로그인 화면 전에 불러오는 것들 (나머지는 쓸 때 불러옴)
+LAZY_IMPORTS = ["streamlit", "extra_streamlit_components", "auth", "database", "fridge", "ingest",
+                "link_preview", "url_canon", "chef"]
+
+CHILD = r'''
+import importlib, json, resource, sys, time
+t0 = time.perf_counter()
+missing = []
+for name in sys.argv[1].split(","):
+    try: importlib.import_module(name)
+    except ImportError as e: missing.append(f"{name} ({e.name})")
+import database
+database.get_pool()   # 첫 쿼리 때 하는 스키마 확인까지 포함
+elapsed = time.perf_counter() - t0
+print(json.dumps({"seconds": elapsed, "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "missing": missing}))
+'''
+
+def measure(modules, rounds, workdir):
+    env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    samples = []
+    for _ in range(rounds):
+        out = subprocess.run([sys.executable, "-c", CHILD, ",".join(modules)], cwd=workdir, env=env,
+                             capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as workdir:   # lincook.db가 임시 폴더에 생기도록
+        for label, modules in (("예전(즉시 import)", BASELINE_IMPORTS), ("지금(지연 import)", LAZY_IMPORTS)):
+            samples = measure(modules, rounds, workdir)
+            seconds = statistics.median(s["seconds"] for s in samples) * 1000
+            rss = max(s["rss_kb"] for s in samples) / 1024
+            print(f"[{label}] 중앙값 {seconds:.0f}ms | 최대 RSS {rss:.1f}MB")
+            if samples[0]["missing"]:
+                print(f"   ⚠️ 설치 안 된 모듈(측정에서 빠짐): {', '.join(samples[0]['missing'])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# bulk_import.py
+# 📦 여러 링크 한꺼번에 가져오기 (북마크 이사용)
+# 링크 목록을 받아서
+#   1) 정규화 + 중복/이미 저장된 링크 제거
+#   2) 도메인별 동시 접속 수를 제한하면서 추출 (인스타그램은 한 번에 하나, 유튜브는 넷...)
+#      추출은 화면 요청이 쓰는 ingest 공용 풀이 아니라 대량 가져오기 전용 풀에서 돌리고, 모든 가져오기를 합쳐
+#      BULK_EXTRACT_WORKERS개까지만 동시에 추출합니다. (큰 가져오기가 한 링크 저장을 굶기지 않도록)
+#   3) Gemini 호출은 공용 호출 한도(rate_limit.py) 안에서, 화면 요청에 양보하는 BULK 우선순위로
+#   4) 결과는 BULK_COMMIT_SIZE개씩 한 트랜잭션으로 저장
+# 하고, 처리량(분당 링크 수)과 링크별 실패 이유를 BulkReport로 돌려줍니다.
+#   GOOGLE_API_KEY=... python bulk_import.py --user-id 1 links.txt   (파일 대신 - 를 주면 표준 입력)
+import json
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import database as db
+import ingest
+import link_preview
+import rate_limit
+import url_canon
+from chef import cook_recipe
+
+BULK_MAX_LINKS = 200
+BULK_EXTRACT_WORKERS = 6        # 추출 동시 실행 수 (진행 중인 모든 가져오기 합계)
+BULK_LLM_WORKERS = 2            # Gemini 동시 호출 수 (분당 한도는 rate_limit.py가 지킴)
+BULK_COMMIT_SIZE = 10           # 이만큼 모이면 한 트랜잭션으로 저장
+BULK_RESULT_TIMEOUT = 600       # 이만큼(초) 아무 링크도 끝나지 않으면 남은 링크를 실패로 처리하고 끝냄
+
+# 도메인(플랫폼)별 동시 추출 수. 여기 없는 사이트는 호스트마다 DEFAULT_DOMAIN_LIMIT개.
+DOMAIN_LIMITS = {"youtube": 4, "instagram": 1, "naver_blog": 3}
+DEFAULT_DOMAIN_LIMIT = 2
+
+URL_SPLIT_RE = re.compile(r'[\s,]+')
+
+# 링크 하나가 단계를 최대 둘(유튜브 자막 + 메타데이터) 동시에 돌리므로 풀 크기는 두 배. 슬롯이 먼저 막으니 풀에서 줄 서지 않습니다.
+_extract_slots = threading.Semaphore(BULK_EXTRACT_WORKERS)
+_ingest_executor = ThreadPoolExecutor(max_workers=BULK_EXTRACT_WORKERS * 2, thread_name_prefix="bulk-ingest")
+
+def parse_urls(text):
+    """붙여넣은 텍스트(줄바꿈/쉼표/공백 구분)에서 링크를 뽑아 ([CanonicalURL, ...], [잘못된 링크, ...])로 돌려줍니다. 중복은 하나만."""
+    links, invalid, seen = [], [], set()
+    for token in URL_SPLIT_RE.split(text or ""):
+        if not token: continue
+        # 붙여넣은 메모 속 일반 단어는 canonicalize가 점(.) 없는 호스트라 None으로 돌려줍니다.
+        canon = url_canon.canonicalize(token)
+        if canon is None:
+            invalid.append(token)
+            continue
+        key = f"{canon.platform}:{canon.canonical_id}"
+        if key in seen: continue
+        seen.add(key)
+        links.append(canon)
+    return links, invalid
+
+def domain_key(canon):
+    if canon.platform in DOMAIN_LIMITS: return canon.platform
+    return urlsplit(canon.canonical_url).hostname or canon.platform
+
+@dataclass
+class BulkReport:
+    total: int = 0
+    saved: list = field(default_factory=list)        # 새로 저장된 레시피 id
+    skipped: list = field(default_factory=list)      # 이미 요리책에 있던 링크
+    failures: list = field(default_factory=list)     # [(링크, 이유), ...]
+    started_at: float = field(default_factory=time.time)
+    finished_at: float = None
+
+    @property
+    def processed(self):
+        return len(self.saved) + len(self.skipped) + len(self.failures)
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def links_per_minute(self):
+        return self.processed / self.elapsed * 60 if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.processed}/{self.total}개 처리 | 저장 {len(self.saved)} · 이미 있음 {len(self.skipped)} · 실패 {len(self.failures)}"
+                f" | {self.elapsed:.0f}초, 분당 {self.links_per_minute:.1f}개")
+
+# ==========================================
+# 가져오기 실행
+# ==========================================
+
+class BulkImport:
+    def __init__(self, user_id, links, model, invalid=()):
+        self.user_id = user_id
+        self.links = links[:BULK_MAX_LINKS]
+        self.model = model
+        self.report = BulkReport(total=len(self.links) + len(invalid))
+        self.report.failures.extend((url, "올바른 링크가 아닙니다.") for url in invalid)
+        self.report.failures.extend((canon.canonical_url, f"한 번에 {BULK_MAX_LINKS}개까지만 가져올 수 있어요.")
+                                    for canon in links[BULK_MAX_LINKS:])
+        self.report.total += len(links[BULK_MAX_LINKS:])
+        self.done = threading.Event()
+        self._domain_slots = {}
+        self._results = queue.Queue()
+
+    def _slot(self, canon):
+        key = domain_key(canon)
+        return self._domain_slots.setdefault(key, threading.Semaphore(DOMAIN_LIMITS.get(key, DEFAULT_DOMAIN_LIMIT)))
+
+    def _extract(self, canon, cook_pool):
+        # 어디서 실패하든 결과 하나는 꼭 넣어야 run()이 이 링크를 기다리다 멈추지 않습니다.
+        try:
+            with self._slot(canon), _extract_slots:
+                result = ingest.ingest(canon.canonical_url, executor=_ingest_executor)
+            if not result.ok:
+                self._results.put((canon, None, result.source_type))
+            elif result.structured:
+                # 레시피 마크업이 있는 페이지는 AI 대기열을 거치지 않고 바로 저장 대기열로
+                self._put_recipe(canon, result, result.structured)
+            elif self.model is None:
+                self._results.put((canon, None, "AI 모델을 불러올 수 없어요. API 키 설정을 확인해주세요."))
+            else:
+                cook_pool.submit(self._cook, canon, result)
+        except Exception as e:
+            self._results.put((canon, None, f"추출 오류: {e}"))
+
+    def _put_recipe(self, canon, result, data):
+        preview = result.link_preview or link_preview.fetch_og_metadata(canon.canonical_url)
+        self._results.put((canon, {
+            "title": data.get('title'), "content": data.get('markdown_content'),
+            "source_url": canon.canonical_url, "source_type": result.source_type,
+            "cuisine_type": data.get('cuisine_type'), "dish_type": data.get('dish_type'),
+            "ingredients": json.dumps(data.get('ingredients'), ensure_ascii=False), "link_preview": preview,
+        }, None))
+
+    def _cook(self, canon, result):
+        try:
+            data = cook_recipe(result.raw_text, result.source_type, self.model, priority=rate_limit.BULK)
+            if not data:
+                self._results.put((canon, None, "AI가 내용을 분석하지 못했어요."))
+                return
+            self._put_recipe(canon, result, data)
+        except Exception as e:
+            self._results.put((canon, None, f"AI 분석 오류: {e}"))
+
+    def _flush(self, batch):
+        if not batch: return
+        try:
+            self.report.saved.extend(db.add_recipes(self.user_id, batch))
+        except Exception as e:
+            self.report.failures.extend((row['source_url'], f"저장 오류: {e}") for row in batch)
+        batch.clear()
+
+    def run(self):
+        try:
+            saved_keys = db.find_saved_canonical_keys(self.user_id, [url_canon.canonical_key(c.canonical_url) for c in self.links])
+            todo = []
+            for canon in self.links:
+                if url_canon.canonical_key(canon.canonical_url) in saved_keys: self.report.skipped.append(canon.canonical_url)
+                else: todo.append(canon)
+
+            extract_pool = ThreadPoolExecutor(BULK_EXTRACT_WORKERS, thread_name_prefix="bulk-extract")
+            cook_pool = ThreadPoolExecutor(BULK_LLM_WORKERS, thread_name_prefix="bulk-cook")
+            pending, stalled = {canon.canonical_url for canon in todo}, False
+            try:
+                for canon in todo:
+                    extract_pool.submit(self._extract, canon, cook_pool)
+                batch = []
+                while pending:
+                    try:
+                        canon, row, reason = self._results.get(timeout=BULK_RESULT_TIMEOUT)
+                    except queue.Empty:
+                        # 최후의 안전장치: 한참 동안 아무 결과도 없으면 남은 링크를 실패로 돌리고 끝냅니다.
+                        stalled = True
+                        self.report.failures.extend((url, "처리 시간이 너무 오래 걸려 멈췄어요.") for url in sorted(pending))
+                        break
+                    if canon.canonical_url not in pending: continue
+                    pending.discard(canon.canonical_url)
+                    if row is None: self.report.failures.append((canon.canonical_url, reason))
+                    else:
+                        batch.append(row)
+                        if len(batch) >= BULK_COMMIT_SIZE: self._flush(batch)
+                self._flush(batch)
+            finally:
+                # 멈춘 경우엔 남은 작업을 기다리지 않습니다. (늦게 온 결과는 버려짐)
+                for pool in (extract_pool, cook_pool): pool.shutdown(wait=not stalled, cancel_futures=stalled)
+        finally:
+            self.report.finished_at = time.time()
+            self.done.set()
+        return self.report
+
+# ==========================================
+# 화면용: 유저당 하나씩 백그라운드로 실행
+# ==========================================
+_imports = {}
+_imports_lock = threading.Lock()
+
+def start(user_id, text, model_factory):
+    """백그라운드 스레드로 가져오기를 시작하고 BulkImport를 돌려줍니다. 이미 진행 중이면 그것을 돌려줍니다."""
+    with _imports_lock:
+        running = _imports.get(user_id)
+        if running and not running.done.is_set(): return running
+        links, invalid = parse_urls(text)
+        job = BulkImport(user_id, links, model_factory() if links else None, invalid)
+        _imports[user_id] = job
+    threading.Thread(target=job.run, name=f"bulk-import-{user_id}", daemon=True).start()
+    return job
+
+def get(user_id):
+    return _imports.get(user_id)
+
+def dismiss(user_id):
+    with _imports_lock:
+        job = _imports.get(user_id)
+        if job and job.done.is_set(): del _imports[user_id]
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="링크 여러 개를 한꺼번에 요리책으로 가져옵니다.")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("file", help="링크 목록 파일 (한 줄에 하나, - 이면 표준 입력)")
+    args = parser.parse_args()
+
+    text = sys.stdin.read() if args.file == "-" else open(args.file, encoding="utf-8").read()
+    links, invalid = parse_urls(text)
+    print(f"📦 링크 {len(links)}개 가져오기 시작 (잘못된 링크 {len(invalid)}개)")
+    from jobs import load_model_from_env
+    report = BulkImport(args.user_id, links, load_model_from_env() if links else None, invalid).run()
+    print("🏁 " + report.summary())
+    for url, reason in report.failures:
+        print(f"   ❌ {url}: {reason}")
@@ -0,0 +1,97 @@
+# check_fridge.py
+# 냉장고 검색의 비트맵 점수 계산(database.search_recipes_by_ingredients)이 SQL로 직접 합산한 결과와 같은지,
+# 레시피를 저장/수정/삭제한 바로 다음 검색에 그 변경이 보이는지 확인합니다.
+# 하나라도 어긋나면 종료 코드 1로 실패합니다.
+#   python check_fridge.py
+import json
+import os
+import random
+import sys
+import tempfile
+
+import database as db
+import fridge
+from bench_fridge import PANTRY
+
+QUERIES = ["대파, 계란, 스팸", "돼지고기, 김치", "감자, 당근, 양파", "새우, 버터", "두부", "게란, 파",
+           "대파, 계란, 스팸, 김치, 두부, 양파, 감자", "버터, 치즈, 우유, 떡"]
+
+def sql_search(user_id, candidates, limit):
+    """비교 기준: 입력 재료마다 가장 큰 가중치를 SQL로 더한 (id, 점수) 상위 limit개와 매칭 수"""
+    index = db.get_name_index()
+    matched = [(i, name_id, weight if score >= 1.0 else weight * db.ingredient_norm.TYPO_WEIGHT)
+               for i, term, weight, _ in candidates
+               for name_id, score in index.lookup(db.ingredient_norm.normalize(term))[:db.NAME_MATCH_LIMIT]]
+    if not matched: return [], 0
+    values = ','.join('(?, ?, ?)' for _ in matched)
+    with db.get_cursor() as c:
+        rows = c.execute(f'''
+            WITH cand(input, name_id, weight) AS (VALUES {values}),
+            best AS (
+                SELECT ri.recipe_id, cand.input, MAX(cand.weight) AS weight
+                FROM cand JOIN recipe_ingredients ri ON ri.user_id = ? AND ri.name_id = cand.name_id
+                GROUP BY ri.recipe_id, cand.input
+            )
+            SELECT recipe_id, SUM(weight) AS score, COUNT(*) OVER () FROM best
+            GROUP BY recipe_id ORDER BY score DESC, recipe_id DESC LIMIT ?''',
+            [p for row in matched for p in row] + [user_id, limit]).fetchall()
+    return [(recipe_id, round(score, 9)) for recipe_id, score, _ in rows], rows[0][2] if rows else 0
+
+def bitmap_search(user_id, query, limit=fridge.FRIDGE_TOP_K):
+    top, total = db.search_recipes_by_ingredients(user_id, fridge.expand_candidates(fridge.parse_fridge_input(query)), limit)
+    return [(recipe_id, round(score, 9)) for recipe_id, score, _ in top], total
+
+def same_as_sql(user_id):
+    return all(bitmap_search(user_id, query) ==
+               sql_search(user_id, fridge.expand_candidates(fridge.parse_fridge_input(query)), fridge.FRIDGE_TOP_K)
+               for query in QUERIES)
+
+def ingredients(*names):
+    return json.dumps([{"name": name, "amount": "1개"} for name in names], ensure_ascii=False)
+
+def main():
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_NAME = os.path.join(tmp, "check.db")
+        db.init_db()
+        db.add_user("check", "pw", "체크", "", "", "check@lincook.kr", "", "")
+        user_id = db.check_login("check", "pw")["id"]
+        db.add_user("other", "pw", "남", "", "", "other@lincook.kr", "", "")
+        other_id = db.check_login("other", "pw")["id"]
+
+        rng = random.Random(7)
+        with db.get_cursor(commit=True) as c:
+            for i in range(3000):
+                owner = user_id if rng.random() < 0.8 else other_id
+                recipe = ingredients(*rng.sample(PANTRY, rng.randint(2, 8)))
+                c.execute('INSERT INTO recipes (user_id, title, content, ingredients, created_at) VALUES (?, ?, ?, ?, ?)',
+                          (owner, f"레시피 {i}", "", recipe, f"2024-01-01 {i:08d}"))
+                db.index_recipe_ingredients(c, c.lastrowid, owner, recipe)
+        checks.append(("SQL 합산과 같은 순위/점수", same_as_sql(user_id)))
+        checks.append(("다른 유저도 SQL 합산과 같음", same_as_sql(other_id)))
+
+        mine = {recipe_id for recipe_id, _ in bitmap_search(user_id, "대파", 10 ** 6)[0]}
+        theirs = {recipe_id for recipe_id, _ in bitmap_search(other_id, "대파", 10 ** 6)[0]}
+        checks.append(("남의 레시피는 안 섞임", mine and theirs and not mine & theirs))
+
+        # 비트맵은 메모리에 남아 있으므로, 쓰기 직후 검색이 예전 비트맵을 쓰면 여기서 걸립니다.
+        new_id = db.add_recipe(user_id, "두부 트러플 조림", "", "", "", "", "", ingredients("두부", "트러플"))
+        checks.append(("저장 직후 검색에 보임", bitmap_search(user_id, "트러플")[0] == [(new_id, 1.0)]))
+        db.update_recipe(new_id, user_id, "두부 트러플 조림", "", "", "", ingredients("두부", "송로버섯"), "기본 폴더")
+        checks.append(("수정 직후 예전 재료로는 안 나옴", bitmap_search(user_id, "트러플") == ([], 0)))
+        checks.append(("수정 직후 새 재료로 나옴", bitmap_search(user_id, "송로버섯")[0] == [(new_id, 1.0)]))
+        top_id = bitmap_search(user_id, "대파, 계란")[0][0][0]
+        db.delete_recipe(top_id, user_id)
+        checks.append(("삭제 직후 검색에서 빠짐", top_id not in dict(bitmap_search(user_id, "대파, 계란", 10 ** 6)[0])))
+        checks.append(("변경 뒤에도 SQL 합산과 같음", same_as_sql(user_id)))
+        db.close_pool()
+
+    failures = [name for name, ok in checks if not ok]
+    for name in failures: print(f"❌ {name}")
+    if failures:
+        print(f"\n🚨 {len(failures)}/{len(checks)}개 실패")
+        sys.exit(1)
+    print(f"🎉 {len(checks)}개 모두 통과")
+
+if __name__ == "__main__":
+    main()
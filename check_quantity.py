@@ -0,0 +1,42 @@
+# check_quantity.py
+# quantity.parse_quantity가 수량 글자를 맞는 (값, 단위)로 읽는지, 장보기 합계가 맞는지 예시로 확인합니다.
+# 하나라도 어긋나면 종료 코드 1로 실패합니다.
+#   python check_quantity.py
+import sys
+
+import quantity
+
+# (수량 글자, 기대하는 Quantity 또는 None)
+CASES = [
+    ("1T", quantity.Quantity(1, "큰술")),
+    ("2TS", quantity.Quantity(2, "큰술")),        # 대문자 T는 큰술 (소문자로 바꿔 찾으면 작은술이 됨)
+    ("2Ts", quantity.Quantity(2, "큰술")),
+    ("1t", quantity.Quantity(1, "작은술")),
+    ("1ts", quantity.Quantity(1, "작은술")),
+    ("1tS", quantity.Quantity(1, "작은술")),
+    ("1TBS", quantity.Quantity(1, "큰술")),
+    ("1TSP", quantity.Quantity(1, "작은술")),
+    ("1 1/2컵", quantity.Quantity(1.5, "컵")),
+    ("½개", quantity.Quantity(0.5, "개")),
+    ("2~3쪽", quantity.Quantity(3, "쪽")),
+    ("1큰술반", quantity.Quantity(1.5, "큰술")),
+    ("한 줌", quantity.Quantity(1, "줌")),
+    ("30ML", quantity.Quantity(30, "ml")),
+    ("약간", None),
+    ("", None),
+]
+
+def main():
+    checks = [(f"'{amount}' -> {expected}", quantity.parse_quantity(amount) == expected) for amount, expected in CASES]
+    totals, leftovers = quantity.aggregate(["1T", "2TS", "1t", "30ml", "약간"])
+    checks.append(("큰술/작은술/ml 합계", [str(q) for q in totals] == ["80ml"] and leftovers == ["약간"]))
+
+    failures = [name for name, ok in checks if not ok]
+    for name in failures: print(f"❌ {name}")
+    if failures:
+        print(f"\n🚨 {len(failures)}/{len(checks)}개 실패")
+        sys.exit(1)
+    print(f"🎉 {len(checks)}개 모두 통과")
+
+if __name__ == "__main__":
+    main()
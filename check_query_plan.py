@@ -0,0 +1,83 @@
+# check_query_plan.py
+# database.py의 자주 쓰는 쿼리들이 인덱스를 타는지 EXPLAIN QUERY PLAN으로 확인합니다.
+# 하나라도 풀 스캔(SCAN)이나 임시 정렬(TEMP B-TREE)로 떨어지면 종료 코드 1로 실패합니다.
+#   python check_query_plan.py
+import os
+import sys
+import tempfile
+
+import database as db
+
+# (설명, SQL, 예시 파라미터) - database.py 쿼리를 바꾸면 여기도 같이 맞춰주세요.
+HOT_QUERIES = [
+    ("check_login", 'SELECT id, username, nickname, password FROM users WHERE username=?', ("id",)),
+    ("is_username_taken", 'SELECT 1 FROM users WHERE username=?', ("id",)),
+    ("is_nickname_taken", 'SELECT 1 FROM users WHERE nickname=?', ("닉네임",)),
+    ("find_username_by_email", 'SELECT username FROM users WHERE email=?', ("a@b.c",)),
+    ("reset_password", 'SELECT id FROM users WHERE username=? AND email=?', ("id", "a@b.c")),
+    ("get_user_by_token", 'SELECT u.id, u.username, u.nickname, s.expires_at, s.last_seen FROM sessions s JOIN users u ON u.id = s.user_id '
+                          'WHERE s.token_hash=? AND s.expires_at > ?', ("hash", 0.0)),
+    ("create_session(cap)", 'DELETE FROM sessions WHERE token_hash IN (SELECT token_hash FROM sessions WHERE user_id=? '
+                            'ORDER BY last_seen DESC LIMIT -1 OFFSET ?)', (1, 10)),
+    ("delete_user_sessions", 'DELETE FROM sessions WHERE user_id=?', (1,)),
+    ("purge_expired_sessions", 'DELETE FROM sessions WHERE token_hash IN (SELECT token_hash FROM sessions WHERE expires_at <= ? LIMIT ?)',
+                               (0.0, 500)),
+    ("get_user_info", 'SELECT id, username, nickname, email, address, birthdate, gender, created_at FROM users WHERE id=?', (1,)),
+    ("find_user_recipe_ids", 'SELECT id FROM recipes WHERE id IN (?, ?) AND +user_id=?', (1, 2, 1)),
+    ("get_user_recipes", 'SELECT * FROM recipes WHERE user_id=? ORDER BY created_at DESC', (1,)),
+    ("list_user_recipes", f'SELECT {db.RECIPE_SUMMARY_COLUMNS} FROM recipes WHERE user_id=? AND (created_at, id) < (?, ?) '
+                          'ORDER BY created_at DESC, id DESC LIMIT ?', (1, "2024-01-01 00:00:00", 1, 21)),
+    ("list_user_recipes(favorites)", f'SELECT {db.RECIPE_SUMMARY_COLUMNS} FROM recipes WHERE user_id=? AND is_favorite=1 '
+                                     'ORDER BY created_at DESC, id DESC LIMIT ?', (1, 21)),
+    ("list_user_recipes(folder)", f'SELECT {db.RECIPE_SUMMARY_COLUMNS} FROM recipes WHERE user_id=? AND folder_name=? '
+                                  'ORDER BY created_at DESC, id DESC LIMIT ?', (1, "기본 폴더", 21)),
+    ("get_data_version", 'SELECT data_version FROM users WHERE id=?', (1,)),
+    ("bump_data_version", 'UPDATE users SET data_version = data_version + 1 WHERE id=?', (1,)),
+    ("update_link_preview(owner)", 'SELECT user_id FROM recipes WHERE id=?', (1,)),
+    ("get_user_folders", 'SELECT folder_name, COUNT(*) FROM recipes WHERE user_id=? GROUP BY folder_name ORDER BY folder_name', (1,)),
+    ("find_recipe_by_url", 'SELECT * FROM recipes WHERE user_id=? AND canonical_key=?', (1, "youtube:D-qRiMK5w90")),
+    ("find_saved_canonical_keys", 'SELECT canonical_key FROM recipes WHERE user_id=? AND canonical_key IN (?, ?)',
+                                  (1, "youtube:D-qRiMK5w90", "web:https://example.com/")),
+    ("get_recipe", 'SELECT * FROM recipes WHERE id=? AND user_id=?', (1, 1)),
+    ("toggle_favorite", 'UPDATE recipes SET is_favorite=? WHERE id=? AND user_id=?', (1, 1, 1)),
+    ("delete_recipe", 'DELETE FROM recipes WHERE id=? AND user_id=?', (1, 1)),
+    ("delete_user_account", 'DELETE FROM recipes WHERE user_id=?', (1,)),
+    ("delete_user_account(ingredients)", 'DELETE FROM recipe_ingredients WHERE user_id=?', (1,)),
+    ("index_recipe_ingredients", 'DELETE FROM recipe_ingredients WHERE recipe_id=?', (1,)),
+    ("intern_ingredient_names", 'SELECT name, id FROM ingredient_names WHERE name IN (?, ?)', ("대파", "계란")),
+    ("get_recipes_by_ids", 'SELECT * FROM recipes WHERE id IN (?, ?) AND +user_id=?', (1, 2, 1)),
+    ("get_ingredient_bitmaps", 'SELECT name_id, recipe_id FROM recipe_ingredients WHERE user_id=? AND name_id IN (?, ?)', (1, 1, 2)),
+    ("get_recipe_ingredients", 'SELECT recipe_id, raw_name, raw_amount FROM recipe_ingredients '
+                               'WHERE recipe_id IN (?, ?) AND +user_id=? ORDER BY recipe_id, position', (1, 2, 1)),
+    ("claim_job", "SELECT * FROM jobs WHERE status='queued' AND run_after <= ? ORDER BY run_after LIMIT 1", (0.0,)),
+    ("claim_job(expired)", "SELECT * FROM jobs WHERE status='running' AND lease_until < ? AND attempts < max_attempts LIMIT 1", (0.0,)),
+    ("claim_job(exhausted)", "UPDATE jobs SET status='failed' WHERE status='running' AND lease_until < ? AND attempts >= max_attempts", (0.0,)),
+    ("enqueue_job", "SELECT id FROM jobs WHERE user_id=? AND canonical_key=? AND status IN ('queued', 'running')", (1, "web:x")),
+    ("list_user_jobs", 'SELECT * FROM jobs WHERE user_id=? ORDER BY created_at DESC, id DESC LIMIT ?', (1, 5)),
+]
+
+def find_bad_plans(cursor):
+    failures = []
+    for name, sql, params in HOT_QUERIES:
+        plan = [row[3] for row in cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+        bad = [step for step in plan if step.startswith("SCAN") or "TEMP B-TREE" in step]
+        if bad:
+            failures.append((name, plan))
+        print(f"{'❌' if bad else '✅'} {name}: {' / '.join(plan)}")
+    return failures
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_NAME = os.path.join(tmp, "plan.db")
+        db.init_db()
+        with db.get_cursor() as c:
+            failures = find_bad_plans(c)
+        db.close_pool()
+
+    if failures:
+        print(f"\n🚨 인덱스를 못 타는 쿼리 {len(failures)}개: {', '.join(name for name, _ in failures)}")
+        sys.exit(1)
+    print("\n🎉 모든 핵심 쿼리가 인덱스를 사용합니다.")
+
+if __name__ == "__main__":
+    main()
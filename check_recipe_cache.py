@@ -0,0 +1,54 @@
+# check_recipe_cache.py
+# 데이터 버전이 바뀌어 요리책 캐시(recipe_cache)를 새로 만든 직후에도 체크해둔 레시피 선택이 살아 있는지 확인합니다.
+# (새 캐시는 페이지를 읽기 전이라 비어 있으므로, 장보기/삭제가 빈 선택으로 돌면 안 됩니다.)
+# 하나라도 어긋나면 종료 코드 1로 실패합니다.
+#   python check_recipe_cache.py
+import os
+import sys
+import tempfile
+
+import database as db
+import recipe_cache
+
+def main():
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_NAME = os.path.join(tmp, "check.db")
+        db.init_db()
+        db.add_user("check", "pw", "체크", "", "", "check@lincook.kr", "", "")
+        user_id = db.check_login("check", "pw")["id"]
+        db.add_user("other", "pw", "남", "", "", "other@lincook.kr", "", "")
+        other_id = db.check_login("other", "pw")["id"]
+        with db.get_cursor(commit=True) as c:
+            c.executemany('INSERT INTO recipes (user_id, title, content, folder_name, created_at) VALUES (?, ?, ?, ?, ?)',
+                          [(user_id, f"레시피 {i}", "본문", "기본 폴더", f"2024-01-01 {i:08d}") for i in range(3 * db.RECIPE_PAGE_SIZE)])
+            other_recipe = c.execute('INSERT INTO recipes (user_id, title, content, folder_name, created_at) VALUES (?, ?, ?, ?, ?)',
+                                     (other_id, "남의 레시피", "본문", "기본 폴더", "2024-01-01")).lastrowid
+
+        store = {}
+        library = recipe_cache.get(store, user_id)
+        shown, _ = library.page(recipe_cache.folder_list("기본 폴더"), db.RECIPE_PAGE_SIZE)
+        checked = {shown[0]['id'], shown[1]['id']}
+        checks.append(("처음 화면의 선택", library.existing_ids(checked) == sorted(checked)))
+
+        # 즐겨찾기를 바꾸면 데이터 버전이 올라 다음 재실행에서 캐시를 새로 만듭니다.
+        db.toggle_favorite(shown[2]['id'], user_id, 0)
+        rebuilt = recipe_cache.get(store, user_id)
+        checks.append(("버전이 바뀌면 새 캐시", rebuilt is not library and not rebuilt.by_id))
+        checks.append(("새 캐시에서도 선택 유지", rebuilt.existing_ids(checked) == sorted(checked)))
+
+        db.delete_recipe(shown[0]['id'], user_id)
+        rebuilt = recipe_cache.get(store, user_id)
+        checks.append(("지운 레시피는 선택에서 빠짐", rebuilt.existing_ids(checked) == [shown[1]['id']]))
+        checks.append(("남의 레시피 id는 무시", rebuilt.existing_ids({other_recipe}) == []))
+        db.close_pool()
+
+    failures = [name for name, ok in checks if not ok]
+    for name in failures: print(f"❌ {name}")
+    if failures:
+        print(f"\n🚨 {len(failures)}/{len(checks)}개 실패")
+        sys.exit(1)
+    print(f"🎉 {len(checks)}개 모두 통과")
+
+if __name__ == "__main__":
+    main()
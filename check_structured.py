@@ -0,0 +1,72 @@
+# check_structured.py
+# structured.extract_recipe가 JSON-LD / microdata 레시피를 cook_recipe 결과 모양으로 바꾸는지 예시 페이지로 확인합니다.
+# 하나라도 어긋나면 종료 코드 1로 실패합니다.
+#   python check_structured.py
+import json
+import sys
+
+from bs4 import BeautifulSoup
+
+import structured
+
+JSON_LD = {"@context": "https://schema.org", "@graph": [
+    {"@type": "WebPage", "name": "블로그"},
+    {"@type": "Recipe", "name": "김치찌개", "recipeCuisine": "Korean", "recipeYield": "2인분",
+     "recipeIngredient": ["돼지고기 300g", "김치 1/4포기", "두부 1모"],
+     "recipeInstructions": [{"@type": "HowToStep", "text": "고기를 볶는다."}, {"@type": "HowToStep", "text": "김치를 넣고 끓인다."}]},
+]}
+MICRODATA = """
+<div itemscope itemtype="https://schema.org/Recipe">
+  <h1 itemprop="name">Tomato Pasta</h1>
+  <meta itemprop="recipeCuisine" content="Italian">
+  <li itemprop="recipeIngredient">200 g spaghetti</li>
+  <li itemprop="recipeIngredient">토마토 소스 1컵</li>
+  <p itemprop="recipeInstructions">Boil the pasta.</p>
+  <p itemprop="recipeInstructions">Add the sauce and stir.</p>
+</div>"""
+
+# (설명, HTML, 기대 제목(None이면 결과 없음), 기대 국적, 기대 종류, 기대 재료 수)
+CASES = [
+    ("JSON-LD @graph", f'<script type="application/ld+json">{json.dumps(JSON_LD, ensure_ascii=False)}</script>',
+     "김치찌개", "한식", "국/탕/찌개", 3),
+    ("JSON-LD 끝 쉼표", '<script type="application/ld+json">{"@type": "Recipe", "name": "계란말이", '
+     '"recipeIngredient": ["계란 3개",], "recipeInstructions": "1. 계란을 푼다. 2. 말아서 굽는다.",}</script>',
+     "계란말이", "기타", "기타", 1),
+    ("microdata", MICRODATA, "Tomato Pasta", "양식", "밥/면", 2),
+    ("조리 순서 없음", '<script type="application/ld+json">{"@type": "Recipe", "name": "라면", "recipeIngredient": ["라면 1봉"]}</script>',
+     None, None, None, None),
+    ("마크업 없음", "<p>그냥 블로그 글</p>", None, None, None, None),
+]
+
+# 수정 폼 저장/불러오기가 같은 재료 줄을 쓰므로, 숫자 없는 수량도 이름과 나눠야 합니다.
+SPLIT_CASES = [
+    ("돼지고기 300g", "돼지고기", "300g"),
+    ("후추 취향껏", "후추", "취향껏"),
+    ("소금 한 줌", "소금", "한 줌"),
+    ("양파 반 개", "양파", "반 개"),
+    ("참기름 조금", "참기름", "조금"),
+    ("소고기 한우", "소고기 한우", ""),
+    ("2 cups flour", "flour", "2 cups"),
+]
+
+def main():
+    failures = 0
+    for line, name, amount in SPLIT_CASES:
+        got = structured.split_ingredient(line)
+        if (got["name"], got["amount"]) != (name, amount):
+            failures += 1
+            print(f"❌ 재료 나누기 {line!r}: 기대 {(name, amount)} / 결과 {(got['name'], got['amount'])}")
+    for name, html, title, cuisine, dish, count in CASES:
+        recipe = structured.extract_recipe(BeautifulSoup(html, "html.parser"))
+        got = (recipe["title"], recipe["cuisine_type"], recipe["dish_type"], len(recipe["ingredients"])) if recipe else (None,) * 4
+        if got != (title, cuisine, dish, count):
+            failures += 1
+            print(f"❌ {name}: 기대 {(title, cuisine, dish, count)} / 결과 {got}")
+    print(f"📊 {structured.stats()}")
+    if failures:
+        print(f"\n🚨 {failures}/{len(CASES) + len(SPLIT_CASES)}개 실패")
+        sys.exit(1)
+    print(f"🎉 {len(CASES) + len(SPLIT_CASES)}개 모두 통과")
+
+if __name__ == "__main__":
+    main()
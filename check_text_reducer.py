@@ -0,0 +1,56 @@
+# check_text_reducer.py
+# text_reducer.reduce_text가 레시피 부분은 남기고 군더더기만 버리는지 예시 페이지로 확인합니다.
+# 하나라도 어긋나면 종료 코드 1로 실패합니다.
+#   python check_text_reducer.py
+import sys
+import time
+
+from text_reducer import estimate_tokens, reduce_text
+
+SIDEBAR = "\n".join(f"카테고리 {i}\n이전 글 보기\n공감 {i}\n댓글 {i}" for i in range(40))
+CHATTER = "\n".join(f"오늘은 날씨가 참 좋아서 산책을 다녀왔어요. 동네 카페 이야기 {i}번째입니다." for i in range(150))
+RECIPE = """[재료] 돼지고기 300g, 김치 1/4포기, 두부 1모, 대파 1대
+양념: 고춧가루 1큰술, 다진 마늘 1큰술, 국간장 2큰술
+1. 냄비에 돼지고기를 넣고 중불에서 5분 볶아주세요.
+2. 김치를 넣고 같이 볶다가 물 500ml를 부어 끓여주세요.
+3. 두부와 대파를 넣고 10분 더 끓이면 완성! 간장 조금 넣으면 좋아요"""
+PAGE = "김치찌개 황금레시피\n" + SIDEBAR + "\n" + CHATTER + "\n" + RECIPE + "\n" + SIDEBAR + "\n" + "[음악]\n" * 50
+TRANSCRIPT = "\n".join(["[음악]", "안녕하세요", "안녕하세요", "오늘은 계란말이", "계란 3개를 풀고", "[박수]"] * 30)
+
+BUDGET = 800
+
+def main():
+    checks = []
+    page = reduce_text(PAGE, BUDGET)
+    checks.append(("예산 이하", page.tokens_out <= BUDGET))
+    checks.append(("제목 유지", page.text.startswith("김치찌개 황금레시피")))
+    checks.append(("재료/조리 순서 유지", all(line in page.text for line in RECIPE.splitlines())))
+    checks.append(("사이드바 제거", "이전 글 보기" not in page.text and "공감 3" not in page.text))
+    checks.append(("잡담 대부분 버림", page.text.count("동네 카페") < 50))
+
+    transcript = reduce_text(TRANSCRIPT, BUDGET)
+    checks.append(("자막 효과음 제거", "[음악]" not in transcript.text and "[박수]" not in transcript.text))
+    checks.append(("자막 반복 줄 제거", transcript.text == "안녕하세요\n오늘은 계란말이\n계란 3개를 풀고"))
+
+    table = reduce_text("양념\n간장\n1큰술\n설탕\n1큰술\n참기름\n1큰술", BUDGET)
+    checks.append(("표 모양 재료의 수량 줄 유지", table.text.count("1큰술") == 3))
+
+    # 숫자가 길게 이어지다 글자로 끝나는 줄(날짜, 글 번호...)에서 정규식 역추적이 폭발하지 않아야 합니다.
+    started = time.perf_counter()
+    ids = reduce_text("2024.10.18 12345678901234567890 조회\n" + "1" * 5000 + "x\n" + "1." * 2000 + "조회", BUDGET)
+    checks.append(("긴 숫자 줄도 금방 끝남", time.perf_counter() - started < 1.0 and "조회" in ids.text))
+
+    short = reduce_text("떡볶이\n떡 200g\n고추장 2큰술", BUDGET)
+    checks.append(("짧은 글은 그대로", short.text == "떡볶이\n떡 200g\n고추장 2큰술"))
+
+    failures = [name for name, ok in checks if not ok]
+    for name in failures: print(f"❌ {name}")
+    print(f"📄 블로그 예시: {page.summary()}")
+    print(f"🎬 자막 예시: {transcript.summary()}")
+    if failures:
+        print(f"\n🚨 {len(failures)}/{len(checks)}개 실패")
+        sys.exit(1)
+    print(f"🎉 {len(checks)}개 모두 통과 (원문 {estimate_tokens(PAGE)}토큰)")
+
+if __name__ == "__main__":
+    main()
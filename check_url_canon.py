@@ -0,0 +1,58 @@
+# check_url_canon.py
+# url_canon.canonicalize 표 기반 점검. 하나라도 기대값과 다르면 종료 코드 1로 실패합니다.
+#   python check_url_canon.py
+import sys
+
+from url_canon import canonicalize
+
+# (입력 주소, 기대 플랫폼, 기대 id) - 기대 id가 None이면 canonicalize 결과 자체가 None이어야 함
+CASES = [
+    ("https://www.youtube.com/watch?v=D-qRiMK5w90", "youtube", "D-qRiMK5w90"),
+    ("https://youtube.com/watch?v=D-qRiMK5w90&t=3s", "youtube", "D-qRiMK5w90"),
+    ("https://m.youtube.com/watch?feature=share&v=D-qRiMK5w90", "youtube", "D-qRiMK5w90"),
+    ("https://youtu.be/D-qRiMK5w90", "youtube", "D-qRiMK5w90"),
+    ("https://youtu.be/D-qRiMK5w90?si=abcdEFGH", "youtube", "D-qRiMK5w90"),
+    ("youtu.be/D-qRiMK5w90", "youtube", "D-qRiMK5w90"),
+    ("https://www.youtube.com/shorts/D-qRiMK5w90", "youtube", "D-qRiMK5w90"),
+    ("https://youtube.com/shorts/D-qRiMK5w90?feature=share", "youtube", "D-qRiMK5w90"),
+    ("https://www.youtube.com/embed/D-qRiMK5w90", "youtube", "D-qRiMK5w90"),
+    ("https://www.youtube.com/live/D-qRiMK5w90", "youtube", "D-qRiMK5w90"),
+    ("https://www.instagram.com/p/C1a2B3c4D5e/", "instagram", "C1a2B3c4D5e"),
+    ("https://instagram.com/reel/C1a2B3c4D5e?igsh=xyz", "instagram", "C1a2B3c4D5e"),
+    ("https://www.instagram.com/reels/C1a2B3c4D5e/", "instagram", "C1a2B3c4D5e"),
+    ("https://www.instagram.com/chef_kim/p/C1a2B3c4D5e/", "instagram", "C1a2B3c4D5e"),
+    ("https://blog.naver.com/cookinglover/223456789012", "naver_blog", "cookinglover/223456789012"),
+    ("https://m.blog.naver.com/cookinglover/223456789012?referrerCode=1", "naver_blog", "cookinglover/223456789012"),
+    ("https://blog.naver.com/PostView.naver?blogId=cookinglover&logNo=223456789012", "naver_blog", "cookinglover/223456789012"),
+    ("https://blog.naver.com/PostView.nhn?logNo=223456789012&blogId=cookinglover", "naver_blog", "cookinglover/223456789012"),
+    ("https://www.10000recipe.com/recipe/6903394?utm_source=kakao", "web", "https://10000recipe.com/recipe/6903394"),
+    ("http://10000recipe.com/recipe/6903394/#comments", "web", "https://10000recipe.com/recipe/6903394"),
+    ("https://Example.com/a?b=2&a=1&fbclid=zzz", "web", "https://example.com/a?a=1&b=2"),
+    ("https://www.youtube.com/@paik_jongwon", "web", "https://youtube.com/@paik_jongwon"),
+    ("https://Example.com:8080/a", "web", "https://example.com:8080/a"),
+    ("", None, None),
+    ("   ", None, None),
+    ("hello", None, None),
+    ("localhost/recipe", None, None),
+    ("example.com:abc", None, None),
+    ("https://a.com:99999/x", None, None),
+    ("http://[::1", None, None),
+    ("http://[::1]:8080/recipe", "web", "https://[::1]:8080/recipe"),
+]
+
+def main():
+    failures = 0
+    for url, platform, canonical_id in CASES:
+        result = canonicalize(url)
+        got = (result.platform, result.canonical_id) if result else (None, None)
+        ok = got == (platform, canonical_id)
+        if not ok:
+            failures += 1
+            print(f"❌ {url!r}: 기대 {(platform, canonical_id)} / 결과 {got}")
+    if failures:
+        print(f"\n🚨 {failures}/{len(CASES)}개 실패")
+        sys.exit(1)
+    print(f"🎉 {len(CASES)}개 모두 통과")
+
+if __name__ == "__main__":
+    main()
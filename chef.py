@@ -0,0 +1,96 @@
+# chef.py
+# 👨‍🍳 스마트 셰프 (Gemini 레시피 분석)
+import json
+import time
+
+import llm_cache
+import partial_json
+import rate_limit
+import text_reducer
+
+# 프롬프트나 출력 형식을 바꾸면 이 숫자를 올리세요. (캐시된 예전 결과가 무효화됩니다)
+PROMPT_VERSION = 3
+PROMPT_TOKEN_BUDGET = 6000      # 원문은 text_reducer로 이 토큰 수 안에 들어가게 줄여서 보냅니다.
+GEMINI_MODEL_NAME = 'gemini-1.5-flash'
+STREAM_UPDATE_INTERVAL = 0.5    # 스트리밍 중 on_partial을 부르는 최소 간격(초)
+
+def build_prompt(raw_text, source_type):
+    return f"""
+        당신은 '링쿡(Lincook)'의 스마트 셰프입니다.
+        아래 텍스트({source_type})를 분석해서 다음 정보를 JSON 형식으로 추출하세요.
+        [분석할 텍스트] {raw_text}
+        [작성 규칙] (키는 반드시 아래 순서대로 쓰세요)
+        1. title: 요리 제목 (명사형)
+        2. cuisine_type: 국적 (한식, 중식, 일식, 양식, 아시안, 퓨전, 기타)
+        3. dish_type: 종류 (국/탕/찌개, 구이/스테이크, 볶음, 튀김, 찜/조림, 밥/면, 샐러드, 디저트, 기타)
+        4. ingredients: [{{"name": "재료명", "amount": "수량"}}, ...] (수량은 분수, 영문단위 붙여쓰기)
+        5. markdown_content: 2인분 기준 상세 레시피 (마크다운)
+        응답은 오직 JSON 형식으로만 주세요.
+        """
+
+def get_model_name(model):
+    return getattr(model, 'model_name', None) or type(model).__name__
+
+def stream_response(response, on_partial, timings, started):
+    """스트리밍 응답 조각을 끝까지 읽으면서, 지금까지 도착한 필드를 on_partial(fields)로 넘깁니다."""
+    parser = partial_json.PartialJSON()
+    last_update = 0.0
+    for chunk in response:
+        fields = parser.feed(chunk.text or "")
+        if "llm_first_content" not in timings and any(isinstance(v, str) and v for v in fields.values()):
+            timings["llm_first_content"] = time.perf_counter() - started
+        now = time.perf_counter()
+        if fields and now - last_update >= STREAM_UPDATE_INTERVAL:
+            on_partial(dict(fields))
+            last_update = now
+    return response
+
+def cook_recipe(raw_text, source_type, model, use_cache=True, priority=rate_limit.INTERACTIVE, on_partial=None, timings=None):
+    """
+    priority: 화면에서 링크 하나를 변환하면 INTERACTIVE, 여러 링크 가져오기는 BULK (rate_limit.py)
+    on_partial: 주면 스트리밍으로 받으면서 도착한 필드(title -> ingredients -> markdown_content 순)를 넘겨줍니다.
+    timings: 주면 llm_first_content(첫 내용까지), llm_total(전체) 초를 채웁니다. (캐시에서 나오면 둘 다 없음)
+    """
+    timings = {} if timings is None else timings
+    reduced = text_reducer.reduce_text(raw_text, PROMPT_TOKEN_BUDGET)
+    prompt_text = reduced.text
+    print(f"✂️ 원문 줄이기: {reduced.summary()}")
+    cache_key = llm_cache.make_key(prompt_text, source_type, PROMPT_VERSION, get_model_name(model))
+    if use_cache:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        prompt = build_prompt(prompt_text, source_type)
+        generation_config = {"response_mime_type": "application/json"}
+
+        def generate():
+            timings.pop("llm_first_content", None)   # 재시도하면 처음부터 다시 잼
+            started = time.perf_counter()
+            if on_partial is None:
+                response = model.generate_content(prompt, generation_config=generation_config)
+            else:
+                response = stream_response(model.generate_content(prompt, generation_config=generation_config, stream=True),
+                                           on_partial, timings, started)
+            timings["llm_total"] = time.perf_counter() - started
+            return response
+
+        # 호출 한도 안에서 부르고, 429/5xx면 잠시 쉬었다가 다시 시도합니다.
+        response = rate_limit.call_with_retry(generate, prompt, priority)
+        if on_partial is not None:
+            print(f"⏱️ Gemini 첫 내용 {timings.get('llm_first_content', 0):.2f}s / 전체 {timings['llm_total']:.2f}s")
+        
+        # [안전장치 1] 응답 텍스트에서 불필요한 마크다운 기호 제거 (가끔 AI가 ```json 을 붙여서 줌)
+        clean_text = response.text.replace("```json", "").replace("```", "").strip()
+        
+        data = json.loads(clean_text)
+
+    except Exception as e:
+        # [안전장치 2] 에러가 발생하면 빨간 박스 대신 콘솔에 이유를 출력하고 None을 반환
+        print(f"⚠️ 레시피 생성 중 오류 발생: {e}")
+        return None
+
+    if use_cache:
+        llm_cache.put(cache_key, data)
+    return data
@@ -0,0 +1,154 @@
+# credentials.py
+# 🔑 비밀번호 해시/검증 (scrypt 또는 PBKDF2, 표준 라이브러리만 사용)
+# 저장 형식: "scrypt$n$r$p$소금$해시", "pbkdf2_sha256$반복횟수$소금$해시" (소금/해시는 base64)
+# 해시 계산은 일부러 무거운 작업(수십 ms)이라, 개수가 정해진 스레드 풀(HASH_WORKERS)에서만 돌립니다.
+#   - hashlib.scrypt / pbkdf2_hmac은 계산하는 동안 GIL을 놓으므로 스레드로도 여러 코어를 씁니다.
+#   - 로그인이 한꺼번에 몰려도 동시에 도는 해시는 HASH_WORKERS개뿐이라, 다른 화면의 스크립트 스레드가 CPU를 빼앗기지 않습니다.
+#   - 대기열도 HASH_MAX_PENDING개까지만 받고, 넘치면 자리가 날 때까지 제출하는 쪽이 기다립니다.
+# 비용(N, 반복 횟수)을 바꾸면 예전 설정으로 저장된 비밀번호는 다음 로그인 때 새 설정으로 다시 저장합니다. (needs_rehash)
+# 해시가 아닌 예전 평문 비밀번호는 마이그레이션(migrations.py v16)이 로그인을 기다리지 않고 해시로 바꿉니다.
+# (그 전에 로그인하면 평문과 비교하고, 그때 해시로 바꿔 저장합니다.)
+#   LINCOOK_PASSWORD_SCHEME=scrypt|pbkdf2_sha256, LINCOOK_SCRYPT_N, LINCOOK_SCRYPT_R, LINCOOK_SCRYPT_P,
+#   LINCOOK_PBKDF2_ITERATIONS, LINCOOK_HASH_WORKERS
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEME = os.environ.get("LINCOOK_PASSWORD_SCHEME", "scrypt")
+SCRYPT_N = int(os.environ.get("LINCOOK_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.environ.get("LINCOOK_SCRYPT_R", "8"))
+SCRYPT_P = int(os.environ.get("LINCOOK_SCRYPT_P", "1"))
+PBKDF2_ITERATIONS = int(os.environ.get("LINCOOK_PBKDF2_ITERATIONS", "600000"))
+HASH_WORKERS = int(os.environ.get("LINCOOK_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_MAX_PENDING = HASH_WORKERS * 8
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+def _b64(raw):
+    return base64.b64encode(raw).decode('ascii')
+
+def _unb64(text):
+    return base64.b64decode(text.encode('ascii'))
+
+def _scrypt(password, salt, n, r, p):
+    # maxmem: 기본값(32MB)은 N=2**15, r=8부터 모자라서 필요한 만큼 넉넉히 줍니다.
+    return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p, dklen=HASH_BYTES, maxmem=256 * n * r + (1 << 20))
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations, dklen=HASH_BYTES)
+
+def current_params():
+    """지금 설정으로 저장할 때의 (방식, 비용 파라미터...)"""
+    if SCHEME == "pbkdf2_sha256": return ("pbkdf2_sha256", PBKDF2_ITERATIONS)
+    return ("scrypt", SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+def _hash(password, params):
+    salt = secrets.token_bytes(SALT_BYTES)
+    if params[0] == "pbkdf2_sha256":
+        return f"pbkdf2_sha256${params[1]}${_b64(salt)}${_b64(_pbkdf2(password, salt, params[1]))}"
+    _, n, r, p = params
+    return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+def _parse(encoded):
+    """저장된 값 -> (파라미터, 소금, 해시), 해시 형식이 아니면(예전 평문) None"""
+    parts = (encoded or "").split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            return ("scrypt", int(parts[1]), int(parts[2]), int(parts[3])), _unb64(parts[4]), _unb64(parts[5])
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            return ("pbkdf2_sha256", int(parts[1])), _unb64(parts[2]), _unb64(parts[3])
+    except ValueError:
+        return None
+    return None
+
+def _verify(password, encoded):
+    parsed = _parse(encoded)
+    if parsed is None:
+        # 예전 평문 비밀번호
+        ok = hmac.compare_digest((password or "").encode('utf-8'), (encoded or "").encode('utf-8'))
+        return ok, ok
+    params, salt, expected = parsed
+    try:
+        if params[0] == "pbkdf2_sha256": actual = _pbkdf2(password, salt, params[1])
+        else: actual = _scrypt(password, salt, *params[1:])
+    except (ValueError, TypeError, OverflowError, MemoryError):
+        # 잘렸거나 망가진 해시 (N이 2의 거듭제곱이 아님, 반복 횟수 0 등): 맞지 않는 비밀번호로 처리
+        return False, False
+    ok = hmac.compare_digest(actual, expected)
+    return ok, ok and params != current_params()
+
+def needs_rehash(encoded):
+    parsed = _parse(encoded)
+    return parsed is None or parsed[0] != current_params()
+
+def is_hashed(encoded):
+    """저장된 값이 해시 형식인지 (False면 예전 평문)"""
+    return _parse(encoded) is not None
+
+# --- 해시 전용 스레드 풀 ---
+_executor = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(HASH_MAX_PENDING)
+
+# 없는 아이디로 로그인해도 있는 아이디와 같은 시간이 걸리도록 비교할 가짜 해시 (아이디 존재 여부가 응답 시간으로 새지 않게)
+# 첫 로그인 때 만들면 그 한 번이 눈에 띄게 느려서, 풀을 만들 때 바로 계산을 시작해둡니다. ((설정, Future))
+_dummy = None
+
+def _get_executor():
+    global _executor, _dummy
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="password-hash")
+                if _dummy is None: _dummy = (current_params(), _executor.submit(_hash, secrets.token_hex(8), current_params()))
+    return _executor
+
+def start():
+    """해시 풀을 미리 만들고 가짜 해시를 계산해둡니다. (앱 시작 때 한 번)"""
+    _get_executor()
+
+def _submit(fn, *args):
+    _pending.acquire()
+    try:
+        future = _get_executor().submit(fn, *args)
+    except Exception:
+        _pending.release()
+        raise
+    future.add_done_callback(lambda _: _pending.release())
+    return future
+
+def hash_password(password):
+    """비밀번호 -> 저장할 문자열 (지금 설정의 방식/비용)"""
+    return _submit(_hash, password, current_params()).result()
+
+def hash_passwords(passwords):
+    """여러 비밀번호를 풀에서 나눠 해시합니다. (마이그레이션용, 순서대로 돌려줌)"""
+    futures = [_submit(_hash, password, current_params()) for password in passwords]
+    return [future.result() for future in futures]
+
+def verify_password(password, encoded):
+    """(맞는지, 새 설정으로 다시 저장해야 하는지)"""
+    return _submit(_verify, password, encoded).result()
+
+def _dummy_hash():
+    global _dummy
+    executor = _get_executor()
+    with _executor_lock:
+        if _dummy is None or _dummy[0] != current_params():
+            _dummy = (current_params(), executor.submit(_hash, secrets.token_hex(8), current_params()))
+        future = _dummy[1]
+    return future.result()
+
+def verify_dummy(password):
+    verify_password(password, _dummy_hash())
+
+def shutdown():
+    """해시 풀을 닫습니다. 다음 해시 때 HASH_WORKERS개로 다시 만듭니다. (벤치마크/설정 변경용)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None: _executor.shutdown(wait=True)
+        _executor = None
@@ -1,252 +1,1075 @@
 import sqlite3
 import datetime
-import uuid
+import hashlib
+import json
+import re
+import secrets
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, wait as wait_futures
+from contextlib import contextmanager
+
+import credentials
+import ingredient_norm
+import migrations
+import quantity
+import url_canon
 
 DB_NAME = "lincook.db"
 
+# ==========================================
+# 0. 커넥션 풀 (WAL + 튜닝된 PRAGMA)
+# ==========================================
+# 매 함수마다 connect/close 하던 방식 대신, 한 번 연 커넥션을 풀에 돌려놓고 재사용합니다.
+# 같은 스레드 안에서 중첩 호출하면 이미 빌린 커넥션을 그대로 씁니다.
+POOL_SIZE = int(os.environ.get("LINCOOK_DB_POOL_SIZE", "8"))
+BUSY_TIMEOUT_MS = 5000
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",           # 읽기/쓰기 동시 진행 (database is locked 방지)
+    "PRAGMA synchronous=NORMAL",         # WAL에서는 NORMAL로도 안전, fsync 횟수 감소
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA cache_size=-16000",          # 페이지 캐시 약 16MB
+    "PRAGMA mmap_size=134217728",        # 128MB 메모리 맵 읽기
+    "PRAGMA temp_store=MEMORY",
+)
+
+class ConnectionPool:
+    def __init__(self, db_name, size=POOL_SIZE):
+        self.db_name = db_name
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=max(size, 1))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {"connects": 0, "checkouts": 0, "reuses": 0}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_name, check_same_thread=False, timeout=BUSY_TIMEOUT_MS / 1000)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        with self._lock:
+            self.stats["connects"] += 1
+        return conn
+
+    def _checkout(self):
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self.stats["reuses"] += 1
+        except queue.Empty:
+            conn = self._connect()
+        with self._lock:
+            self.stats["checkouts"] += 1
+        return conn
+
+    def _checkin(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if self.size <= 0:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            # 같은 스레드에서 중첩 호출 -> 이미 빌린 커넥션 재사용
+            yield held
+            return
+
+        conn = self._checkout()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._checkin(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    pool = _pool
+    # DB_NAME이 바뀌면(테스트/벤치마크) 풀을 새로 만듭니다.
+    if pool is None or pool.db_name != DB_NAME:
+        backfill = False
+        with _pool_lock:
+            if _pool is None or _pool.db_name != DB_NAME:
+                if _pool is not None:
+                    _pool.close()
+                new_pool = ConnectionPool(DB_NAME)
+                # 스키마 확인은 풀을 만들 때(프로세스/DB 파일당) 한 번만 하고, 끝나기 전에는 다른 스레드에 풀을 내주지 않습니다.
+                # 이미 쓰던 DB의 채우기(Backfill)는 여기서 기다리지 않고, 풀을 내준 뒤 백그라운드 스레드가 합니다.
+                with new_pool.connection() as conn:
+                    current, pending, _ = migrations.status(conn)
+                    if current and pending:
+                        print(f"🧱 {DB_NAME}: 스키마 v{current} -> v{pending[-1]} (채우기는 백그라운드에서 이어서 합니다)")
+                    migrations.migrate(conn, log=print if current else lambda message: None, defer_backfills=bool(current))
+                    backfill = bool(migrations.status(conn)[2])
+                _pool = new_pool
+            pool = _pool
+        if backfill: _start_backfills(pool.db_name)
+    return pool
+
+def _start_backfills(db_name):
+    """남은 채우기를 풀과 따로 연 커넥션으로 백그라운드에서 끝냅니다. 죽어도 다음 시작이나 CLI가 이어서 합니다."""
+    def run():
+        conn = sqlite3.connect(db_name, timeout=BUSY_TIMEOUT_MS / 1000)
+        try:
+            for pragma in CONNECTION_PRAGMAS: conn.execute(pragma)
+            migrations.run_backfills(conn, log=print)
+        except Exception as e:
+            print(f"⚠️ {db_name} 채우기 실패: {e} (python migrations.py {db_name} 로 이어서 할 수 있어요)")
+        finally:
+            conn.close()
+    threading.Thread(target=run, name="db-backfill", daemon=True).start()
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+def pool_stats():
+    return dict(get_pool().stats)
+
+@contextmanager
 def get_connection():
-    return sqlite3.connect(DB_NAME, check_same_thread=False)
+    with get_pool().connection() as conn:
+        yield conn
+
+@contextmanager
+def get_cursor(commit=False):
+    """풀에서 커넥션을 빌려 커서를 돌려줍니다. commit=True면 블록이 끝날 때 커밋, 에러 시 롤백."""
+    with get_connection() as conn:
+        c = conn.cursor()
+        try:
+            yield c
+            if commit:
+                conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            c.close()
 
 # ==========================================
 # 1. 초기화 함수 (테이블 생성)
 # ==========================================
+# 테이블/인덱스 정의와 버전별 업그레이드는 migrations.py에 있습니다.
 def init_db():
-    conn = get_connection()
-    c = conn.cursor()
-    
-    # users 테이블 (성별, 토큰 등 모든 필드 포함)
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            nickname TEXT,
-            email TEXT,
-            address TEXT,
-            birthdate TEXT,
-            gender TEXT,
-            profile_image TEXT,
-            token TEXT, 
-            created_at TEXT
-        )
-    ''')
-    
-    # recipes 테이블
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS recipes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            title TEXT,
-            content TEXT,
-            source_url TEXT,
-            source_type TEXT,
-            cuisine_type TEXT,
-            dish_type TEXT,
-            ingredients TEXT,
-            folder_name TEXT DEFAULT '기본 폴더',
-            is_favorite INTEGER DEFAULT 0,
-            created_at TEXT,
-            FOREIGN KEY(user_id) REFERENCES users(id)
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
-
-# 앱 시작 시 DB 체크
-init_db()
+    """스키마를 준비합니다. 첫 쿼리 때 get_pool()이 자동으로 한 번 실행하므로 직접 부를 필요는 없습니다."""
+    get_pool()
+
+# ==========================================
+# 1-2. 재료 테이블 (recipe_ingredients, v10)
+# ==========================================
+# 재료는 레시피마다 JSON 텍스트로도 남아 있지만(화면 표시용), 검색/장보기는 정규화된 행을 씁니다.
+#   ingredient_names: 정규화한 재료명 사전 ("다진 마늘" -> "다진마늘", "달걀" -> "계란", ingredient_norm.normalize)
+#   recipe_ingredients: 레시피의 재료 한 줄 = 한 행 (원래 이름, 수량 숫자, 단위, 원래 수량 글자)
+# 냉장고 검색어 -> 재료명 id는 프로세스마다 메모리에 둔 자모 n-gram 색인(get_name_index)에서 찾습니다.
+def parse_ingredients(ingredients):
+    """ingredients 컬럼(JSON 문자열 또는 구버전 텍스트)을 [(재료명, 수량 글자), ...]로 바꿉니다."""
+    if not ingredients: return []
+    if isinstance(ingredients, str):
+        try:
+            ingredients = json.loads(ingredients)
+        except ValueError:
+            # 구버전 데이터: "대파, 계란, 스팸" 같은 텍스트
+            return [(name.strip(), "") for name in re.split(r'[,\n]', ingredients) if name.strip()]
+    if not isinstance(ingredients, list): return []
+    items = []
+    for item in ingredients:
+        name, amount = (item.get('name'), item.get('amount')) if isinstance(item, dict) else (item, "")
+        name, amount = str(name or "").strip(), str(amount or "").strip()
+        if name: items.append((name, amount))
+    return items
+
+def _quantity_columns(amount):
+    """수량 글자 -> (quantity, unit) 컬럼 값. 숫자로 못 읽으면 (None, None)"""
+    q = quantity.parse_quantity(amount)
+    return (q.value, q.unit) if q else (None, None)
+
+def intern_ingredient_names(c, names):
+    """정규화한 재료명들의 id를 {이름: id}로 돌려줍니다. 처음 보는 이름은 사전에 추가합니다."""
+    names = set(names)
+    if not names: return {}
+    placeholders = ','.join('?' for _ in names)
+    ids = dict(c.execute(f'SELECT name, id FROM ingredient_names WHERE name IN ({placeholders})', list(names)).fetchall())
+    for name in names - ids.keys():
+        c.execute('INSERT INTO ingredient_names (name) VALUES (?)', (name,))
+        ids[name] = c.lastrowid
+    return ids
+
+def index_recipe_ingredients(c, recipe_id, user_id, ingredients):
+    """레시피의 recipe_ingredients 행을 ingredients 내용으로 다시 씁니다. (저장/수정 트랜잭션 안에서 호출)"""
+    c.execute('DELETE FROM recipe_ingredients WHERE recipe_id=?', (recipe_id,))
+    items = [(name, amount, ingredient_norm.normalize(name)) for name, amount in parse_ingredients(ingredients)]
+    items = [item for item in items if item[2]]
+    name_ids = intern_ingredient_names(c, [key for _, _, key in items])
+    c.executemany('''INSERT INTO recipe_ingredients (recipe_id, position, user_id, name_id, raw_name, quantity, unit, raw_amount)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                  [(recipe_id, position, user_id, name_ids[key], name, *_quantity_columns(amount), amount)
+                   for position, (name, amount, key) in enumerate(items)])
+
+def get_recipe_ingredients(recipe_ids, user_id):
+    """{recipe_id: [{"name", "amount"}, ...]} (저장된 순서대로)"""
+    if not recipe_ids: return {}
+    placeholders = ','.join('?' for _ in recipe_ids)
+    result = {rid: [] for rid in recipe_ids}
+    with get_cursor() as c:
+        # +user_id: (user_id, name_id) 인덱스로 유저 재료 전체를 훑지 않고 기본 키(recipe_id)로 찾게 합니다.
+        c.execute(f'''SELECT recipe_id, raw_name, raw_amount FROM recipe_ingredients
+                      WHERE recipe_id IN ({placeholders}) AND +user_id=? ORDER BY recipe_id, position''',
+                  list(recipe_ids) + [user_id])
+        for recipe_id, name, amount in c.fetchall():
+            result[recipe_id].append({"name": name, "amount": amount or ""})
+    return result
+
+def get_shopping_list(recipe_ids, user_id):
+    """
+    고른 레시피들의 재료를 정규화한 이름별로 묶어 [(재료명, [합계 Quantity...], [숫자 아닌 수량 글자...]), ...]를 돌려줍니다.
+    같은 단위끼리는 SQL에서 더하고, 큰술+ml, g+kg 같은 단위 환산은 quantity.combine이 합니다.
+    """
+    if not recipe_ids: return []
+    placeholders = ','.join('?' for _ in recipe_ids)
+    with get_cursor() as c:
+        c.execute(f'''SELECT ri.name_id, MIN(ri.raw_name), ri.unit, SUM(ri.quantity),
+                             group_concat(CASE WHEN ri.quantity IS NULL AND ri.raw_amount != '' THEN ri.raw_amount END, char(31))
+                      FROM recipe_ingredients ri JOIN ingredient_names n ON n.id = ri.name_id
+                      WHERE ri.recipe_id IN ({placeholders}) AND ri.user_id=?
+                      GROUP BY ri.name_id, ri.unit ORDER BY n.name''', list(recipe_ids) + [user_id])
+        rows = c.fetchall()
+    grouped = {}
+    for name_id, name, unit, total, others in rows:
+        entry = grouped.setdefault(name_id, [name, [], []])
+        if total is not None: entry[1].append(quantity.Quantity(total, unit))
+        for amount in (others or "").split("\x1f"):
+            if amount and amount not in entry[2]: entry[2].append(amount)
+    return [(name, quantity.combine(totals), leftovers) for name, totals, leftovers in grouped.values()]
+
+# --- 재료명 색인 (냉장고 검색어 -> ingredient_names.id) ---
+# 재료명은 지워지지 않고 id가 계속 늘어나므로, 검색할 때마다 마지막으로 읽은 id 뒤의 새 이름만 더 읽어옵니다.
+NAME_MATCH_LIMIT = 200          # 검색어 하나가 가리킬 수 있는 재료명 수 ("고기" 같은 넓은 검색어의 SQL 인자 수 제한)
+_name_index = None              # (풀, NgramIndex) - DB 파일이 바뀌면(풀이 바뀌면) 새로 만듭니다.
+_name_index_lock = threading.Lock()
+
+def get_name_index():
+    global _name_index
+    pool = get_pool()
+    with _name_index_lock:
+        if _name_index is None or _name_index[0] is not pool:
+            _name_index = (pool, ingredient_norm.NgramIndex())
+        index = _name_index[1]
+        with get_cursor() as c:
+            rows = c.execute('SELECT id, name FROM ingredient_names WHERE id > ? ORDER BY id', (index.max_id,)).fetchall()
+        for name_id, name in rows:
+            index.add(name_id, name)
+        return index
+
+def find_ingredient_name_ids(term, threshold=ingredient_norm.FUZZY_THRESHOLD):
+    """검색어와 맞는 재료명 [(id, 유사도), ...] (포함 관계 또는 자모 유사도 threshold 이상)"""
+    return get_name_index().lookup(ingredient_norm.normalize(term), threshold)
+
+# --- 재료명별 레시피 비트맵 (냉장고 검색 점수 계산) ---
+# 재료명 하나가 들어간 레시피들을 "recipe_id번째 비트가 1인 정수" 하나로 들고 있으면,
+# 합집합/교집합/차집합/개수 세기가 레시피 수만큼 도는 SQL 집계 대신 C로 도는 비트 연산 한 번으로 끝납니다.
+# 유저마다 (데이터 버전, {name_id: 비트맵})으로 두고, 검색에 나온 재료명만 처음 쓸 때 recipe_ingredients 색인에서 읽어옵니다.
+# 레시피가 바뀌면(데이터 버전(1-3)이 오르면) 그 유저의 비트맵은 버리고 다음 검색 때 필요한 것만 다시 읽습니다.
+# 전체 크기가 POSTINGS_CACHE_BYTES를 넘으면 가장 오래 검색하지 않은 유저부터 버립니다.
+POSTINGS_CACHE_BYTES = int(os.environ.get("LINCOOK_POSTINGS_CACHE_MB", "64")) * 1024 * 1024
+_postings = None                # (풀, OrderedDict(user_id -> [데이터 버전, {name_id: 비트맵}, 바이트 수]))
+_postings_bytes = 0
+_postings_lock = threading.Lock()
+
+def _recipe_bitmap(recipe_ids):
+    if not recipe_ids: return 0
+    bits = bytearray(max(recipe_ids) // 8 + 1)
+    for recipe_id in recipe_ids: bits[recipe_id >> 3] |= 1 << (recipe_id & 7)
+    return int.from_bytes(bits, 'little')
+
+def get_ingredient_bitmaps(user_id, name_ids):
+    """{name_id: 그 재료명이 들어간 user_id의 레시피 비트맵}"""
+    global _postings, _postings_bytes
+    pool = get_pool()
+    version = get_data_version(user_id)     # 비트맵보다 먼저 읽으므로, 읽은 비트맵은 항상 이 버전 이후의 데이터
+    with _postings_lock:
+        if _postings is None or _postings[0] is not pool:
+            _postings, _postings_bytes = (pool, OrderedDict()), 0
+        users = _postings[1]
+        entry = users.get(user_id)
+        if entry is None or entry[0] != version:
+            if entry: _postings_bytes -= entry[2]
+            entry = users[user_id] = [version, {}, 0]
+        users.move_to_end(user_id)
+        bitmaps = {name_id: entry[1].get(name_id) for name_id in name_ids}
+    missing = [name_id for name_id, bitmap in bitmaps.items() if bitmap is None]
+    if not missing: return bitmaps
+
+    recipe_ids = {name_id: [] for name_id in missing}
+    placeholders = ','.join('?' for _ in missing)
+    with get_cursor() as c:
+        for name_id, recipe_id in c.execute(f'SELECT name_id, recipe_id FROM recipe_ingredients '
+                                            f'WHERE user_id=? AND name_id IN ({placeholders})', [user_id] + missing):
+            recipe_ids[name_id].append(recipe_id)
+    loaded = {name_id: _recipe_bitmap(ids) for name_id, ids in recipe_ids.items()}
+    bitmaps.update(loaded)
+    size = sum((bitmap.bit_length() + 7) // 8 for bitmap in loaded.values())
+    with _postings_lock:
+        if _postings[0] is pool and users.get(user_id) is entry:
+            entry[1].update(loaded)
+            entry[2] += size
+            _postings_bytes += size
+            while _postings_bytes > POSTINGS_CACHE_BYTES and len(users) > 1:
+                _, evicted = users.popitem(last=False)
+                _postings_bytes -= evicted[2]
+    return bitmaps
+
+def search_recipes_by_ingredients(user_id, candidates, limit):
+    """
+    냉장고 검색 점수 계산 (fridge.py).
+    candidates: [(입력 번호, 검색어, 가중치, 표시 이름), ...] - 입력 재료마다 가중치 높은 후보부터
+    검색어마다 맞는 재료명 id를 색인에서 찾고, 입력 재료 하나당 레시피에 맞는 후보 중 가중치가 가장 큰 것
+    (같으면 앞선 것) 하나만 점수에 더해서 (점수, id) 큰 순으로
+    오타로 보고 유사도로만 맞춘 재료명은 가중치에 ingredient_norm.TYPO_WEIGHT를 곱하고 "이름(비슷한 이름)"으로 표시합니다.
+    ([(recipe_id, 점수, [표시 이름...]), ...], 매칭된 레시피 수)를 돌려줍니다.
+    """
+    index = get_name_index()
+    matched = [(i, rank, name_id, weight, label) if score >= 1.0 else
+               (i, rank, name_id, weight * ingredient_norm.TYPO_WEIGHT, f"{index.names[name_id]}(비슷한 이름)")
+               for rank, (i, term, weight, label) in enumerate(candidates)
+               for name_id, score in index.lookup(ingredient_norm.normalize(term))[:NAME_MATCH_LIMIT]]
+    if not matched: return [], 0
+    bitmaps = get_ingredient_bitmaps(user_id, list(dict.fromkeys(row[2] for row in matched)))
+
+    # 1) 입력 재료마다 가중치 단계별 비트맵: 더 큰 가중치로 이미 맞은 레시피는 작은 단계에서 뺍니다.
+    by_input = {}
+    for i, _, name_id, weight, _ in matched:
+        levels = by_input.setdefault(i, {})
+        levels[weight] = levels.get(weight, 0) | bitmaps[name_id]
+    inputs = []                 # [([(가중치, 비트맵), ...], 맞은 레시피 전체), ...]
+    for i in sorted(by_input):
+        seen, steps = 0, []
+        for weight in sorted(by_input[i], reverse=True):
+            step = by_input[i][weight] & ~seen
+            if step: steps.append((weight, step))
+            seen |= step
+        if seen: inputs.append((steps, seen))
+    union = 0
+    for _, seen in inputs: union |= seen
+    if not union: return [], 0
+
+    # 2) 점수별 비트맵: 입력을 하나씩 더하면서 {점수: 그 점수인 레시피} 를 (가중치 단계 하나 / 안 맞음)으로 나눕니다.
+    #    점수가 같아진 비트맵은 바로 합치므로, 입력이 늘어도 비트맵 수는 나올 수 있는 점수 종류만큼만 늘어납니다.
+    by_score = {0: union}
+    for steps, seen in inputs:
+        next_scores = {}
+        for score, bitmap in by_score.items():
+            for weight, step in steps + [(0, ~seen)]:
+                part = bitmap & step
+                if part: next_scores[score + weight] = next_scores.get(score + weight, 0) | part
+        by_score = next_scores
+
+    # 3) 상위 limit개: 점수 큰 비트맵부터 가장 높은 비트(= 가장 최근 id)를 하나씩 꺼냅니다.
+    top = []
+    for score in sorted(by_score, reverse=True):
+        bitmap = by_score[score]
+        while bitmap and len(top) < limit:
+            recipe_id = bitmap.bit_length() - 1
+            top.append((recipe_id, score))
+            bitmap ^= 1 << recipe_id
+        if len(top) >= limit: break
+
+    # 4) 표시 이름: 입력 재료마다 그 레시피에 맞은 후보 중 가장 앞선 것
+    labels = {recipe_id: [] for recipe_id, _ in top}
+    for i in sorted(by_input):
+        rows = [row for row in matched if row[0] == i]
+        for recipe_id, _ in top:
+            label = next((label for _, _, name_id, _, label in rows if bitmaps[name_id] >> recipe_id & 1), None)
+            if label is not None: labels[recipe_id].append(label)
+    return [(recipe_id, score, labels[recipe_id]) for recipe_id, score in top], union.bit_count()
+
+# ==========================================
+# 1-3. 유저별 데이터 버전 (recipe_cache.py)
+# ==========================================
+# 레시피/프로필을 바꾸는 함수는 모두 user_write() 또는 쓰기 큐(1-4)를 거치며, users.data_version을 같은 트랜잭션에서 +1 합니다.
+# 화면은 (user_id, 버전)이 같으면 지난번에 묶어둔 목록을 그대로 씁니다.
+# 버전 읽기도 매번 DB에 묻지 않도록 프로세스 메모리에 DATA_VERSION_TTL초 동안 둡니다.
+#   - 이 프로세스에서 쓴 변경: 커밋 직후 메모리 값을 지우므로 바로 다음 화면에서 보입니다.
+#   - 다른 프로세스(python jobs.py 워커 등)의 변경: 최대 DATA_VERSION_TTL초 뒤에 보입니다.
+DATA_VERSION_TTL = 2.0
+
+_data_versions = {}             # user_id -> (버전, 읽은 시각)
+_data_version_epochs = {}       # user_id -> 쓰기 횟수 (읽는 도중 쓰기가 끝났으면 읽은 값을 메모리에 두지 않음)
+_data_versions_lock = threading.Lock()
+
+def _forget_data_version(user_id):
+    with _data_versions_lock:
+        _data_versions.pop(user_id, None)
+        _data_version_epochs[user_id] = _data_version_epochs.get(user_id, 0) + 1
+
+def get_data_version(user_id):
+    wait_for_writes(user_id)          # 이 유저가 큐에 넣은 쓰기가 끝난 뒤의 버전 (1-4)
+    with _data_versions_lock:
+        cached = _data_versions.get(user_id)
+        if cached and time.monotonic() - cached[1] < DATA_VERSION_TTL: return cached[0]
+        epoch = _data_version_epochs.get(user_id, 0)
+    with get_cursor() as c:
+        row = c.execute('SELECT data_version FROM users WHERE id=?', (user_id,)).fetchone()
+    version = row[0] if row else 0
+    with _data_versions_lock:
+        if _data_version_epochs.get(user_id, 0) == epoch: _data_versions[user_id] = (version, time.monotonic())
+    return version
+
+@contextmanager
+def user_write(user_id):
+    """user_id의 데이터를 바꾸는 트랜잭션 커서. 같은 트랜잭션에서 data_version을 올리고, 끝나면 메모리의 버전을 지웁니다."""
+    _forget_data_version(user_id)
+    try:
+        with get_cursor(commit=True) as c:
+            yield c
+            c.execute('UPDATE users SET data_version = data_version + 1 WHERE id=?', (user_id,))
+    finally:
+        _forget_data_version(user_id)
+
+# ==========================================
+# 1-4. 그룹 커밋 쓰기 큐 (레시피 저장/수정/삭제/즐겨찾기)
+# ==========================================
+# 클릭마다 커넥션을 빌려 BEGIN/COMMIT 하면, 동시에 누른 사용자들이 SQLite 쓰기 잠금 하나를 두고 줄을 서고
+# 커밋 비용(WAL 쓰기, synchronous=FULL이면 fsync)도 클릭 수만큼 듭니다.
+# 그래서 레시피 변경은 쓰기 전용 스레드 하나가 큐에서 꺼내 처리합니다.
+#   - 큐에 쌓인 변경을 최대 GROUP_COMMIT_MAX개까지 한 트랜잭션으로 묶어 한 번만 커밋합니다.
+#   - 변경마다 SAVEPOINT를 걸어서, 하나가 실패해도 그 변경만 되돌리고 나머지는 커밋합니다.
+#   - 데이터 버전(1-3)도 같은 트랜잭션에서 유저마다 한 번씩 올립니다.
+# submit_write()는 Future를 돌려주고 커밋이 끝나야 결과가 채워집니다. run_write()는 그 결과를 기다립니다.
+# 읽기 일관성: 기다리지 않고 제출만 한 쓰기도 get_data_version()(= recipe_cache.get)이 그 유저의 쓰기가 끝날 때까지 기다리므로,
+# 같은 세션의 다음 화면에서는 항상 자기 변경이 보입니다.
+# LINCOOK_GROUP_COMMIT=0 이면 큐를 쓰지 않고 호출한 스레드에서 바로 커밋합니다. (예전 방식, 벤치마크 비교용)
+GROUP_COMMIT = os.environ.get("LINCOOK_GROUP_COMMIT", "1") != "0"
+GROUP_COMMIT_MAX = 128
+
+class WriteQueue:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._pending = {}            # user_id -> 아직 커밋 안 된 Future 집합
+        self.stats = {"batches": 0, "writes": 0, "failed": 0}
+
+    def submit(self, user_id, fn):
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("쓰기 큐 안에서 다른 쓰기를 제출할 수 없습니다.")
+        future = Future()
+        with self._lock:
+            self._pending.setdefault(user_id, set()).add(future)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="db-writer", daemon=True)
+                self._thread.start()
+        future.add_done_callback(lambda f: self._discard(user_id, f))
+        self._queue.put((user_id, fn, future))
+        return future
+
+    def _discard(self, user_id, future):
+        with self._lock:
+            pending = self._pending.get(user_id)
+            if pending is None: return
+            pending.discard(future)
+            if not pending: del self._pending[user_id]
+
+    def wait_for(self, user_id):
+        with self._lock:
+            pending = list(self._pending.get(user_id, ()))
+        if pending: wait_futures(pending)
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < GROUP_COMMIT_MAX:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._run(batch)
+
+    def _run(self, batch):
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch: return
+        user_ids = {user_id for user_id, _, _ in batch}
+        for user_id in user_ids: _forget_data_version(user_id)
+        outcomes, error = [], None
+        try:
+            with get_cursor(commit=True) as c:
+                c.execute('BEGIN IMMEDIATE')
+                changed = set()
+                for user_id, fn, future in batch:
+                    c.execute('SAVEPOINT queued_write')
+                    try:
+                        result = fn(c)
+                    except Exception as e:
+                        c.execute('ROLLBACK TO queued_write')
+                        c.execute('RELEASE queued_write')
+                        outcomes.append((future, None, e))
+                        continue
+                    c.execute('RELEASE queued_write')
+                    changed.add(user_id)
+                    outcomes.append((future, result, None))
+                c.executemany('UPDATE users SET data_version = data_version + 1 WHERE id=?', [(user_id,) for user_id in changed])
+        except Exception as e:
+            error = e          # 커밋 자체가 실패하면 묶음 전체가 실패
+        finally:
+            for user_id in user_ids: _forget_data_version(user_id)
+
+        with self._lock:
+            self.stats["batches"] += 1
+            self.stats["writes"] += len(batch)
+            self.stats["failed"] += len(batch) if error else sum(1 for _, _, e in outcomes if e)
+        if error:
+            for _, _, future in batch: future.set_exception(error)
+            return
+        for future, result, e in outcomes:
+            if e is None: future.set_result(result)
+            else: future.set_exception(e)
+
+_write_queue = WriteQueue()
+
+def submit_write(user_id, fn):
+    """fn(c)를 user_id의 쓰기로 큐에 넣고 Future를 돌려줍니다. (결과는 커밋 후에 채워짐)"""
+    if GROUP_COMMIT: return _write_queue.submit(user_id, fn)
+    future = Future()
+    try:
+        with user_write(user_id) as c:
+            future.set_result(fn(c))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def run_write(user_id, fn):
+    """submit_write 후 커밋까지 기다려 fn의 결과를 돌려줍니다. (실패하면 그 예외를 그대로 냅니다)"""
+    return submit_write(user_id, fn).result()
+
+def wait_for_writes(user_id):
+    """user_id로 제출된 쓰기가 모두 커밋(또는 실패)될 때까지 기다립니다."""
+    _write_queue.wait_for(user_id)
+
+def write_queue_stats():
+    return dict(_write_queue.stats)
 
 # ==========================================
 # 2. 사용자 관련 함수 (auth.py와 짝맞춤)
 # ==========================================
+# 비밀번호는 credentials.py로 해시해서 저장합니다. 해시 계산(수십 ms)은 트랜잭션 밖에서 해서 쓰기 잠금을 오래 잡지 않습니다.
 
 # [수정됨] auth.py에서 호출하는 add_user 함수 (인자 8개)
 def add_user(username, password, nickname, profile_image, birthdate, email, address, gender):
+    password_hash = credentials.hash_password(password)
     try:
-        conn = get_connection()
-        c = conn.cursor()
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        c.execute('''INSERT INTO users 
-                     (username, password, nickname, profile_image, birthdate, email, address, gender, created_at) 
-                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                  (username, password, nickname, profile_image, birthdate, email, address, gender, now))
-        conn.commit()
+        with get_cursor(commit=True) as c:
+            now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            c.execute('''INSERT INTO users 
+                         (username, password, nickname, profile_image, birthdate, email, address, gender, created_at) 
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                      (username, password_hash, nickname, profile_image, birthdate, email, address, gender, now))
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
 
 def check_login(username, password):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('SELECT * FROM users WHERE username=? AND password=?', (username, password))
-    user = c.fetchone()
-    conn.close()
-    if user:
-        # 딕셔너리로 변환해서 반환 (auth.py가 편하게 쓰도록)
-        return {
-            "id": user[0], "username": user[1], "nickname": user[3]
-        }
-    return None
+    with get_cursor() as c:
+        c.execute('SELECT id, username, nickname, password FROM users WHERE username=?', (username,))
+        user = c.fetchone()
+    if not user:
+        credentials.verify_dummy(password)   # 없는 아이디도 같은 시간이 걸리도록
+        return None
+    ok, rehash = credentials.verify_password(password, user[3])
+    if not ok: return None
+    if rehash:
+        # 예전 평문이거나 해시 비용 설정이 바뀐 경우: 지금 설정으로 다시 저장 (그 사이 비밀번호가 바뀌었으면 건드리지 않음)
+        new_hash = credentials.hash_password(password)
+        with get_cursor(commit=True) as c:
+            c.execute('UPDATE users SET password=? WHERE id=? AND password=?', (new_hash, user[0], user[3]))
+    # 딕셔너리로 변환해서 반환 (auth.py가 편하게 쓰도록)
+    return {
+        "id": user[0], "username": user[1], "nickname": user[2]
+    }
 
 def is_username_taken(username):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('SELECT 1 FROM users WHERE username=?', (username,))
-    result = c.fetchone()
-    conn.close()
+    with get_cursor() as c:
+        c.execute('SELECT 1 FROM users WHERE username=?', (username,))
+        result = c.fetchone()
     return result is not None
 
 def is_nickname_taken(nickname):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('SELECT 1 FROM users WHERE nickname=?', (nickname,))
-    result = c.fetchone()
-    conn.close()
+    with get_cursor() as c:
+        c.execute('SELECT 1 FROM users WHERE nickname=?', (nickname,))
+        result = c.fetchone()
     return result is not None
 
 # [추가됨] 아이디 찾기 기능
 def find_username_by_email(email):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('SELECT username FROM users WHERE email=?', (email,))
-    result = c.fetchone()
-    conn.close()
+    with get_cursor() as c:
+        c.execute('SELECT username FROM users WHERE email=?', (email,))
+        result = c.fetchone()
     return result[0] if result else None
 
 # [추가됨] 비밀번호 재설정 기능
 def reset_password(username, email, new_password):
-    conn = get_connection()
-    c = conn.cursor()
-    # 아이디와 이메일이 모두 일치하는지 확인
-    c.execute('SELECT 1 FROM users WHERE username=? AND email=?', (username, email))
-    if not c.fetchone():
-        conn.close()
+    with get_cursor() as c:
+        # 아이디와 이메일이 모두 일치하는지 확인
+        c.execute('SELECT id FROM users WHERE username=? AND email=?', (username, email))
+        row = c.fetchone()
+    if not row:
         return False
-    
-    c.execute('UPDATE users SET password=? WHERE username=?', (new_password, username))
-    conn.commit()
-    conn.close()
+
+    user_id, password_hash = row[0], credentials.hash_password(new_password)
+    with get_cursor(commit=True) as c:
+        c.execute('UPDATE users SET password=? WHERE id=?', (password_hash, user_id))
+        # 비밀번호가 바뀌면 로그인되어 있던 기기도 모두 로그아웃
+        c.execute('DELETE FROM sessions WHERE user_id=?', (user_id,))
+    _forget_sessions(user_id=user_id)
     return True
 
 # ==========================================
-# 3. 토큰 & 자동 로그인 관련
+# 3. 로그인 세션 & 자동 로그인 관련
 # ==========================================
+# 로그인할 때마다 sessions에 한 행을 만들어서 여러 기기에서 동시에 로그인할 수 있습니다.
+# 쿠키에는 원래 토큰을, DB에는 sha256 해시만 저장합니다. (DB가 새어도 쿠키를 만들 수 없음)
+# 토큰 -> 유저 조회는 프로세스 메모리의 LRU 캐시(SESSION_CACHE_SIZE개, SESSION_CACHE_TTL초)를 먼저 보고,
+# 없으면 token_hash 기본키로 한 번만 찾습니다. 로그아웃/비밀번호 변경은 이 프로세스의 캐시에서도 바로 지웁니다.
+# (다른 프로세스의 캐시에는 최대 SESSION_CACHE_TTL초 동안 남을 수 있어요)
+SESSION_TTL = 30 * 24 * 3600          # 쿠키 유효기간(30일)과 같게
+SESSION_TOUCH_INTERVAL = 3600         # last_seen은 한 시간에 한 번만 갱신 (조회마다 쓰기 방지)
+MAX_SESSIONS_PER_USER = 10            # 넘치면 가장 오래 안 쓴 기기부터 로그아웃
+SESSION_CACHE_SIZE = 1024
+SESSION_CACHE_TTL = 60.0
+SESSION_SWEEP_INTERVAL = 3600
+SESSION_SWEEP_BATCH = 500
+
+_session_cache = OrderedDict()        # token_hash -> (유저 dict, 캐시 만료 시각)
+_session_generation = 0               # 세션을 지울 때마다 +1 (지우는 도중에 읽은 결과는 캐시에 넣지 않음)
+_session_lock = threading.Lock()
+
+def hash_token(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
 
-def update_auth_token(user_id):
-    conn = get_connection()
-    c = conn.cursor()
-    new_token = str(uuid.uuid4()) # 랜덤 토큰 생성
-    c.execute('UPDATE users SET token=? WHERE id=?', (new_token, user_id))
-    conn.commit()
-    conn.close()
-    return new_token
+def _forget_sessions(user_id=None, token_hash=None):
+    global _session_generation
+    with _session_lock:
+        _session_generation += 1
+        if token_hash is not None: _session_cache.pop(token_hash, None)
+        if user_id is not None:
+            for key in [key for key, (user, _) in _session_cache.items() if user['id'] == user_id]:
+                del _session_cache[key]
+
+def create_session(user_id):
+    """새 세션을 만들고 쿠키에 넣을 토큰을 돌려줍니다."""
+    token = secrets.token_urlsafe(32)
+    now = time.time()
+    with get_cursor(commit=True) as c:
+        c.execute('INSERT INTO sessions (token_hash, user_id, created_at, expires_at, last_seen) VALUES (?, ?, ?, ?, ?)',
+                  (hash_token(token), user_id, now, now + SESSION_TTL, now))
+        c.execute('''DELETE FROM sessions WHERE token_hash IN
+                     (SELECT token_hash FROM sessions WHERE user_id=? ORDER BY last_seen DESC LIMIT -1 OFFSET ?)''',
+                  (user_id, MAX_SESSIONS_PER_USER))
+        evicted = c.rowcount
+    if evicted: _forget_sessions(user_id=user_id)
+    return token
 
 def get_user_by_token(token):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('SELECT * FROM users WHERE token=?', (token,))
-    user = c.fetchone()
-    conn.close()
-    if user:
-        return {
-            "id": user[0], "username": user[1], "nickname": user[3]
-        }
-    return None
+    if not token: return None
+    key, now = hash_token(token), time.time()
+    with _session_lock:
+        cached = _session_cache.get(key)
+        if cached and cached[1] > now:
+            _session_cache.move_to_end(key)
+            return dict(cached[0])
+        if cached: del _session_cache[key]
+        generation = _session_generation
+
+    with get_cursor() as c:
+        c.execute('''SELECT u.id, u.username, u.nickname, s.expires_at, s.last_seen
+                     FROM sessions s JOIN users u ON u.id = s.user_id
+                     WHERE s.token_hash=? AND s.expires_at > ?''', (key, now))
+        row = c.fetchone()
+    if not row: return None
+    if now - row[4] > SESSION_TOUCH_INTERVAL:
+        with get_cursor(commit=True) as c:
+            c.execute('UPDATE sessions SET last_seen=? WHERE token_hash=?', (now, key))
+
+    user = {"id": row[0], "username": row[1], "nickname": row[2]}
+    with _session_lock:
+        if generation == _session_generation:
+            _session_cache[key] = (user, min(now + SESSION_CACHE_TTL, row[3]))
+            _session_cache.move_to_end(key)
+            while len(_session_cache) > SESSION_CACHE_SIZE: _session_cache.popitem(last=False)
+    return dict(user)
+
+def delete_session(token):
+    """이 기기만 로그아웃"""
+    if not token: return
+    key = hash_token(token)
+    with get_cursor(commit=True) as c:
+        c.execute('DELETE FROM sessions WHERE token_hash=?', (key,))
+    _forget_sessions(token_hash=key)
 
-def delete_auth_token(user_id):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('UPDATE users SET token=NULL WHERE id=?', (user_id,))
-    conn.commit()
-    conn.close()
+def delete_user_sessions(user_id):
+    """모든 기기에서 로그아웃"""
+    with get_cursor(commit=True) as c:
+        c.execute('DELETE FROM sessions WHERE user_id=?', (user_id,))
+    _forget_sessions(user_id=user_id)
+
+def purge_expired_sessions(now=None, batch=SESSION_SWEEP_BATCH):
+    """만료된 세션을 batch개씩 나눠 지웁니다. (쓰기 잠금을 한 번에 오래 잡지 않도록) 지운 개수를 돌려줍니다."""
+    now = time.time() if now is None else now
+    total = 0
+    while True:
+        with get_cursor(commit=True) as c:
+            c.execute('DELETE FROM sessions WHERE token_hash IN (SELECT token_hash FROM sessions WHERE expires_at <= ? LIMIT ?)',
+                      (now, batch))
+            deleted = c.rowcount
+        total += deleted
+        if deleted < batch: return total
+
+_sweeper_started = False
+_sweeper_lock = threading.Lock()
+
+def start_session_sweeper(interval=SESSION_SWEEP_INTERVAL):
+    """만료 세션 정리 데몬 스레드를 프로세스당 한 번만 띄웁니다. (Streamlit 리런마다 불러도 안전)"""
+    global _sweeper_started
+    with _sweeper_lock:
+        if _sweeper_started: return
+        _sweeper_started = True
+
+    def loop():
+        while True:
+            try:
+                purge_expired_sessions()
+            except Exception as e:
+                print(f"⚠️ 세션 정리 오류: {e}")
+            time.sleep(interval)
+
+    threading.Thread(target=loop, name="session-sweeper", daemon=True).start()
 
 def get_user_info(user_id):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('SELECT * FROM users WHERE id=?', (user_id,))
-    row = c.fetchone()
-    conn.close()
+    with get_cursor() as c:
+        # 예전 DB는 컬럼이 뒤에 덧붙어 순서가 다를 수 있으므로(migrations.LEGACY_COLUMNS) 이름으로 읽습니다.
+        c.execute('SELECT id, username, nickname, email, address, birthdate, gender, created_at FROM users WHERE id=?', (user_id,))
+        row = c.fetchone()
     if row:
-        # users 테이블 컬럼 순서: id, username, password, nickname, email, address, birthdate, gender, profile_image, token, created_at
         return {
-            "id": row[0], "username": row[1], "nickname": row[3],
-            "email": row[4], "address": row[5], "birthdate": row[6],
-            "gender": row[7], "created_at": row[10]
+            "id": row[0], "username": row[1], "nickname": row[2],
+            "email": row[3], "address": row[4], "birthdate": row[5],
+            "gender": row[6], "created_at": row[7]
         }
     return None
 
 def update_user_profile(user_id, nickname, email, address, birthdate):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('UPDATE users SET nickname=?, email=?, address=?, birthdate=? WHERE id=?', 
-              (nickname, email, address, birthdate, user_id))
-    conn.commit()
-    conn.close()
+    with user_write(user_id) as c:
+        c.execute('UPDATE users SET nickname=?, email=?, address=?, birthdate=? WHERE id=?', 
+                  (nickname, email, address, birthdate, user_id))
+    _forget_sessions(user_id=user_id)         # 세션 캐시에 든 닉네임도 새로
 
 def delete_user_account(user_id):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('DELETE FROM recipes WHERE user_id=?', (user_id,))
-    c.execute('DELETE FROM users WHERE id=?', (user_id,))
-    conn.commit()
-    conn.close()
+    # 두 DELETE를 한 트랜잭션으로 묶어서 중간에 실패해도 반쪽짜리 삭제가 남지 않게 합니다.
+    with user_write(user_id) as c:
+        c.execute('DELETE FROM recipe_ingredients WHERE user_id=?', (user_id,))
+        c.execute('DELETE FROM jobs WHERE user_id=?', (user_id,))
+        c.execute('DELETE FROM recipes WHERE user_id=?', (user_id,))
+        c.execute('DELETE FROM sessions WHERE user_id=?', (user_id,))
+        c.execute('DELETE FROM users WHERE id=?', (user_id,))
+    _forget_sessions(user_id=user_id)
 
 # ==========================================
 # 4. 레시피 관련 함수 (기존 유지)
 # ==========================================
 
-def add_recipe(user_id, title, content, source_url, source_type, cuisine_type, dish_type, ingredients):
-    conn = get_connection()
-    c = conn.cursor()
-    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def _insert_recipe(c, user_id, title, content, source_url, source_type, cuisine_type, dish_type, ingredients, link_preview, now):
+    canonical_key = url_canon.canonical_key(source_url)
+    preview = link_preview or {}
+    og_fetched_at = time.time() if link_preview is not None else None
+    if canonical_key:
+        existing = c.execute('SELECT id FROM recipes WHERE user_id=? AND canonical_key=?', (user_id, canonical_key)).fetchone()
+        if existing: return existing[0]
     c.execute('''INSERT INTO recipes 
-                 (user_id, title, content, source_url, source_type, cuisine_type, dish_type, ingredients, created_at) 
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-              (user_id, title, content, source_url, source_type, cuisine_type, dish_type, ingredients, now))
-    conn.commit()
-    conn.close()
+                 (user_id, title, content, source_url, source_type, cuisine_type, dish_type, ingredients, created_at, canonical_key,
+                  og_title, og_description, og_image, og_fetched_at) 
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+              (user_id, title, content, source_url, source_type, cuisine_type, dish_type, ingredients, now, canonical_key,
+               preview.get('og_title'), preview.get('og_description'), preview.get('og_image'), og_fetched_at))
+    recipe_id = c.lastrowid
+    index_recipe_ingredients(c, recipe_id, user_id, ingredients)
+    return recipe_id
+
+def add_recipe(user_id, title, content, source_url, source_type, cuisine_type, dish_type, ingredients, link_preview=None):
+    """
+    새 레시피 id를 돌려줍니다. 같은 링크(정규화 기준)가 이미 저장돼 있으면 저장하지 않고 기존 id를 돌려줍니다.
+    link_preview: 저장 시점에 받아둔 {"og_title", "og_description", "og_image"} (없으면 백그라운드에서 채움)
+    """
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return run_write(user_id, lambda c: _insert_recipe(c, user_id, title, content, source_url, source_type, cuisine_type, dish_type,
+                                                       ingredients, link_preview, now))
+
+def add_recipes(user_id, recipes):
+    """
+    여러 레시피를 한 트랜잭션으로 저장하고 id 리스트를 같은 순서로 돌려줍니다. (bulk_import.py용)
+    recipes: add_recipe 인자 이름(title, content, source_url, ...)을 키로 가진 dict 리스트
+    """
+    if not recipes: return []
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return run_write(user_id, lambda c: [_insert_recipe(c, user_id, r.get('title'), r.get('content'), r.get('source_url'),
+                                                        r.get('source_type'), r.get('cuisine_type'), r.get('dish_type'),
+                                                        r.get('ingredients'), r.get('link_preview'), now)
+                                         for r in recipes])
+
+def find_saved_canonical_keys(user_id, canonical_keys):
+    """canonical_keys 중 이미 저장된 것들의 집합."""
+    keys = list(canonical_keys)
+    if not keys: return set()
+    placeholders = ','.join('?' for _ in keys)
+    with get_cursor() as c:
+        c.execute(f'SELECT canonical_key FROM recipes WHERE user_id=? AND canonical_key IN ({placeholders})', [user_id] + keys)
+        return {row[0] for row in c.fetchall()}
+
+def find_user_recipe_ids(user_id, recipe_ids):
+    """recipe_ids 중 지금 이 유저의 레시피로 남아 있는 id들의 집합."""
+    ids = list(recipe_ids)
+    if not ids: return set()
+    placeholders = ','.join('?' for _ in ids)
+    with get_cursor() as c:
+        # +user_id: 유저 인덱스로 그 유저의 레시피를 전부 훑지 않고 id를 기본 키로 바로 찾습니다. (get_recipes_by_ids와 같은 이유)
+        c.execute(f'SELECT id FROM recipes WHERE id IN ({placeholders}) AND +user_id=?', ids + [user_id])
+        return {row[0] for row in c.fetchall()}
 
 def get_user_recipes(user_id):
-    conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute('SELECT * FROM recipes WHERE user_id=? ORDER BY created_at DESC', (user_id,))
-    rows = c.fetchall()
-    conn.close()
+    with get_cursor() as c:
+        # 풀에서 재사용하는 커넥션이라 row_factory는 커서에만 설정합니다.
+        c.row_factory = sqlite3.Row
+        c.execute('SELECT * FROM recipes WHERE user_id=? ORDER BY created_at DESC', (user_id,))
+        rows = c.fetchall()
     return [dict(row) for row in rows]
 
+# --- 목록용 요약 조회 (키셋 페이지네이션) ---
+# 목록 화면에는 본문(content)과 재료 JSON이 필요 없으므로 요약 컬럼만 가져오고,
+# 본문은 사용자가 레시피를 펼칠 때 get_recipe로 따로 불러옵니다.
+RECIPE_SUMMARY_COLUMNS = "id, title, cuisine_type, dish_type, folder_name, is_favorite, created_at"
+RECIPE_PAGE_SIZE = 20
+
+def list_user_recipes(user_id, after=None, limit=RECIPE_PAGE_SIZE, folder=None, favorites_only=False):
+    """
+    최신순 요약 목록 한 페이지를 (rows, next_cursor)로 돌려줍니다.
+    next_cursor는 (created_at, id) 튜플이며, 다음 페이지를 받을 때 after로 넘기면 됩니다. 마지막 페이지면 None.
+    """
+    sql = f'SELECT {RECIPE_SUMMARY_COLUMNS} FROM recipes WHERE user_id=?'
+    params = [user_id]
+    if folder is not None:
+        sql += ' AND folder_name=?'
+        params.append(folder)
+    if favorites_only:
+        sql += ' AND is_favorite=1'
+    if after:
+        sql += ' AND (created_at, id) < (?, ?)'
+        params.extend(after)
+    sql += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+    params.append(limit + 1)  # 한 개 더 읽어서 다음 페이지가 있는지 확인
+
+    with get_cursor() as c:
+        c.row_factory = sqlite3.Row
+        c.execute(sql, params)
+        rows = [dict(row) for row in c.fetchall()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1]['created_at'], rows[-1]['id'])
+    return rows, next_cursor
+
+def get_user_folders(user_id):
+    """[(폴더명, 레시피 수), ...] 를 폴더명 순으로 돌려줍니다."""
+    with get_cursor() as c:
+        c.execute('SELECT folder_name, COUNT(*) FROM recipes WHERE user_id=? GROUP BY folder_name ORDER BY folder_name', (user_id,))
+        return c.fetchall()
+
+def get_recipe(recipe_id, user_id):
+    with get_cursor() as c:
+        c.row_factory = sqlite3.Row
+        c.execute('SELECT * FROM recipes WHERE id=? AND user_id=?', (recipe_id, user_id))
+        row = c.fetchone()
+    return dict(row) if row else None
+
+def find_recipe_by_url(user_id, url):
+    """정규화한 링크 기준으로 이미 저장된 레시피를 찾습니다. (추출/AI 분석 전에 중복 확인용)"""
+    canonical_key = url_canon.canonical_key(url)
+    if not canonical_key: return None
+    with get_cursor() as c:
+        c.row_factory = sqlite3.Row
+        c.execute('SELECT * FROM recipes WHERE user_id=? AND canonical_key=?', (user_id, canonical_key))
+        row = c.fetchone()
+    return dict(row) if row else None
+
+def get_recipes_by_ids(recipe_ids, user_id):
+    if not recipe_ids: return []
+    placeholders = ','.join('?' for _ in recipe_ids)
+    with get_cursor() as c:
+        c.row_factory = sqlite3.Row
+        # +user_id: 통계가 없으면 SQLite가 정렬을 피하려고 유저 인덱스로 그 유저의 레시피를 전부 훑습니다.
+        #           id 몇 개는 기본 키로 바로 찾고, 정렬은 받아온 몇 줄만 여기서 합니다.
+        c.execute(f'SELECT * FROM recipes WHERE id IN ({placeholders}) AND +user_id=?', list(recipe_ids) + [user_id])
+        rows = [dict(row) for row in c.fetchall()]
+    rows.sort(key=lambda r: (r['created_at'] or "", r['id']), reverse=True)
+    return rows
+
+# --- 링크 미리보기 (link_preview.py의 백그라운드 갱신용) ---
+def get_stale_link_previews(older_than, limit):
+    """미리보기가 없거나 older_than(epoch 초)보다 오래된 레시피 [(id, source_url), ...]"""
+    with get_cursor() as c:
+        c.execute('''SELECT id, source_url FROM recipes
+                     WHERE source_url IS NOT NULL AND source_url != '' AND (og_fetched_at IS NULL OR og_fetched_at < ?)
+                     ORDER BY og_fetched_at IS NOT NULL, og_fetched_at LIMIT ?''', (older_than, limit))
+        return c.fetchall()
+
+def update_link_preview(recipe_id, preview):
+    with get_cursor() as c:
+        row = c.execute('SELECT user_id FROM recipes WHERE id=?', (recipe_id,)).fetchone()
+    if not row: return
+    with user_write(row[0]) as c:
+        c.execute('UPDATE recipes SET og_title=?, og_description=?, og_image=?, og_fetched_at=? WHERE id=?',
+                  (preview.get('og_title'), preview.get('og_description'), preview.get('og_image'), time.time(), recipe_id))
+
 def toggle_favorite(recipe_id, user_id, current_status):
-    conn = get_connection()
-    c = conn.cursor()
     new_status = 1 if current_status == 0 else 0
-    c.execute('UPDATE recipes SET is_favorite=? WHERE id=? AND user_id=?', (new_status, recipe_id, user_id))
-    conn.commit()
-    conn.close()
+    run_write(user_id, lambda c: c.execute('UPDATE recipes SET is_favorite=? WHERE id=? AND user_id=?', (new_status, recipe_id, user_id)))
 
 def update_recipe(recipe_id, user_id, title, content, cuisine, dish, ingredients, folder):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('''UPDATE recipes SET title=?, content=?, cuisine_type=?, dish_type=?, ingredients=?, folder_name=? 
-                 WHERE id=? AND user_id=?''', 
-              (title, content, cuisine, dish, ingredients, folder, recipe_id, user_id))
-    conn.commit()
-    conn.close()
+    def apply(c):
+        c.execute('''UPDATE recipes SET title=?, content=?, cuisine_type=?, dish_type=?, ingredients=?, folder_name=? 
+                     WHERE id=? AND user_id=?''', 
+                  (title, content, cuisine, dish, ingredients, folder, recipe_id, user_id))
+        if c.rowcount:
+            index_recipe_ingredients(c, recipe_id, user_id, ingredients)
+    run_write(user_id, apply)
 
 def delete_recipe(recipe_id, user_id):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute('DELETE FROM recipes WHERE id=? AND user_id=?', (recipe_id, user_id))
-    conn.commit()
-    conn.close()
+    def apply(c):
+        c.execute('DELETE FROM recipes WHERE id=? AND user_id=?', (recipe_id, user_id))
+        if c.rowcount:
+            c.execute('DELETE FROM recipe_ingredients WHERE recipe_id=?', (recipe_id,))
+    run_write(user_id, apply)
 
 def delete_recipes_list(recipe_ids, user_id):
     if not recipe_ids: return
-    conn = get_connection()
-    c = conn.cursor()
     placeholders = ','.join('?' for _ in recipe_ids)
     sql = f'DELETE FROM recipes WHERE id IN ({placeholders}) AND user_id=?'
-    c.execute(sql, recipe_ids + [user_id])
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    def apply(c):
+        c.execute(sql, list(recipe_ids) + [user_id])
+        c.execute(f'DELETE FROM recipe_ingredients WHERE recipe_id IN ({placeholders}) AND user_id=?', list(recipe_ids) + [user_id])
+    run_write(user_id, apply)
+
+# ==========================================
+# 5. 변환 작업 큐 (jobs.py)
+# ==========================================
+# status: queued -> running -> done / failed
+# 실패하면 max_attempts까지 run_after를 미뤄서 다시 queued로 돌립니다.
+# running인데 lease_until이 지난 작업(워커가 죽은 경우)은 다른 워커가 다시 가져갑니다.
+# 가져갈 때마다 attempts가 오르므로, 워커를 죽이는 작업도 max_attempts번까지만 다시 돌고 그다음엔 failed로 끝납니다.
+JOB_LEASE_EXHAUSTED_ERROR = "작업 도중 워커가 여러 번 멈춰서 중단했어요."
+
+def enqueue_job(user_id, url, max_attempts=3):
+    """작업 id를 돌려줍니다. 같은 링크(정규화 기준)로 진행 중인 작업이 있으면 새로 만들지 않고 그 id를 돌려줍니다."""
+    canonical_key = url_canon.canonical_key(url)
+    if not canonical_key: return None
+    now = time.time()
+    try:
+        with get_cursor(commit=True) as c:
+            existing = c.execute("SELECT id FROM jobs WHERE user_id=? AND canonical_key=? AND status IN ('queued', 'running')",
+                                 (user_id, canonical_key)).fetchone()
+            if existing: return existing[0]
+            c.execute('''INSERT INTO jobs (user_id, url, canonical_key, status, stage, max_attempts, run_after, created_at, updated_at)
+                         VALUES (?, ?, ?, 'queued', '대기 중', ?, ?, ?, ?)''',
+                      (user_id, url, canonical_key, max_attempts, now, now, now))
+            return c.lastrowid
+    except sqlite3.IntegrityError:
+        # 다른 세션이 방금 같은 링크를 넣었으면 그 작업을 씁니다.
+        with get_cursor() as c:
+            row = c.execute("SELECT id FROM jobs WHERE user_id=? AND canonical_key=? AND status IN ('queued', 'running')",
+                            (user_id, canonical_key)).fetchone()
+        return row[0] if row else None
+
+def claim_job(lease_seconds):
+    """실행할 작업 하나를 running으로 바꾸고 dict로 돌려줍니다. 없으면 None."""
+    now = time.time()
+    with get_cursor(commit=True) as c:
+        c.row_factory = sqlite3.Row
+        c.execute('''UPDATE jobs SET status='failed', stage='실패', error=?, lease_until=NULL, partial=NULL, updated_at=?
+                     WHERE status='running' AND lease_until < ? AND attempts >= max_attempts''', (JOB_LEASE_EXHAUSTED_ERROR, now, now))
+        while True:
+            row = (c.execute("SELECT * FROM jobs WHERE status='queued' AND run_after <= ? ORDER BY run_after LIMIT 1", (now,)).fetchone()
+                   or c.execute("SELECT * FROM jobs WHERE status='running' AND lease_until < ? AND attempts < max_attempts LIMIT 1",
+                                (now,)).fetchone())
+            if row is None: return None
+            # 다른 워커(프로세스)가 먼저 가져갔으면 rowcount가 0 -> 다음 후보
+            c.execute('''UPDATE jobs SET status='running', attempts=attempts+1, lease_until=?, updated_at=?
+                         WHERE id=? AND status=? AND updated_at=?''',
+                      (now + lease_seconds, now, row['id'], row['status'], row['updated_at']))
+            if c.rowcount:
+                job = dict(row)
+                job.update(status='running', attempts=row['attempts'] + 1, lease_until=now + lease_seconds)
+                return job
+
+def update_job_stage(job_id, stage):
+    with get_cursor(commit=True) as c:
+        c.execute('UPDATE jobs SET stage=?, updated_at=? WHERE id=?', (stage, time.time(), job_id))
+
+def update_job_partial(job_id, partial):
+    """partial: 스트리밍으로 지금까지 도착한 필드 dict"""
+    with get_cursor(commit=True) as c:
+        c.execute('UPDATE jobs SET partial=?, updated_at=? WHERE id=?', (json.dumps(partial, ensure_ascii=False), time.time(), job_id))
+
+def complete_job(job_id, recipe_id, timings=None):
+    timings = timings or {}
+    with get_cursor(commit=True) as c:
+        c.execute('''UPDATE jobs SET status='done', stage='완료', error=NULL, recipe_id=?, lease_until=NULL, partial=NULL,
+                     llm_first_content=?, llm_total=?, updated_at=? WHERE id=?''',
+                  (recipe_id, timings.get('llm_first_content'), timings.get('llm_total'), time.time(), job_id))
+
+def fail_job(job_id, error, retry_delay=None):
+    """retry_delay(초)가 있고 시도 횟수가 남았으면 다시 대기열로, 아니면 failed로 끝냅니다. 바뀐 상태를 돌려줍니다."""
+    now = time.time()
+    with get_cursor(commit=True) as c:
+        row = c.execute('SELECT attempts, max_attempts FROM jobs WHERE id=?', (job_id,)).fetchone()
+        if row is None: return None
+        if retry_delay is not None and row[0] < row[1]:
+            status, stage, run_after = 'queued', '다시 시도 대기 중', now + retry_delay
+        else:
+            status, stage, run_after = 'failed', '실패', now
+        c.execute('UPDATE jobs SET status=?, stage=?, error=?, run_after=?, lease_until=NULL, partial=NULL, updated_at=? WHERE id=?',
+                  (status, stage, str(error), run_after, now, job_id))
+    return status
+
+def get_job(job_id, user_id):
+    with get_cursor() as c:
+        c.row_factory = sqlite3.Row
+        row = c.execute('SELECT * FROM jobs WHERE id=? AND user_id=?', (job_id, user_id)).fetchone()
+    return dict(row) if row else None
+
+def list_user_jobs(user_id, limit=10):
+    """최근 작업 목록 (최신순)."""
+    with get_cursor() as c:
+        c.row_factory = sqlite3.Row
+        c.execute('SELECT * FROM jobs WHERE user_id=? ORDER BY created_at DESC, id DESC LIMIT ?', (user_id, limit))
+        return [dict(row) for row in c.fetchall()]
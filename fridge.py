@@ -0,0 +1,50 @@
+# fridge.py
+# '냉장고를 부탁해' 검색 엔진
+# 레시피를 전부 불러와 JSON을 다시 파싱하는 대신, 입력 재료와 대체 후보를 database.py에 넘겨
+# 재료명별 레시피 비트맵(recipe_ingredients 색인에서 만들어 메모리에 둔 것)으로 점수를 합산하고 상위 k개만 받아옵니다.
+# 대체 재료는 substitutes.py의 대체 그래프에서 입력 재료마다 한 번씩만 펼칩니다.
+# 검색어와 레시피 재료명은 ingredient_norm 규칙으로 맞춥니다. ("파"는 대파, "배추"는 양배추에 걸리지 않고, "다진 마늘" = "다진마늘")
+import database as db
+import substitutes
+
+FRIDGE_TOP_K = 30
+
+def parse_fridge_input(user_ingredients):
+    return [i.strip() for i in user_ingredients.split(',') if i.strip()]
+
+def expand_candidates(inputs, weights=substitutes.HOP_WEIGHTS):
+    """
+    [(입력 번호, 검색어, 가중치, 표시 이름), ...] 를 돌려줍니다.
+    입력 재료마다 (자기 자신 1.0 -> 1홉 대체 0.5 -> 2홉 대체 0.25) 순서이고, 이 중 레시피에 처음 맞는 것 하나만 점수에 더합니다.
+    저장된 레시피 재료 중 같거나 포함 관계로 맞는 것이 하나도 없는 입력만 오타로 보고 고친 재료를 덧붙입니다.
+    표시 이름은 입력한 그대로 보여줍니다. (정규화한 이름이 아니라)
+    """
+    graph = substitutes.get_graph()
+    candidates = []
+    for i, user_ing in enumerate(inputs):
+        correct_typos = not db.find_ingredient_name_ids(user_ing, threshold=1.0)
+        for rank, (term, weight, hops) in enumerate(graph.expand(user_ing, weights, correct_typos)):
+            if rank == 0: label = user_ing
+            elif hops == 0: label = f"{term}(비슷한 이름)"
+            else: label = f"{term}(대체 {round(weight, 3):g})"
+            candidates.append((i, term, weight, label))
+    return candidates
+
+def search(user_id, user_ingredients, top_k=FRIDGE_TOP_K):
+    """(상위 k개 레시피 리스트, 전체 매칭 수)를 돌려줍니다. 점수가 같으면 최근에 저장한 레시피가 먼저."""
+    inputs = parse_fridge_input(user_ingredients)
+    if not inputs: return [], 0
+
+    top, total = db.search_recipes_by_ingredients(user_id, expand_candidates(inputs), top_k)
+    ids = [rid for rid, _, _ in top]
+    by_id = {r['id']: r for r in db.get_recipes_by_ids(ids, user_id)}
+    ingredients = db.get_recipe_ingredients(ids, user_id)
+    results = []
+    for rid, score, matched in top:
+        recipe = by_id.get(rid)
+        if recipe is None: continue
+        recipe['match_score'] = score
+        recipe['matched_keywords'] = matched
+        recipe['ingredient_names'] = [i['name'] for i in ingredients.get(rid, [])]
+        results.append(recipe)
+    return results, total
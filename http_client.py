@@ -0,0 +1,169 @@
+# http_client.py
+# 공용 HTTP 클라이언트
+# - 세션 하나를 모든 스크래퍼가 같이 써서 호스트별 keep-alive 커넥션을 재사용합니다.
+# - 연결/읽기 타임아웃 기본값이 있어서 느린 블로그 하나가 Streamlit 워커를 붙잡지 않습니다.
+# - 응답 크기 상한을 넘으면 나머지는 읽지 않고 잘라냅니다.
+# - ETag/Last-Modified가 있는 응답은 디스크에 저장해두고, 다음 요청은 조건부 GET으로 보냅니다. (304면 저장본 사용)
+#   저장할 때마다 오래된 항목(HTTP_CACHE_MAX_AGE)을 지우고, 전체 크기가 HTTP_CACHE_MAX_BYTES를 넘으면 가장 오래 안 쓴 것부터 지웁니다.
+# requests는 첫 요청 때 불러옵니다. (로그인 화면에서는 필요 없음)
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+MAX_RESPONSE_BYTES = 5 * 1024 * 1024
+POOL_CONNECTIONS = 16     # 동시에 keep-alive로 붙잡아둘 호스트 수
+POOL_MAXSIZE = 8          # 호스트 하나당 커넥션 수
+HTTP_CACHE_DIR = os.environ.get("LINCOOK_HTTP_CACHE", ".http_cache")
+HTTP_CACHE_MAX_AGE = 14 * 24 * 3600          # 14일 동안 안 쓴 항목은 삭제
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024     # 넘치면 가장 오래 안 쓴 것부터 삭제 (LRU)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
+}
+
+@dataclass
+class HttpResponse:
+    url: str
+    status_code: int
+    content: bytes
+    encoding: str
+    from_cache: bool = False
+    truncated: bool = False
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+_session = None
+
+def get_session():
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(DEFAULT_HEADERS)
+        _session = session
+    return _session
+
+# ==========================================
+# 디스크 캐시 (조건부 GET)
+# ==========================================
+
+def _cache_paths(url):
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    return os.path.join(HTTP_CACHE_DIR, key + ".json"), os.path.join(HTTP_CACHE_DIR, key + ".body")
+
+def _load_cached(url):
+    meta_path, body_path = _cache_paths(url)
+    try:
+        with open(meta_path, encoding='utf-8') as f: meta = json.load(f)
+        with open(body_path, 'rb') as f: body = f.read()
+    except (OSError, ValueError):
+        return None, None
+    return meta, body
+
+def _touch_cached(url):
+    # 304로 다시 쓴 항목은 최근에 쓴 것으로 표시 (정리 순서 기준)
+    try: os.utime(_cache_paths(url)[0])
+    except OSError: pass
+
+def _atomic_write(path, data):
+    fd, tmp = tempfile.mkstemp(dir=HTTP_CACHE_DIR)
+    with os.fdopen(fd, 'wb') as f: f.write(data)
+    os.replace(tmp, path)
+
+def _store_cached(url, response, body, encoding):
+    validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    if not any(validators.values()): return
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    meta_path, body_path = _cache_paths(url)
+    meta = dict(validators, url=response.url, encoding=encoding, fetched_at=time.time())
+    _atomic_write(body_path, body)
+    _atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+    _prune_cache()
+
+_prune_lock = threading.Lock()
+
+def _prune_cache(max_age=HTTP_CACHE_MAX_AGE, max_bytes=HTTP_CACHE_MAX_BYTES):
+    """오래된 항목을 지우고, 남은 크기가 max_bytes 이하가 될 때까지 가장 오래 안 쓴 항목을 지웁니다. 지운 항목 수를 돌려줍니다."""
+    if not _prune_lock.acquire(blocking=False): return 0      # 다른 스레드가 정리 중
+    try:
+        entries = {}          # 키 -> [마지막 사용 시각(.json mtime), 크기 합]
+        with os.scandir(HTTP_CACHE_DIR) as it:
+            for entry in it:
+                key, ext = os.path.splitext(entry.name)
+                if ext not in (".json", ".body"): continue
+                try: st = entry.stat()
+                except OSError: continue
+                info = entries.setdefault(key, [0.0, 0])
+                info[1] += st.st_size
+                if ext == ".json": info[0] = st.st_mtime
+        now, total = time.time(), sum(size for _, size in entries.values())
+        removed = 0
+        for key, (used_at, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if now - used_at <= max_age and total <= max_bytes: break
+            for ext in (".json", ".body"):
+                try: os.remove(os.path.join(HTTP_CACHE_DIR, key + ext))
+                except OSError: pass
+            total -= size
+            removed += 1
+        return removed
+    finally:
+        _prune_lock.release()
+
+def _guess_encoding(response, body):
+    # requests는 charset 없는 text/html을 ISO-8859-1로 보므로, 본문 <meta charset>을 먼저 봅니다.
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        return response.encoding
+    match = re.search(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_-]+)', body[:4096], re.IGNORECASE)
+    return match.group(1).decode('ascii') if match else 'utf-8'
+
+# ==========================================
+# GET
+# ==========================================
+
+def get(url, headers=None, timeout=None, max_bytes=MAX_RESPONSE_BYTES, use_cache=True):
+    request_headers = dict(headers or {})
+    meta, cached_body = _load_cached(url) if use_cache else (None, None)
+    if meta:
+        if meta.get("etag"): request_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"): request_headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = get_session().get(url, headers=request_headers, timeout=timeout or (CONNECT_TIMEOUT, READ_TIMEOUT), stream=True)
+    try:
+        if response.status_code == 304 and meta:
+            _touch_cached(url)
+            return HttpResponse(meta.get("url") or url, 200, cached_body, meta.get("encoding"), from_cache=True)
+
+        chunks, size, truncated = [], 0, False
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                truncated = True
+                break
+        body = b"".join(chunks)[:max_bytes]
+    finally:
+        response.close()
+
+    encoding = _guess_encoding(response, body)
+    if use_cache and response.status_code == 200 and not truncated:
+        try: _store_cached(url, response, body, encoding)
+        except OSError as e: print(f"⚠️ HTTP 캐시 저장 실패: {e}")
+    return HttpResponse(response.url, response.status_code, body, encoding, truncated=truncated)
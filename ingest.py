@@ -0,0 +1,173 @@
+# ingest.py
+# 🕵️‍♂️ 수거반 (링크 -> 원문 텍스트)
+# 유튜브는 자막과 영상 설명(yt-dlp)을 동시에 요청해서, 마감 시간 안에 가장 좋은 결과를 고르고
+# 나머지는 버립니다. (자막이 없는 쇼츠에서 두 번의 네트워크 왕복이 직렬로 쌓이던 문제)
+# 단계별 소요 시간은 IngestResult.timings 로 확인할 수 있습니다.
+# yt-dlp / instaloader / 자막 API / bs4 는 무거워서 처음 쓰는 단계 함수 안에서 불러옵니다. (로그인 화면 시작 속도)
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import http_client
+import link_preview
+import structured
+import url_canon
+
+INGEST_WORKERS = 8          # 모든 세션이 같이 쓰는 추출용 스레드 수
+INGEST_DEADLINE = 20.0      # 링크 하나당 최대 대기 시간(초)
+
+_executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="ingest")   # 화면 요청(작업 큐)용. 대량 가져오기는 따로 (bulk_import.py)
+
+@dataclass
+class IngestResult:
+    raw_text: str = None
+    source_type: str = ""          # 성공하면 출처 종류, 실패하면 실패 이유
+    canonical: url_canon.CanonicalURL = None
+    link_preview: dict = None      # 페이지를 받아온 경우 같이 뽑아둔 og 메타데이터
+    structured: dict = None        # 페이지에 레시피 마크업이 있으면 cook_recipe 결과 모양으로 변환한 것 (AI 생략)
+    timings: dict = field(default_factory=dict)   # 단계 이름 -> 초
+
+    @property
+    def ok(self):
+        return bool(self.raw_text)
+
+# ==========================================
+# 1. 단계별 추출 함수 (성공: (텍스트, 출처[, 미리보기, 구조화 레시피]), 실패: 예외)
+# ==========================================
+
+def fetch_transcript(video_id):
+    from youtube_transcript_api import YouTubeTranscriptApi
+    from youtube_transcript_api.formatters import TextFormatter
+    transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['ko', 'en'])
+    return TextFormatter().format_transcript(transcript), "유튜브 자막"
+
+def fetch_youtube_metadata(url):
+    import yt_dlp
+    ydl_opts = {'quiet': True, 'skip_download': True, 'socket_timeout': INGEST_DEADLINE}
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return f"영상 제목: {info.get('title')}\n\n설명:\n{info.get('description')}", "유튜브 영상 설명"
+
+def fetch_instagram(shortcode):
+    import instaloader
+    L = instaloader.Instaloader()
+    post = instaloader.Post.from_shortcode(L.context, shortcode)
+    return f"작성자: {post.owner_username}\n\n내용:\n{post.caption}", "인스타그램"
+
+def fetch_blog(url):
+    from bs4 import BeautifulSoup
+    response = http_client.get(url)
+    if not response.ok: raise RuntimeError(f"접속 오류 ({response.status_code})")
+    soup = BeautifulSoup(response.text, 'html.parser')
+    # 본문을 지우기 전에 og 메타데이터와 레시피 마크업(JSON-LD는 script 태그 안에 있음)을 먼저 챙겨둡니다.
+    preview = link_preview.parse_og(soup)
+    recipe = structured.extract_recipe(soup)
+
+    if "blog.naver.com" in url:
+        # iframe 처리 (PC 주소일 경우. 정규화된 모바일 주소면 바로 본문이 있음)
+        iframe = soup.select_one('iframe#mainFrame')
+        if iframe:
+            real_url = "https://blog.naver.com" + iframe['src']
+            response = http_client.get(real_url)
+            soup = BeautifulSoup(response.text, 'html.parser')
+            recipe = recipe or structured.extract_recipe(soup)
+        
+        main_content = soup.select_one('.se-main-container') or soup.select_one('#postViewArea')
+        if main_content:
+            for s in main_content(["script", "style"]): s.extract()
+            return main_content.get_text(separator="\n"), "네이버 블로그", preview, recipe
+
+    for script in soup(["script", "style", "nav", "header", "footer"]): script.extract()
+    return soup.get_text(separator="\n"), "블로그 글", preview, recipe
+
+# ==========================================
+# 2. 동시 실행 + 마감 시간 내 최선 선택
+# ==========================================
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    try:
+        return fn(*args), None, time.perf_counter() - t0
+    except Exception as e:
+        return None, e, time.perf_counter() - t0
+
+def race(stages, deadline=INGEST_DEADLINE, timings=None, executor=None):
+    """
+    stages: [(이름, 함수, 인자튜플), ...] 선호도 높은 순.
+    모두 동시에 시작해서, 더 선호되는 단계가 전부 실패했거나 끝난 시점의 최선 결과를 돌려줍니다.
+    마감 시간이 지나면 그때까지 성공한 것 중 최선을 고르고, 남은 작업은 취소(또는 결과를 버림)합니다.
+    executor를 주면 공용 풀 대신 거기서 실행합니다.
+    반환: ((텍스트, 출처) 또는 None, 마지막 에러)
+    """
+    timings = {} if timings is None else timings
+    started = time.perf_counter()
+    executor = executor or _executor
+    futures = {executor.submit(_timed, fn, *args): name for name, fn, args in stages}
+    order = [name for name, _, _ in stages]
+    results, errors = {}, {}
+    pending = set(futures)
+
+    def best_ready():
+        for name in order:
+            if name in results: return results[name]
+            if name not in errors: return None   # 더 좋은 단계가 아직 진행 중
+        return None
+
+    try:
+        while pending:
+            remaining = deadline - (time.perf_counter() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                value, error, elapsed = future.result()
+                timings[name] = elapsed
+                if error is None and value and value[0]:
+                    results[name] = value
+                else:
+                    errors[name] = error or ValueError("빈 결과")
+            chosen = best_ready()
+            if chosen:
+                return chosen, None
+    finally:
+        for future in pending:
+            future.cancel()
+            timings.setdefault(futures[future], None)   # None = 마감 시간 초과로 버림
+
+    for name in order:
+        if name in results: return results[name], None
+    last_error = next((errors[name] for name in reversed(order) if name in errors), TimeoutError("마감 시간 초과"))
+    return None, last_error
+
+# ==========================================
+# 3. 링크 하나 수거
+# ==========================================
+
+def ingest(url, deadline=INGEST_DEADLINE, executor=None):
+    started = time.perf_counter()
+    result = IngestResult(canonical=url_canon.canonicalize(url))
+    canon = result.canonical
+    if canon is None:
+        result.source_type = "추출 실패: 올바른 링크가 아닙니다."
+        return result
+
+    if canon.platform == "youtube":
+        stages = [("transcript", fetch_transcript, (canon.canonical_id,)),
+                  ("metadata", fetch_youtube_metadata, (canon.canonical_url,))]
+    elif canon.platform == "instagram":
+        stages = [("instagram", fetch_instagram, (canon.canonical_id,))]
+    else:
+        stages = [("page", fetch_blog, (canon.canonical_url,))]
+
+    value, error = race(stages, deadline, result.timings, executor)
+    if value:
+        result.raw_text, result.source_type = value[:2]
+        result.link_preview = value[2] if len(value) > 2 else None
+        result.structured = value[3] if len(value) > 3 else None
+    else:
+        result.source_type = f"추출 실패: {error}"
+    result.timings["total"] = time.perf_counter() - started
+    print(f"⏱️ 수거 {canon.platform} {canon.canonical_id}: " +
+          ", ".join(f"{k}={v:.2f}s" if v is not None else f"{k}=버림" for k, v in result.timings.items()))
+    return result
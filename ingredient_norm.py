@@ -0,0 +1,186 @@
+# ingredient_norm.py
+# 🔤 재료명 정규화 + 자모 n-gram 유사도 색인
+# 단순 부분 문자열 비교는 "파"가 "양파"/"파스타"에 걸리고, "다진 마늘"과 "다진마늘"은 서로 못 찾습니다.
+#   normalize(): 괄호 설명/띄어쓰기/기호 제거, 손질/원산지 수식어 떼기("냉동 새우" -> "새우"),
+#                끝 조사 떼기("두부랑" -> "두부"), 동의어 접기("달걀노른자" -> "계란노른자")
+#   NgramIndex: 정규화한 이름을 자모로 풀어서(양배추 -> ㅇㅑㅇㅂㅐㅊㅜ) 3글자씩 색인하고,
+#               포함 관계(마늘 ⊂ 다진마늘) 또는 유사도(양배치 ≈ 양배추)로 찾아줍니다.
+#               유사도는 오타 고치기용이라 글자 수가 같은 이름끼리만 봅니다. (양파즙 ≉ 양파, 간장게장 ≉ 간장)
+# database.py(레시피 재료명)와 substitutes.py(대체 그래프)가 같은 규칙을 씁니다.
+import re
+import unicodedata
+from functools import lru_cache
+
+NGRAM_SIZE = 3
+NORMALIZE_CACHE_SIZE = 8192
+FUZZY_THRESHOLD = 0.6           # 자모 3-gram Dice 유사도가 이 이상이면 같은 재료로 봅니다 (오타/표기 차이)
+TYPO_WEIGHT = 0.9               # 오타로 보고 고친 재료에 곱하는 가중치: 실제로 맞는 재료보다 앞서지 않도록
+
+# 동의어: 왼쪽 표기는 오른쪽 이름으로 접습니다. (띄어쓰기 없이, 소문자로)
+SYNONYMS = {
+    "달걀": "계란", "egg": "계란", "eggs": "계란",
+    "쇠고기": "소고기", "우육": "소고기", "beef": "소고기",
+    "돈육": "돼지고기", "pork": "돼지고기",
+    "계육": "닭고기", "chicken": "닭고기",
+    "파": "대파", "green onion": "대파", "scallion": "대파",
+    "onion": "양파", "garlic": "마늘", "간마늘": "다진마늘", "마늘다진것": "다진마늘",
+    "청량고추": "청양고추", "고추가루": "고춧가루", "후춧가루": "후추", "후추가루": "후추",
+    "백설탕": "설탕", "흰설탕": "설탕", "올리브오일": "올리브유", "식물성기름": "식용유",
+    "캔참치": "참치", "참치캔": "참치", "소세지": "소시지", "케찹": "케첩", "파르메산치즈": "파마산치즈",
+}
+SYNONYMS = {re.sub(r'\s+', '', key): value for key, value in SYNONYMS.items()}
+
+# 앞에 붙은 손질/상태/원산지 수식어. 떼고 남는 이름이 2글자 이상일 때만 뗍니다.
+# ("다진 마늘"의 '다진'은 대체 그래프에 따로 있는 재료라 그대로 둡니다.)
+MODIFIER_PREFIXES = ("국내산", "수입산", "국산", "냉동", "냉장", "유기농", "무농약", "손질한", "손질된", "깨끗이씻은", "씻은",
+                     "삶은", "데친", "볶은", "구운", "말린", "얇게썬", "잘게썬", "채썬", "썬", "깐")
+
+# 끝에 붙은 조사. 떼고 남는 이름이 2글자 이상일 때만 뗍니다.
+#   - 받침에 맞는 조사만 뗍니다. ("사과", "무화과"의 '과'는 받침 없는 글자 뒤라 조사가 아님)
+#   - 받침과 상관없는 조사('도', '만', '하고')나 받침이 맞아도 원래 그렇게 끝나는 이름은 PARTICLE_PROTECTED에 적습니다.
+PARTICLES = ("이랑", "하고", "랑", "과", "와", "을", "를", "은", "는", "도", "만")
+AFTER_CONSONANT = ("이랑", "과", "을", "은")     # 받침 있는 글자 뒤에만 붙는 조사
+AFTER_VOWEL = ("랑", "와", "를", "는")           # 받침 없는 글자 뒤에만 붙는 조사
+PARTICLE_PROTECTED = ("포도", "아보카도", "약과", "수정과", "정과", "한과", "견과", "유과", "호두과")
+
+# 포함 관계라도 다른 재료인 경우
+#   - 가공품: 재료명 뒤에 이것들이 붙으면 다른 재료 (고추 -> 고추장, 새우 -> 새우젓, 올리브 -> 올리브유)
+#   - 따로 굳은 이름: 이 단어 안에 든 검색어는 매칭하지 않음 (배추 ⊄ 양배추, 감자 ⊄ 돼지감자)
+DERIVED_SUFFIXES = ("장", "가루", "분말", "전분", "기름", "유", "즙", "청", "잼", "소스", "젓", "액젓", "액", "엑기스",
+                    "식초", "케첩", "버터", "맛")
+DISTINCT_WORDS = ("양배추", "양파", "돼지감자", "오이고추", "물엿")
+
+PUNCTUATION_RE = re.compile(r'[\s\-_.,·/\'"!?~*]+')
+PARENTHESES_RE = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+HANGUL_RE = re.compile(r'[가-힣]+')
+LATIN_WORD_RE = re.compile(r'[a-z]+')
+
+def _has_final_consonant(ch):
+    code = ord(ch) - 0xAC00
+    return 0 <= code < 11172 and code % 28 != 0
+
+def _strip_particle(name):
+    if name.endswith(PARTICLE_PROTECTED): return name
+    for particle in PARTICLES:
+        if name.endswith(particle) and len(name) - len(particle) >= 2:
+            stem = name[:-len(particle)]
+            if particle in AFTER_CONSONANT and not _has_final_consonant(stem[-1]): return name
+            if particle in AFTER_VOWEL and _has_final_consonant(stem[-1]): return name
+            return stem
+    return name
+
+def _strip_modifier(name):
+    for prefix in MODIFIER_PREFIXES:
+        if name.startswith(prefix) and len(name) - len(prefix) >= 2:
+            return _strip_modifier(name[len(prefix):])
+    return name
+
+def _fold_synonym(name):
+    if name in SYNONYMS: return SYNONYMS[name]
+    # 두 글자 이상인 한글 동의어는 이름 앞/뒤에 붙어 있어도 바꿉니다. ("달걀노른자" -> "계란노른자")
+    # 나머지도 한글일 때만 (영어 동의어는 normalize에서 단어 단위로만 바꿈: "egg"가 "eggplant"에 걸리지 않도록)
+    if not HANGUL_RE.fullmatch(name): return name
+    for word, canonical in _EDGE_SYNONYMS:
+        if name.startswith(word): return canonical + name[len(word):]
+        if name.endswith(word): return name[:-len(word)] + canonical
+    return name
+
+_EDGE_SYNONYMS = sorted(((word, canonical) for word, canonical in SYNONYMS.items()
+                         if len(word) >= 2 and HANGUL_RE.fullmatch(word)), key=lambda item: -len(item[0]))
+
+def _fold_latin_words(text):
+    """영어 단어를 통째로만 동의어로 바꿉니다. "chicken breast" -> "닭고기 breast", "eggplant"는 그대로"""
+    return LATIN_WORD_RE.sub(lambda m: SYNONYMS.get(m.group(), m.group()), text)
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize(name):
+    """재료명 -> 비교용 이름. "다진 마늘(국산)" -> "다진마늘", "냉동 달걀을" -> "계란" """
+    text = PARENTHESES_RE.sub(' ', unicodedata.normalize("NFC", name or "").lower())
+    name = PUNCTUATION_RE.sub('', text)
+    if name in SYNONYMS: return SYNONYMS[name]          # "green onion" 처럼 여러 단어인 동의어
+    name = PUNCTUATION_RE.sub('', _fold_latin_words(text))
+    return _fold_synonym(_strip_modifier(_strip_particle(name)))
+
+# --- 한글 자모 분해 ---
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ",
+             "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+def decompose(text):
+    """완성형 한글을 자모로 풉니다. "양파" -> "ㅇㅑㅇㅍㅏ" (한글이 아닌 글자는 그대로)"""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(CHOSEONG[code // 588] + JUNGSEONG[code % 588 // 28] + JONGSEONG[code % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+def ngrams(name, n=NGRAM_SIZE):
+    padded = f"^{decompose(name)}$"
+    if len(padded) <= n: return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+def contains_ingredient(name, term):
+    """term(정규화된 검색어)이 name(정규화된 재료명)을 가리키는지: 같거나, 2글자 이상이면서 가공품/다른 재료가 아닌 포함 관계"""
+    if name == term: return True
+    if len(term) < 2: return False          # "파", "무" 같은 한 글자는 같을 때만 ("파" -> "파스타" 방지)
+    start = name.find(term)
+    if start == -1: return False
+    if name[start + len(term):].startswith(DERIVED_SUFFIXES): return False
+    return not any(word != term and term in word and word in name for word in DISTINCT_WORDS)
+
+def similarity(a_grams, b_grams):
+    if not a_grams or not b_grams: return 0.0
+    return 2 * len(a_grams & b_grams) / (len(a_grams) + len(b_grams))
+
+def match_score(name, term, name_grams, term_grams):
+    """1.0 = 같은 재료(포함 관계), 0.0 = 글자는 들어 있지만 다른 재료(고추 -> 고추장) 또는 글자 수가 다른 이름, 그 밖에는 자모 유사도"""
+    if term in name: return 1.0 if contains_ingredient(name, term) else 0.0
+    if len(name) != len(term): return 0.0
+    return similarity(term_grams, name_grams)
+
+class NgramIndex:
+    """정규화한 재료명 -> 자모 n-gram 역색인. id는 호출하는 쪽(ingredient_names.id, 그래프 id)이 정합니다."""
+    def __init__(self, n=NGRAM_SIZE):
+        self.n = n
+        self.names = {}               # id -> 정규화된 이름
+        self.grams = {}               # id -> n-gram 집합
+        self.postings = {}            # n-gram -> id 집합
+        self.max_id = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name_id, name):
+        grams = ngrams(name, self.n)
+        self.names[name_id] = name
+        self.grams[name_id] = grams
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(name_id)
+        if isinstance(name_id, int): self.max_id = max(self.max_id, name_id)
+
+    def lookup(self, term, threshold=FUZZY_THRESHOLD, containment=True):
+        """
+        정규화된 term과 맞는 [(id, 유사도), ...]를 유사도 높은 순으로 돌려줍니다.
+        포함 관계(contains_ingredient)는 1.0, 그 밖에는 글자 수가 같고 자모 n-gram 유사도가 threshold 이상인 것만.
+        포함 관계로 맞는 이름이 하나라도 있으면 유사도로만 맞는 이름은 빼고 돌려줍니다. (오타가 아니라 다른 재료일 수 있으므로)
+        containment=False면 포함 관계는 따지지 않고 유사도만 봅니다. (그래프 이름 오타 고치기용)
+        """
+        if not term: return []
+        term_grams = ngrams(term, self.n)
+        # 포함 관계면 검색어 안쪽의 n-gram은 모두 겹치므로 n-gram을 하나라도 공유하는 id만 보면 됩니다.
+        candidates = set()
+        for gram in term_grams:
+            candidates |= self.postings.get(gram, set())
+        matches = []
+        for name_id in candidates:
+            if containment: score = match_score(self.names[name_id], term, self.grams[name_id], term_grams)
+            else: score = similarity(term_grams, self.grams[name_id])
+            if score >= threshold: matches.append((name_id, score))
+        if containment and any(score >= 1.0 for _, score in matches):
+            matches = [m for m in matches if m[1] >= 1.0]
+        matches.sort(key=lambda m: (-m[1], self.names[m[0]]))
+        return matches
@@ -0,0 +1,123 @@
+# jobs.py
+# 🧾 변환 작업 큐 (링크 -> 수거 -> AI 분석 -> 저장)
+# '레시피 링쿡!'은 jobs 테이블에 작업만 넣고 바로 돌아옵니다. 실제 변환은 워커 스레드가 하고,
+# 화면은 작업 상태를 몇 초마다 확인만 합니다. 세션을 떠나도 작업은 계속되고 결과는 요리책에 자동 저장됩니다.
+# 앱 프로세스 안의 워커(LINCOOK_JOB_WORKERS개)로 돌리거나, 따로 워커 프로세스를 띄울 수 있습니다.
+#   GOOGLE_API_KEY=... LINCOOK_JOB_WORKERS=4 python jobs.py
+# (별도 워커를 쓸 때는 앱 쪽을 LINCOOK_JOB_WORKERS=0 으로 두면 앱 안에서는 워커를 띄우지 않습니다.)
+import json
+import os
+import threading
+import time
+
+import database as db
+import ingest
+import link_preview
+from chef import GEMINI_MODEL_NAME, cook_recipe
+
+JOB_WORKERS = int(os.environ.get("LINCOOK_JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = 3
+JOB_LEASE_SECONDS = 5 * 60      # 이 시간 안에 끝내지 못한 작업(워커가 죽은 경우)은 다른 워커가 다시 가져감
+JOB_POLL_INTERVAL = 2.0         # 할 일이 없을 때 대기열을 다시 보는 주기(초)
+RETRY_BASE_DELAY = 5            # 재시도 대기: 5초, 10초, 20초...
+
+ACTIVE_STATUSES = ("queued", "running")
+
+class JobError(Exception):
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+_wakeup = threading.Event()
+
+def submit(user_id, url):
+    """작업을 대기열에 넣고 id를 돌려줍니다. 같은 링크로 진행 중인 작업이 있으면 그 id."""
+    job_id = db.enqueue_job(user_id, url, JOB_MAX_ATTEMPTS)
+    _wakeup.set()
+    return job_id
+
+# ==========================================
+# 1. 작업 하나 실행
+# ==========================================
+
+def run_job(job, model_factory, timings):
+    """레시피 id를 돌려줍니다. 실패하면 JobError. timings에는 AI 응답 시간(첫 내용 / 전체)이 채워집니다."""
+    db.update_job_stage(job['id'], "링크 읽는 중")
+    result = ingest.ingest(job['url'])
+    if not result.ok:
+        raise JobError(f"데이터를 가져올 수 없어요: {result.source_type}")
+
+    # 페이지에 레시피 마크업이 있으면 AI(모델 로딩 포함) 없이 바로 씁니다. (structured.py)
+    data = result.structured
+    if not data:
+        model = model_factory()
+        if model is None:
+            raise JobError("AI 모델을 불러올 수 없어요. API 키 설정을 확인해주세요.", retryable=False)
+        db.update_job_stage(job['id'], "AI가 요리책 쓰는 중")
+        # 스트리밍으로 받으면서 도착한 필드를 작업 행에 적어두면 화면이 먼저 그려줍니다.
+        data = cook_recipe(result.raw_text, result.source_type, model,
+                           on_partial=lambda fields: db.update_job_partial(job['id'], fields), timings=timings)
+    if not data:
+        raise JobError("AI가 내용을 분석하지 못했어요. 영상에 자막이 없거나 내용이 너무 짧을 수 있어요.")
+
+    db.update_job_stage(job['id'], "저장 중")
+    canonical_url = result.canonical.canonical_url
+    preview = result.link_preview or link_preview.fetch_og_metadata(canonical_url)
+    return db.add_recipe(job['user_id'], data.get('title'), data.get('markdown_content'), canonical_url, result.source_type,
+                         data.get('cuisine_type'), data.get('dish_type'), json.dumps(data.get('ingredients'), ensure_ascii=False),
+                         link_preview=preview)
+
+def process_one(model_factory):
+    """대기열에서 작업 하나를 가져와 처리합니다. 가져온 작업이 없으면 False."""
+    job = db.claim_job(JOB_LEASE_SECONDS)
+    if job is None: return False
+    started = time.perf_counter()
+    timings = {}
+    try:
+        recipe_id = run_job(job, model_factory, timings)
+    except Exception as e:
+        retryable = getattr(e, "retryable", True)
+        delay = RETRY_BASE_DELAY * 2 ** (job['attempts'] - 1) if retryable else None
+        status = db.fail_job(job['id'], e, delay)
+        print(f"⚠️ 작업 {job['id']} 실패 ({job['attempts']}/{job['max_attempts']}회, {status}): {e}")
+    else:
+        db.complete_job(job['id'], recipe_id, timings)
+        print(f"✅ 작업 {job['id']} 완료 -> 레시피 {recipe_id} ({time.perf_counter() - started:.1f}s)")
+    return True
+
+# ==========================================
+# 2. 워커
+# ==========================================
+
+def worker_loop(model_factory):
+    while True:
+        try:
+            if process_one(model_factory): continue
+        except Exception as e:
+            print(f"⚠️ 작업 워커 오류: {e}")
+        _wakeup.wait(JOB_POLL_INTERVAL)
+        _wakeup.clear()
+
+_workers_started = False
+_workers_lock = threading.Lock()
+
+def start_workers(model_factory, count=JOB_WORKERS):
+    """프로세스당 한 번만 데몬 워커 스레드를 띄웁니다. (Streamlit 리런마다 불러도 안전)
+    model_factory: 모델을 돌려주는 함수. 작업을 처음 가져갈 때 불립니다."""
+    global _workers_started
+    with _workers_lock:
+        if _workers_started: return
+        _workers_started = True
+    for i in range(count):
+        threading.Thread(target=worker_loop, args=(model_factory,), name=f"job-worker-{i}", daemon=True).start()
+
+def load_model_from_env():
+    import google.generativeai as genai
+    genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+    return genai.GenerativeModel(GEMINI_MODEL_NAME)
+
+if __name__ == "__main__":
+    model = load_model_from_env()
+    print(f"🧾 작업 워커 {max(JOB_WORKERS, 1)}개 시작 (DB: {db.DB_NAME})")
+    start_workers(lambda: model, max(JOB_WORKERS, 1))
+    while True: time.sleep(3600)
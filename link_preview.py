@@ -0,0 +1,72 @@
+# link_preview.py
+# 🖼️ 링크 미리보기 (Open Graph) 메타데이터
+# og:title / og:description / og:image 는 저장할 때 한 번 받아서 recipes 테이블에 넣어두고,
+# 카드를 그릴 때는 DB 값만 씁니다. 오래된(또는 예전에 저장돼 비어 있는) 항목은 백그라운드 스레드가 천천히 채웁니다.
+import threading
+import time
+
+import database as db
+import http_client
+import url_canon
+
+PREVIEW_MAX_AGE = 7 * 24 * 3600     # 일주일 지난 미리보기는 다시 받아옴
+REFRESH_INTERVAL = 10 * 60          # 백그라운드 갱신 주기(초)
+REFRESH_BATCH = 20                  # 한 번에 갱신할 레시피 수
+
+# 유튜브는 영상 플레이어, 인스타그램은 버튼으로 보여주므로 메타데이터가 필요 없습니다.
+NO_PREVIEW_PLATFORMS = {"youtube", "instagram"}
+
+def parse_og(soup):
+    def meta(prop):
+        tag = soup.select_one(f'meta[property="{prop}"]')
+        return tag.get('content') if tag else None
+    return {"og_title": meta("og:title"), "og_description": meta("og:description"), "og_image": meta("og:image")}
+
+def fetch_og_metadata(url):
+    """네트워크에서 미리보기를 받아옵니다. 필요 없는 플랫폼이거나 실패하면 빈 값 dict."""
+    canon = url_canon.canonicalize(url)
+    if canon is None or canon.platform in NO_PREVIEW_PLATFORMS:
+        return {"og_title": None, "og_description": None, "og_image": None}
+    try:
+        from bs4 import BeautifulSoup
+        response = http_client.get(canon.canonical_url, timeout=(http_client.CONNECT_TIMEOUT, 5))
+        return parse_og(BeautifulSoup(response.text, 'html.parser'))
+    except Exception as e:
+        print(f"⚠️ 미리보기 가져오기 실패 ({url}): {e}")
+        return {"og_title": None, "og_description": None, "og_image": None}
+
+def from_recipe(recipe):
+    """DB 레시피 행에서 미리보기 dict를 꺼냅니다. 아직 한 번도 받아오지 않았으면 None."""
+    if not recipe or recipe.get('og_fetched_at') is None: return None
+    return {k: recipe.get(k) for k in ("og_title", "og_description", "og_image")}
+
+# ==========================================
+# 백그라운드 갱신
+# ==========================================
+
+def refresh_stale(limit=REFRESH_BATCH, max_age=PREVIEW_MAX_AGE):
+    stale = db.get_stale_link_previews(time.time() - max_age, limit)
+    for recipe_id, source_url in stale:
+        db.update_link_preview(recipe_id, fetch_og_metadata(source_url))
+    return len(stale)
+
+_refresher_started = False
+_refresher_lock = threading.Lock()
+
+def start_background_refresher(interval=REFRESH_INTERVAL):
+    """프로세스당 한 번만 데몬 스레드를 띄웁니다. (Streamlit 리런마다 불러도 안전)"""
+    global _refresher_started
+    with _refresher_lock:
+        if _refresher_started: return
+        _refresher_started = True
+
+    def loop():
+        while True:
+            try:
+                # 밀린 게 많으면 쉬지 않고 이어서 처리
+                while refresh_stale() == REFRESH_BATCH: pass
+            except Exception as e:
+                print(f"⚠️ 미리보기 갱신 오류: {e}")
+            time.sleep(interval)
+
+    threading.Thread(target=loop, name="link-preview-refresher", daemon=True).start()
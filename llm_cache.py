@@ -0,0 +1,67 @@
+# llm_cache.py
+# Gemini 분석 결과 캐시 (내용 주소 기반)
+# (정규화한 원문, 출처 종류, 프롬프트 버전, 모델 이름)을 해시한 값을 키로, 파싱된 JSON 결과를 DB에 저장합니다.
+# 같은 링크를 여러 사람이 저장해도 AI는 한 번만 부릅니다.
+# 프롬프트를 바꾸면 chef.PROMPT_VERSION을 올리세요. 키가 바뀌어 예전 결과는 자연스럽게 무효화됩니다.
+import hashlib
+import json
+import re
+import threading
+import time
+
+import database as db
+
+CACHE_TTL_SECONDS = 30 * 24 * 3600   # 30일 지나면 다시 분석
+CACHE_MAX_ENTRIES = 5000             # 넘치면 가장 오래 안 쓴 것부터 삭제 (LRU)
+
+_stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+def normalize_text(raw_text):
+    """공백/줄바꿈 차이만 있는 원문은 같은 키가 되도록 정리합니다."""
+    return re.sub(r'\s+', ' ', raw_text or '').strip()
+
+def make_key(raw_text, source_type, prompt_version, model_name):
+    payload = json.dumps([normalize_text(raw_text), source_type, prompt_version, model_name], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def get(key, ttl=CACHE_TTL_SECONDS):
+    now = time.time()
+    with db.get_cursor(commit=True) as c:
+        row = c.execute('SELECT value, created_at FROM llm_cache WHERE key=?', (key,)).fetchone()
+        if row is None:
+            _count("misses")
+            return None
+        if now - row[1] > ttl:
+            c.execute('DELETE FROM llm_cache WHERE key=?', (key,))
+            _count("expired")
+            _count("misses")
+            return None
+        c.execute('UPDATE llm_cache SET last_used_at=? WHERE key=?', (now, key))
+    _count("hits")
+    return json.loads(row[0])
+
+def put(key, value, max_entries=CACHE_MAX_ENTRIES):
+    now = time.time()
+    with db.get_cursor(commit=True) as c:
+        c.execute('INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_used_at) VALUES (?, ?, ?, ?)',
+                  (key, json.dumps(value, ensure_ascii=False), now, now))
+        overflow = c.execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0] - max_entries
+        if overflow > 0:
+            c.execute('DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used_at LIMIT ?)', (overflow,))
+            _count("evictions", overflow)
+
+def clear():
+    with db.get_cursor(commit=True) as c:
+        c.execute('DELETE FROM llm_cache')
+
+def stats():
+    with _stats_lock:
+        result = dict(_stats)
+    lookups = result["hits"] + result["misses"]
+    result["hit_rate"] = result["hits"] / lookups if lookups else 0.0
+    return result
@@ -0,0 +1,750 @@
+# migrations.py
+# 🧱 스키마 마이그레이션 (PRAGMA user_version 기준)
+# 예전 migrate_db_v2/v3/v4.py(다른 DB 파일, except로 에러 삼키기)를 대신합니다.
+#   - MIGRATIONS의 단계를 버전 순서대로, DB의 user_version보다 높은 것만 실행합니다.
+#   - 단계 하나 = 트랜잭션 하나. 단계를 끝내면서 같은 트랜잭션에서 user_version을 올리므로, 중간에 죽어도 반쯤 적용된 단계가 남지 않습니다.
+#   - 트랜잭션을 연 뒤 버전을 다시 확인하므로, 여러 프로세스가 동시에 시작해도 한 단계는 한 번만 적용됩니다.
+#   - Backfill 단계는 setup(테이블/컬럼)만 단계 트랜잭션에서 하고 user_version을 올린 뒤, 큰 테이블은 BACKFILL_BATCH행씩
+#     나눠서 각각 짧은 트랜잭션으로 채웁니다. 배치 사이에는 쓰기 잠금을 놓으므로 다른 프로세스(앱, 작업 워커)가 계속 읽고 쓸 수 있고,
+#     어디까지 했는지 schema_backfills에 남겨서 중간에 멈춰도 다음 실행 때 이어서 합니다.
+#     그래서 채우기는 뒤 단계보다 늦게 끝날 수 있습니다. 뒤 단계가 채운 데이터에 기대야 하면 다시 계산하는 Backfill로 만드세요.
+#   - 단계는 앱 모듈을 부르지 않고 이 파일에 고정한 규칙 사본만 씁니다. (앱 규칙을 고쳐도 배포한 단계는 그대로)
+# 앱은 database.get_pool()이 처음 풀을 만들 때 migrate(defer_backfills=True)를 부릅니다. 스키마 단계와 채우기의 setup만
+# 풀 잠금 안에서 하고, 채우기는 풀을 내준 뒤 백그라운드 스레드가 run_backfills()로 합니다. (그동안 검색 색인 등이 덜 찬 채로 동작)
+# v12처럼 큰 테이블을 한 번에 고치는 예전 단계가 남은 DB는 첫 요청이 그 단계를 기다리므로, 배포 전에 아래 CLI로 먼저 올리세요.
+# (CLI는 채우기까지 끝까지 하고, 채우는 동안에도 앱이 배치 사이사이에 계속 읽고 쓸 수 있습니다.)
+#   python migrations.py [DB 파일]            # 최신 버전까지
+#   python migrations.py [DB 파일] --status   # 현재 버전과 남은 단계만 보기
+# 새 인덱스/컬럼이 필요하면 MIGRATIONS 끝에 (버전, 함수 또는 Backfill)을 추가하세요. 이미 배포한 단계는 고치지 마세요.
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import credentials
+import database as db
+
+BACKFILL_BATCH = 500
+BACKFILL_PAUSE = 0.005        # 배치 사이 쉬는 시간(초): 기다리던 다른 쓰기가 잠금을 잡을 틈
+
+@dataclass(frozen=True)
+class Backfill:
+    """
+    큰 테이블을 나눠서 채우는 단계.
+    setup(c): 테이블/컬럼 만들기 (한 트랜잭션)
+    batch(c, after, limit): after 다음부터 limit행 처리하고 다음 after를 돌려줌, 끝났으면 None (배치마다 한 트랜잭션)
+    finish(c): 다 채운 뒤 인덱스 만들기/정리 (마지막 배치 트랜잭션)
+    after는 JSON으로 저장하므로 숫자나 리스트로 쓰세요.
+    batch_size: 배치 하나가 무거운 단계(비밀번호 해시 등)는 여기에 더 작은 배치 크기를 적습니다.
+    prepare(conn, after, limit): 무거운 계산은 쓰기 잠금을 잡기 전에 여기서 하고 결과를 돌려줍니다.
+        그러면 batch는 batch(c, after, limit, prepared)로 불리고, 결과를 쓰기만 합니다.
+        (그 사이 다른 프로세스가 같은 배치를 먼저 끝냈으면 버리고 다시 준비합니다)
+    """
+    setup: Callable
+    batch: Callable
+    finish: Optional[Callable] = None
+    batch_size: Optional[int] = None
+    prepare: Optional[Callable] = None
+
+# ==========================================
+# 기본 테이블 (버전 0)
+# ==========================================
+USERS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        nickname TEXT,
+        email TEXT,
+        address TEXT,
+        birthdate TEXT,
+        gender TEXT,
+        profile_image TEXT,
+        token TEXT,
+        created_at TEXT
+    )
+'''
+RECIPES_TABLE = '''
+    CREATE TABLE IF NOT EXISTS recipes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        title TEXT,
+        content TEXT,
+        source_url TEXT,
+        source_type TEXT,
+        cuisine_type TEXT,
+        dish_type TEXT,
+        ingredients TEXT,
+        folder_name TEXT DEFAULT '기본 폴더',
+        is_favorite INTEGER DEFAULT 0,
+        created_at TEXT,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )
+'''
+# 예전 앱(namane_app.db 시절)에서 만든 DB에는 없을 수 있는 컬럼. 버전 0인 DB에서만 채워 넣습니다.
+LEGACY_COLUMNS = {
+    "users": ("nickname TEXT", "email TEXT", "address TEXT", "birthdate TEXT", "gender TEXT", "profile_image TEXT",
+              "token TEXT", "created_at TEXT"),
+    "recipes": ("source_url TEXT", "source_type TEXT", "cuisine_type TEXT", "dish_type TEXT", "ingredients TEXT",
+                "folder_name TEXT DEFAULT '기본 폴더'", "is_favorite INTEGER DEFAULT 0", "created_at TEXT"),
+}
+
+def columns(c, table):
+    return {row[1] for row in c.execute(f'PRAGMA table_info({table})').fetchall()}
+
+def add_column(c, table, definition):
+    """컬럼이 없을 때만 추가합니다. (다시 실행해도 안전)"""
+    if definition.split()[0] not in columns(c, table):
+        c.execute(f'ALTER TABLE {table} ADD COLUMN {definition}')
+
+def _create_base_tables(c):
+    c.execute(USERS_TABLE)
+    c.execute(RECIPES_TABLE)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS schema_backfills (
+            version INTEGER PRIMARY KEY,
+            after TEXT,
+            batches INTEGER NOT NULL DEFAULT 0,
+            started_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    ''')
+    if _version(c) > 0: return
+    for table, definitions in LEGACY_COLUMNS.items():
+        for definition in definitions: add_column(c, table, definition)
+    # 예전 migrate_db_v4.py는 앱이 읽는 token 대신 auth_token 컬럼을 만들었습니다.
+    if "auth_token" in columns(c, "users"):
+        c.execute('UPDATE users SET token=auth_token WHERE token IS NULL AND auth_token IS NOT NULL')
+
+# ==========================================
+# 단계가 쓰는 규칙 사본
+# ==========================================
+# 단계는 앱 코드(url_canon, ingredient_norm, quantity, database)를 직접 부르지 않고, 여기 고정해 둔 사본만 씁니다.
+# 앱 쪽 규칙을 나중에 고쳐도 이미 배포한 단계가 하는 일은 바뀌지 않아야 하기 때문입니다.
+# 규칙이 바뀌어 저장된 데이터도 고쳐야 하면, 사본을 고치지 말고 새 사본과 새 단계(v15처럼 다시 계산하는 Backfill)를 추가하세요.
+
+# --- v5: 링크 키 (url_canon.canonical_key 사본) ---
+_V5_YOUTUBE_ID = r'([0-9A-Za-z_-]{11})'
+_V5_YOUTUBE_HOSTS = {"youtube.com", "m.youtube.com", "music.youtube.com", "youtube-nocookie.com"}
+_V5_YOUTUBE_PATH_RE = re.compile(r'^/(?:shorts|embed|live|v|e)/' + _V5_YOUTUBE_ID + r'(?:[/?#]|$)')
+_V5_YOUTU_BE_PATH_RE = re.compile(r'^/' + _V5_YOUTUBE_ID + r'(?:[/?#]|$)')
+_V5_YOUTUBE_ID_RE = re.compile(r'^' + _V5_YOUTUBE_ID + r'$')
+_V5_INSTAGRAM_HOSTS = {"instagram.com", "m.instagram.com"}
+_V5_INSTAGRAM_PATH_RE = re.compile(r'^/(?:[A-Za-z0-9_.]+/)?(?:p|reel|reels|tv)/([A-Za-z0-9_-]+)')
+_V5_NAVER_BLOG_HOSTS = {"blog.naver.com", "m.blog.naver.com"}
+_V5_NAVER_BLOG_PATH_RE = re.compile(r'^/([A-Za-z0-9_-]+)/(\d+)(?:[/?#]|$)')
+_V5_NAVER_BLOG_VIEW_RE = re.compile(r'^/PostView\.(?:naver|nhn)$', re.IGNORECASE)
+_V5_TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "igsh", "si", "feature", "ref", "ref_src", "from", "trackingCode"}
+
+def _url_key_v5(url):
+    """"youtube:abcdefghijk" 같은 중복 확인용 키, 주소가 아니면 None"""
+    url = (url or "").strip()
+    if not url: return None
+    if not re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*://', url): url = "https://" + url
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    host = parts.hostname or ""
+    if not parts.netloc or ("." not in host.strip(".") and ":" not in host): return None
+    if host.startswith("www."): host = host[4:]
+    query = dict(parse_qsl(parts.query))
+    if host == "youtu.be":
+        match = _V5_YOUTU_BE_PATH_RE.match(parts.path)
+        if match: return f"youtube:{match.group(1)}"
+    elif host in _V5_YOUTUBE_HOSTS:
+        if parts.path in ("/watch", "/watch/") and _V5_YOUTUBE_ID_RE.match(query.get("v", "")): return f"youtube:{query['v']}"
+        match = _V5_YOUTUBE_PATH_RE.match(parts.path)
+        if match: return f"youtube:{match.group(1)}"
+    elif host in _V5_INSTAGRAM_HOSTS:
+        match = _V5_INSTAGRAM_PATH_RE.match(parts.path)
+        if match: return f"instagram:{match.group(1)}"
+    elif host in _V5_NAVER_BLOG_HOSTS:
+        match = _V5_NAVER_BLOG_PATH_RE.match(parts.path)
+        if match: return f"naver_blog:{match.group(1)}/{match.group(2)}"
+        if _V5_NAVER_BLOG_VIEW_RE.match(parts.path) and query.get("blogId") and query.get("logNo", "").isdigit():
+            return f"naver_blog:{query['blogId']}/{query['logNo']}"
+    params = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                    if k not in _V5_TRACKING_PARAMS and not k.startswith("utm_"))
+    if ":" in host: host = f"[{host}]"
+    netloc = host if not port or port in (80, 443) else f"{host}:{port}"
+    return "web:" + urlunsplit(("https", netloc, parts.path.rstrip("/") or "/", urlencode(params), ""))
+
+# --- v10: ingredients 컬럼 읽기 (database.parse_ingredients 사본) ---
+def _parse_ingredients_v10(ingredients):
+    """ingredients 컬럼(JSON 문자열 또는 구버전 텍스트) -> [(재료명, 수량 글자), ...]"""
+    if not ingredients: return []
+    try:
+        ingredients = json.loads(ingredients)
+    except ValueError:
+        return [(name.strip(), "") for name in re.split(r'[,\n]', ingredients) if name.strip()]
+    if not isinstance(ingredients, list): return []
+    items = []
+    for item in ingredients:
+        name, amount = (item.get('name'), item.get('amount')) if isinstance(item, dict) else (item, "")
+        name, amount = str(name or "").strip(), str(amount or "").strip()
+        if name: items.append((name, amount))
+    return items
+
+def _intern_names(c, names):
+    """정규화한 재료명 -> id (없으면 ingredient_names에 추가)"""
+    names = set(names)
+    if not names: return {}
+    placeholders = ','.join('?' for _ in names)
+    ids = dict(c.execute(f'SELECT name, id FROM ingredient_names WHERE name IN ({placeholders})', list(names)).fetchall())
+    for name in names - ids.keys():
+        c.execute('INSERT INTO ingredient_names (name) VALUES (?)', (name,))
+        ids[name] = c.lastrowid
+    return ids
+
+# --- v11: 수량 글자 -> (quantity, unit) 컬럼 (quantity.parse_quantity 사본, v10도 씀) ---
+_V11_UNITS = {}
+for _names, _unit in [
+    (("ml", "mL", "ML", "㎖", "cc", "밀리리터"), "ml"),
+    (("l", "L", "ℓ", "리터"), "L"),
+    (("큰술", "T", "Ts", "tbsp", "Tbsp", "TBSP", "tbs", "밥숟가락", "밥숟갈", "숟가락", "숟갈", "스푼", "수저"), "큰술"),
+    (("작은술", "t", "ts", "tsp", "Tsp", "TSP", "티스푼", "찻숟가락", "찻숟갈"), "작은술"),
+    (("컵", "cup", "cups", "Cup", "Cups", "C"), "컵"),
+    (("g", "G", "그램", "gram", "grams"), "g"),
+    (("kg", "Kg", "KG", "킬로", "킬로그램"), "kg"),
+    (("mg",), "mg"), (("oz",), "oz"), (("lb", "lbs"), "lb"), (("근",), "근"),
+]:
+    for _name in _names: _V11_UNITS[_name] = _unit
+_V11_QUALITATIVE = ("약간", "적당량", "적당히", "조금", "소량", "취향껏", "기호에 따라", "톡톡", "to taste")
+_V11_NATIVE_NUMBERS = {"반": 0.5, "한": 1, "두": 2, "세": 3, "석": 3, "네": 4, "넉": 4, "다섯": 5}
+_V11_FRACTIONS = {"½": 0.5, "⅓": 1 / 3, "¼": 0.25, "⅔": 2 / 3, "¾": 0.75, "⅛": 0.125}
+_V11_NUMBER = r'\d+(?:\.\d+)?'
+_V11_VALUE = (rf'(?:{_V11_NUMBER}\s+)?\d+\s*/\s*\d+|(?:{_V11_NUMBER})?\s*[½⅓¼⅔¾⅛]|{_V11_NUMBER}|'
+              + '|'.join(sorted(_V11_NATIVE_NUMBERS, key=len, reverse=True)))
+_V11_AMOUNT_RE = re.compile(rf'^\s*(?:약\s*)?(?P<low>{_V11_VALUE})(?:\s*[~\-–]\s*(?P<high>{_V11_VALUE}))?'
+                            rf'\s*(?P<unit>[^\s\d(),/~\-–]*)\s*(?P<half>반)?')
+_V11_VALUE_PARTS_RE = re.compile(r'^(?:(\d+(?:\.\d+)?)\s+)?(\d+)\s*/\s*(\d+)$|^(\d+(?:\.\d+)?)?\s*([½⅓¼⅔¾⅛])$')
+
+def _amount_value_v11(text):
+    text = text.strip()
+    if text in _V11_NATIVE_NUMBERS: return _V11_NATIVE_NUMBERS[text]
+    match = _V11_VALUE_PARTS_RE.match(text)
+    if not match: return float(text)
+    whole, num, den, lead, fraction = match.groups()
+    if num is not None:
+        return None if int(den) == 0 else float(whole or 0) + int(num) / int(den)
+    return float(lead or 0) + _V11_FRACTIONS[fraction]
+
+def _amount_columns_v11(amount):
+    """"1T" -> (1.0, "큰술"), "2~3개" -> (3.0, "개"), 숫자로 못 읽으면 (None, None)"""
+    amount = (amount or "").strip()
+    if not amount or amount.startswith(_V11_QUALITATIVE): return None, None
+    match = _V11_AMOUNT_RE.match(amount)
+    if not match: return None, None
+    value = _amount_value_v11(match.group("high") or match.group("low"))
+    if value is None: return None, None
+    unit, half = match.group("unit"), match.group("half")
+    if unit.endswith("반") and len(unit) > 1: unit, half = unit[:-1], "반"
+    if half: value += 0.5
+    if not unit: return value, None
+    return value, _V11_UNITS.get(unit) or _V11_UNITS.get(unit.lower()) or unit
+
+# --- v17: 수량 단위 (v11 사본에서 단위 찾기만 바뀜) ---
+# 대문자 T(큰술)와 소문자 t(작은술)는 소문자로 바꿔 다시 찾지 않습니다. ("2TS"가 작은술로 읽히던 것)
+_V17_UNITS = dict(_V11_UNITS, TS="큰술", tS="작은술")
+_V17_CASE_SENSITIVE_UNITS = ("t", "ts")
+
+def _amount_columns_v17(amount):
+    """"2TS" -> (2.0, "큰술"), "2ts" -> (2.0, "작은술"), 숫자로 못 읽으면 (None, None)"""
+    amount = (amount or "").strip()
+    if not amount or amount.startswith(_V11_QUALITATIVE): return None, None
+    match = _V11_AMOUNT_RE.match(amount)
+    if not match: return None, None
+    value = _amount_value_v11(match.group("high") or match.group("low"))
+    if value is None: return None, None
+    unit, half = match.group("unit"), match.group("half")
+    if unit.endswith("반") and len(unit) > 1: unit, half = unit[:-1], "반"
+    if half: value += 0.5
+    if not unit: return value, None
+    if unit.lower() in _V17_CASE_SENSITIVE_UNITS: return value, _V17_UNITS.get(unit) or unit
+    return value, _V17_UNITS.get(unit) or _V17_UNITS.get(unit.lower()) or unit
+
+# --- v15: 재료명 정규화 (ingredient_norm.normalize 사본) ---
+# v10/v12도 이 사본을 씁니다. v15가 모든 행의 name_id를 원래 이름에서 이 규칙으로 다시 계산하므로
+# v10/v12가 어떤 규칙으로 채웠든 v15를 마친 결과는 같습니다.
+_V15_SYNONYMS = {
+    "달걀": "계란", "egg": "계란", "eggs": "계란",
+    "쇠고기": "소고기", "우육": "소고기", "beef": "소고기",
+    "돈육": "돼지고기", "pork": "돼지고기",
+    "계육": "닭고기", "chicken": "닭고기",
+    "파": "대파", "green onion": "대파", "scallion": "대파",
+    "onion": "양파", "garlic": "마늘", "간마늘": "다진마늘", "마늘다진것": "다진마늘",
+    "청량고추": "청양고추", "고추가루": "고춧가루", "후춧가루": "후추", "후추가루": "후추",
+    "백설탕": "설탕", "흰설탕": "설탕", "올리브오일": "올리브유", "식물성기름": "식용유",
+    "캔참치": "참치", "참치캔": "참치", "소세지": "소시지", "케찹": "케첩", "파르메산치즈": "파마산치즈",
+}
+_V15_SYNONYMS = {re.sub(r'\s+', '', key): value for key, value in _V15_SYNONYMS.items()}
+_V15_MODIFIER_PREFIXES = ("국내산", "수입산", "국산", "냉동", "냉장", "유기농", "무농약", "손질한", "손질된", "깨끗이씻은", "씻은",
+                          "삶은", "데친", "볶은", "구운", "말린", "얇게썬", "잘게썬", "채썬", "썬", "깐")
+_V15_PARTICLES = ("이랑", "하고", "랑", "과", "와", "을", "를", "은", "는", "도", "만")
+_V15_AFTER_CONSONANT = ("이랑", "과", "을", "은")
+_V15_AFTER_VOWEL = ("랑", "와", "를", "는")
+_V15_PARTICLE_PROTECTED = ("포도", "아보카도", "약과", "수정과", "정과", "한과", "견과", "유과", "호두과")
+_V15_PUNCTUATION_RE = re.compile(r'[\s\-_.,·/\'"!?~*]+')
+_V15_PARENTHESES_RE = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+_V15_HANGUL_RE = re.compile(r'[가-힣]+')
+_V15_LATIN_WORD_RE = re.compile(r'[a-z]+')
+_V15_EDGE_SYNONYMS = sorted(((word, canonical) for word, canonical in _V15_SYNONYMS.items()
+                             if len(word) >= 2 and _V15_HANGUL_RE.fullmatch(word)), key=lambda item: -len(item[0]))
+
+def _has_final_consonant(ch):
+    code = ord(ch) - 0xAC00
+    return 0 <= code < 11172 and code % 28 != 0
+
+def _normalize_v15(name):
+    """"다진 마늘(국산)" -> "다진마늘", "냉동 달걀을" -> "계란" """
+    text = _V15_PARENTHESES_RE.sub(' ', unicodedata.normalize("NFC", name or "").lower())
+    name = _V15_PUNCTUATION_RE.sub('', text)
+    if name in _V15_SYNONYMS: return _V15_SYNONYMS[name]
+    name = _V15_PUNCTUATION_RE.sub('', _V15_LATIN_WORD_RE.sub(lambda m: _V15_SYNONYMS.get(m.group(), m.group()), text))
+    # 끝 조사 (받침에 맞는 것만)
+    if not name.endswith(_V15_PARTICLE_PROTECTED):
+        for particle in _V15_PARTICLES:
+            if name.endswith(particle) and len(name) - len(particle) >= 2:
+                stem = name[:-len(particle)]
+                if particle in _V15_AFTER_CONSONANT and not _has_final_consonant(stem[-1]): break
+                if particle in _V15_AFTER_VOWEL and _has_final_consonant(stem[-1]): break
+                name = stem
+                break
+    # 앞 수식어
+    stripped = True
+    while stripped:
+        stripped = False
+        for prefix in _V15_MODIFIER_PREFIXES:
+            if name.startswith(prefix) and len(name) - len(prefix) >= 2:
+                name, stripped = name[len(prefix):], True
+                break
+    # 동의어
+    if name in _V15_SYNONYMS: return _V15_SYNONYMS[name]
+    if not _V15_HANGUL_RE.fullmatch(name): return name
+    for word, canonical in _V15_EDGE_SYNONYMS:
+        if name.startswith(word): return canonical + name[len(word):]
+        if name.endswith(word): return name[:-len(word)] + canonical
+    return name
+
+# ==========================================
+# 단계 (한 번 배포한 단계는 고치지 말고 새 버전을 추가하세요)
+# ==========================================
+# v1: 자주 쓰는 조회(WHERE user_id=? ORDER BY created_at, 토큰/이메일/닉네임 검색)용 보조 인덱스
+INDEXES_V1 = (
+    ("idx_recipes_user_created", "recipes(user_id, created_at)"),
+    ("idx_recipes_user_folder", "recipes(user_id, folder_name)"),
+    ("idx_recipes_user_favorite", "recipes(user_id, is_favorite)"),
+    ("idx_users_token", "users(token)"),
+    ("idx_users_email", "users(email)"),
+    ("idx_users_nickname", "users(nickname)"),
+)
+
+def _create_indexes_v1(c):
+    for name, target in INDEXES_V1:
+        c.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {target}')
+
+# v2: 즐겨찾기/폴더별 목록도 created_at 순서로 페이지를 넘길 수 있도록 인덱스 끝에 created_at 추가
+def _extend_list_indexes_v2(c):
+    c.execute('DROP INDEX IF EXISTS idx_recipes_user_folder')
+    c.execute('DROP INDEX IF EXISTS idx_recipes_user_favorite')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_recipes_user_folder ON recipes(user_id, folder_name, created_at)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_recipes_user_favorite ON recipes(user_id, is_favorite, created_at)')
+
+# v3: '냉장고를 부탁해'용 재료 역색인 (재료 접미사 -> 레시피 id)
+# v10에서 recipe_ingredients로 바뀌어 지워지므로, 새 DB에서는 빈 테이블만 만들고 넘어갑니다.
+def _create_ingredient_index_v3(c):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS ingredient_index (
+            user_id INTEGER NOT NULL,
+            suffix TEXT NOT NULL,
+            recipe_id INTEGER NOT NULL,
+            PRIMARY KEY (user_id, suffix, recipe_id)
+        ) WITHOUT ROWID
+    ''')
+
+# v4: Gemini 분석 결과 캐시 (llm_cache.py)
+def _create_llm_cache_v4(c):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used_at)')
+
+# v5: 정규화된 링크 키 (같은 유저가 같은 레시피를 두 번 저장/분석하지 않도록)
+#     유니크 인덱스를 먼저 만들고 id 순서로 채우므로, 이미 중복 저장된 예전 데이터는 가장 먼저 저장한 것에만 키가 붙습니다. (OR IGNORE)
+def _add_canonical_key_v5(c):
+    add_column(c, 'recipes', 'canonical_key TEXT')
+    c.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_recipes_user_canonical
+                 ON recipes(user_id, canonical_key) WHERE canonical_key IS NOT NULL''')
+
+def _fill_canonical_key_v5(c, after, limit):
+    rows = c.execute('SELECT id, source_url FROM recipes WHERE id > ? AND canonical_key IS NULL ORDER BY id LIMIT ?',
+                     (after or 0, limit)).fetchall()
+    if not rows: return None
+    c.executemany('UPDATE OR IGNORE recipes SET canonical_key=? WHERE id=?',
+                  [(_url_key_v5(source_url), recipe_id) for recipe_id, source_url in rows])
+    return rows[-1][0]
+
+CANONICAL_KEY_V5 = Backfill(setup=_add_canonical_key_v5, batch=_fill_canonical_key_v5)
+
+# v6: 링크 미리보기(Open Graph) 메타데이터 저장 -> 카드 그릴 때 네트워크 요청 없음
+def _add_link_preview_v6(c):
+    for column in ("og_title TEXT", "og_description TEXT", "og_image TEXT", "og_fetched_at REAL"):
+        add_column(c, 'recipes', column)
+    c.execute('CREATE INDEX IF NOT EXISTS idx_recipes_og_fetched ON recipes(og_fetched_at)')
+
+# v7: 링크 -> 레시피 변환 작업 큐 (jobs.py의 워커가 처리)
+def _create_jobs_v7(c):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            url TEXT NOT NULL,
+            canonical_key TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            stage TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            error TEXT,
+            recipe_id INTEGER,
+            run_after REAL NOT NULL,
+            lease_until REAL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    ''')
+    # 같은 유저가 같은 링크를 여러 번 눌러도 진행 중인 작업은 하나만
+    c.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_user_active
+                 ON jobs(user_id, canonical_key) WHERE status IN ('queued', 'running')''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs(status, run_after)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_jobs_user_created ON jobs(user_id, created_at)')
+
+# v8: 여러 프로세스가 나눠 쓰는 Gemini 호출 한도 (rate_limit.py, LINCOOK_RATE_LIMIT_SHARED=1일 때)
+def _create_rate_limits_v8(c):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS rate_limits (
+            name TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    ''')
+
+# v9: 스트리밍 중간 결과(화면에 먼저 그릴 필드)와 AI 응답 시간(첫 내용 / 전체)
+def _add_job_progress_v9(c):
+    for column in ("partial TEXT", "llm_first_content REAL", "llm_total REAL"):
+        add_column(c, 'jobs', column)
+
+# v10: 재료를 JSON 텍스트 대신 행으로 (재료명 사전 + 접미사 색인 + 레시피별 재료), 기존 레시피 채우기
+def _create_recipe_ingredients_v10(c):
+    c.execute('CREATE TABLE IF NOT EXISTS ingredient_names (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS ingredient_name_suffixes (
+            suffix TEXT NOT NULL,
+            name_id INTEGER NOT NULL,
+            PRIMARY KEY (suffix, name_id)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS recipe_ingredients (
+            recipe_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            name_id INTEGER NOT NULL,
+            raw_name TEXT NOT NULL,
+            quantity REAL,
+            unit TEXT,
+            raw_amount TEXT,
+            PRIMARY KEY (recipe_id, position)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_recipe_ingredients_user_name ON recipe_ingredients(user_id, name_id)')
+
+def _fill_recipe_ingredients_v10(c, after, limit):
+    rows = c.execute('SELECT id, user_id, ingredients FROM recipes WHERE id > ? ORDER BY id LIMIT ?', (after or 0, limit)).fetchall()
+    if not rows: return None
+    for recipe_id, user_id, ingredients in rows:
+        c.execute('DELETE FROM recipe_ingredients WHERE recipe_id=?', (recipe_id,))
+        items = [(name, amount, _normalize_v15(name)) for name, amount in _parse_ingredients_v10(ingredients)]
+        items = [item for item in items if item[2]]
+        name_ids = _intern_names(c, [key for _, _, key in items])
+        c.executemany('''INSERT INTO recipe_ingredients (recipe_id, position, user_id, name_id, raw_name, quantity, unit, raw_amount)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                      [(recipe_id, position, user_id, name_ids[key], name, *_amount_columns_v11(amount), amount)
+                       for position, (name, amount, key) in enumerate(items)])
+    return rows[-1][0]
+
+def _drop_ingredient_index_v10(c):
+    c.execute('DROP TABLE IF EXISTS ingredient_index')
+
+RECIPE_INGREDIENTS_V10 = Backfill(setup=_create_recipe_ingredients_v10, batch=_fill_recipe_ingredients_v10,
+                                  finish=_drop_ingredient_index_v10)
+
+# v11: quantity.py 파서로 수량/단위를 다시 읽기 (1T -> 1 큰술, 2~3개 -> 3 개, 약간 -> NULL)
+def _reparse_quantities_v11(c, after, limit):
+    rows = c.execute('''SELECT recipe_id, position, raw_amount FROM recipe_ingredients
+                        WHERE (recipe_id, position) > (?, ?) ORDER BY recipe_id, position LIMIT ?''', (*(after or (0, -1)), limit)).fetchall()
+    if not rows: return None
+    c.executemany('UPDATE recipe_ingredients SET quantity=?, unit=? WHERE recipe_id=? AND position=?',
+                  [(*_amount_columns_v11(amount), recipe_id, position) for recipe_id, position, amount in rows])
+    return list(rows[-1][:2])
+
+REPARSE_QUANTITIES_V11 = Backfill(setup=lambda c: None, batch=_reparse_quantities_v11)
+
+# v12: 재료명을 ingredient_norm.normalize 규칙으로 다시 정규화 (동의어/조사로 같아진 이름은 하나로 합침)
+#      냉장고 검색은 메모리의 자모 n-gram 색인을 쓰므로 접미사 테이블은 지웁니다.
+#      recipe_ingredients 전체를 한 트랜잭션으로 고치므로 레시피가 많은 DB는 배포 전에 CLI로 올리세요.
+#      (이후의 재정규화는 v15처럼 나눠서 채우는 Backfill로 추가합니다)
+def _renormalize_ingredient_names_v12(c):
+    c.execute('CREATE TEMP TABLE name_map (old_id INTEGER PRIMARY KEY, new_id INTEGER NOT NULL)')
+    c.execute('CREATE TABLE ingredient_names_v12 (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)')
+    new_ids = {}
+    for old_id, name in c.execute('SELECT id, name FROM ingredient_names ORDER BY id').fetchall():
+        key = _normalize_v15(name) or name
+        if key not in new_ids:
+            c.execute('INSERT INTO ingredient_names_v12 (name) VALUES (?)', (key,))
+            new_ids[key] = c.lastrowid
+        c.execute('INSERT INTO name_map (old_id, new_id) VALUES (?, ?)', (old_id, new_ids[key]))
+    c.execute('UPDATE recipe_ingredients SET name_id = (SELECT new_id FROM name_map WHERE old_id = recipe_ingredients.name_id)')
+    c.execute('DROP TABLE ingredient_names')
+    c.execute('ALTER TABLE ingredient_names_v12 RENAME TO ingredient_names')
+    c.execute('DROP TABLE name_map')
+    c.execute('DROP TABLE IF EXISTS ingredient_name_suffixes')
+
+# v13: 유저별 데이터 버전 (레시피를 바꿀 때마다 +1, recipe_cache.py가 화면용 묶음을 다시 만들지 판단)
+def _add_data_version_v13(c):
+    add_column(c, 'users', 'data_version INTEGER NOT NULL DEFAULT 0')
+
+# v14: 로그인 세션을 기기마다 한 행으로 (토큰은 해시만 저장). users.token에 있던 토큰은 옮기고 비웁니다.
+#      (token 컬럼은 비워만 둡니다. DROP COLUMN은 SQLite 3.35 이상에서만 됩니다)
+SESSION_TTL_V14 = 30 * 24 * 3600      # database.SESSION_TTL (옮긴 세션의 유효기간)
+def _create_sessions_v14(c):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS sessions (
+            token_hash TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            last_seen REAL NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_sessions_user_seen ON sessions(user_id, last_seen)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at)')
+    now = time.time()
+    c.executemany('INSERT OR IGNORE INTO sessions (token_hash, user_id, created_at, expires_at, last_seen) VALUES (?, ?, ?, ?, ?)',
+                  [(hashlib.sha256(token.encode('utf-8')).hexdigest(), user_id, now, now + SESSION_TTL_V14, now)
+                   for user_id, token in c.execute('SELECT id, token FROM users WHERE token IS NOT NULL').fetchall()])
+    c.execute('UPDATE users SET token=NULL WHERE token IS NOT NULL')
+    c.execute('DROP INDEX IF EXISTS idx_users_token')
+
+# v15: 정규화 규칙 수정(받침에 맞는 조사만 떼기, 영어 동의어는 단어 단위로)에 맞춰 원래 이름(raw_name)에서 name_id를 다시 계산
+#      ("아보카도"가 "아보카"로, "eggplant"가 "계란plant"로 저장돼 있던 것). 이제 아무 행도 가리키지 않는 이름은 마지막에 지웁니다.
+def _renormalize_raw_names_v15(c, after, limit):
+    rows = c.execute('''SELECT recipe_id, position, name_id, raw_name FROM recipe_ingredients
+                        WHERE (recipe_id, position) > (?, ?) ORDER BY recipe_id, position LIMIT ?''', (*(after or (0, -1)), limit)).fetchall()
+    if not rows: return None
+    keys = [_normalize_v15(raw_name) or raw_name for _, _, _, raw_name in rows]
+    name_ids = _intern_names(c, keys)
+    c.executemany('UPDATE recipe_ingredients SET name_id=? WHERE recipe_id=? AND position=?',
+                  [(name_ids[key], recipe_id, position)
+                   for (recipe_id, position, name_id, _), key in zip(rows, keys) if name_ids[key] != name_id])
+    return list(rows[-1][:2])
+
+def _drop_unused_names_v15(c):
+    c.execute('DELETE FROM ingredient_names WHERE id NOT IN (SELECT name_id FROM recipe_ingredients)')
+
+RENORMALIZE_RAW_NAMES_V15 = Backfill(setup=lambda c: None, batch=_renormalize_raw_names_v15, finish=_drop_unused_names_v15)
+
+# v16: 아직 평문으로 남은 예전 비밀번호를 해시로 (로그인을 기다리면 한 번도 안 들어오는 계정은 계속 평문으로 남음)
+#      해시 하나가 수십 ms라 배치를 작게 잡고, 배치 안의 해시는 credentials의 해시 풀에서 나눠 계산합니다.
+#      해시는 쓰기 잠금 밖(prepare)에서 계산하고, 트랜잭션에서는 그동안 비밀번호가 안 바뀐 행만 바꿉니다.
+PASSWORD_BATCH = 16
+
+def _hash_plaintext_passwords_v16(conn, after, limit):
+    rows = conn.execute('SELECT id, password FROM users WHERE id > ? ORDER BY id LIMIT ?', (after or 0, limit)).fetchall()
+    if not rows: return None
+    plain = [(user_id, password) for user_id, password in rows if not credentials.is_hashed(password)]
+    hashes = credentials.hash_passwords([password for _, password in plain])
+    return rows[-1][0], [(password_hash, user_id, password) for (user_id, password), password_hash in zip(plain, hashes)]
+
+def _store_password_hashes_v16(c, after, limit, prepared):
+    if prepared is None: return None
+    last_id, updates = prepared
+    c.executemany('UPDATE users SET password=? WHERE id=? AND password=?', updates)
+    return last_id
+
+HASH_PLAINTEXT_PASSWORDS_V16 = Backfill(setup=lambda c: None, prepare=_hash_plaintext_passwords_v16,
+                                        batch=_store_password_hashes_v16, batch_size=PASSWORD_BATCH)
+
+# v17: 작은술로 읽혔던 수량 중 대문자 T 표기("2TS")를 큰술로 다시 읽기. 작은술로 저장된 행만 보고 바뀌는 행만 고칩니다.
+def _reparse_teaspoons_v17(c, after, limit):
+    rows = c.execute('''SELECT recipe_id, position, unit, raw_amount FROM recipe_ingredients
+                        WHERE (recipe_id, position) > (?, ?) ORDER BY recipe_id, position LIMIT ?''', (*(after or (0, -1)), limit)).fetchall()
+    if not rows: return None
+    columns = [(recipe_id, position, _amount_columns_v17(amount)) for recipe_id, position, unit, amount in rows if unit == "작은술"]
+    c.executemany('UPDATE recipe_ingredients SET quantity=?, unit=? WHERE recipe_id=? AND position=?',
+                  [(*amount, recipe_id, position) for recipe_id, position, amount in columns if amount[1] != "작은술"])
+    return list(rows[-1][:2])
+
+REPARSE_TEASPOONS_V17 = Backfill(setup=lambda c: None, batch=_reparse_teaspoons_v17)
+
+MIGRATIONS = [
+    (1, _create_indexes_v1),
+    (2, _extend_list_indexes_v2),
+    (3, _create_ingredient_index_v3),
+    (4, _create_llm_cache_v4),
+    (5, CANONICAL_KEY_V5),
+    (6, _add_link_preview_v6),
+    (7, _create_jobs_v7),
+    (8, _create_rate_limits_v8),
+    (9, _add_job_progress_v9),
+    (10, RECIPE_INGREDIENTS_V10),
+    (11, REPARSE_QUANTITIES_V11),
+    (12, _renormalize_ingredient_names_v12),
+    (13, _add_data_version_v13),
+    (14, _create_sessions_v14),
+    (15, RENORMALIZE_RAW_NAMES_V15),
+    (16, HASH_PLAINTEXT_PASSWORDS_V16),
+    (17, REPARSE_TEASPOONS_V17),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# ==========================================
+# 실행기
+# ==========================================
+def _version(c):
+    return c.execute('PRAGMA user_version').fetchone()[0]
+
+@contextmanager
+def _transaction(conn):
+    """BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡고(버전 확인과 적용 사이에 끼어들기 방지) 끝나면 커밋, 에러면 롤백"""
+    if conn.in_transaction: conn.commit()
+    c = conn.cursor()
+    c.execute('BEGIN IMMEDIATE')
+    try:
+        yield c
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        c.close()
+
+def _start_backfill(conn, version, step, log):
+    """setup을 하고 채우기 상태 행을 남긴 뒤 user_version을 올립니다. 채우기 자체는 _drain_backfill이 합니다."""
+    with _transaction(conn) as c:
+        if _version(c) >= version: return
+        if c.execute('SELECT 1 FROM schema_backfills WHERE version=?', (version,)).fetchone() is None:
+            step.setup(c)
+            now = time.time()
+            c.execute('INSERT INTO schema_backfills (version, after, started_at, updated_at) VALUES (?, NULL, ?, ?)', (version, now, now))
+        else:
+            log(f"  v{version}: 멈췄던 채우기를 이어서 합니다.")
+        c.execute(f'PRAGMA user_version={version}')
+
+def _drain_backfill(conn, version, step, batch_size, log):
+    """상태 행이 없어질 때까지(= 다 채우고 finish까지) 배치를 돌립니다. 다른 프로세스와 나눠 돌아도 안전합니다."""
+    if step.batch_size: batch_size = min(batch_size, step.batch_size)
+    while True:
+        if step.prepare:
+            # 잠금 없이 읽고 계산 (다른 프로세스가 이미 끝냈으면 상태 행이 없음)
+            row = conn.execute('SELECT after FROM schema_backfills WHERE version=?', (version,)).fetchone()
+            if row is None: return
+            prepared_after = json.loads(row[0]) if row[0] is not None else None
+            prepared = step.prepare(conn, prepared_after, batch_size)
+        with _transaction(conn) as c:
+            row = c.execute('SELECT after, batches FROM schema_backfills WHERE version=?', (version,)).fetchone()
+            if row is None: return
+            after, batches = json.loads(row[0]) if row[0] is not None else None, row[1]
+            if not step.prepare:
+                next_after = step.batch(c, after, batch_size)
+            elif after != prepared_after:
+                continue        # 준비하는 동안 다른 프로세스가 이 배치를 끝냄
+            else:
+                next_after = step.batch(c, after, batch_size, prepared)
+            if next_after is None:
+                if step.finish: step.finish(c)
+                c.execute('DELETE FROM schema_backfills WHERE version=?', (version,))
+                return
+            c.execute('UPDATE schema_backfills SET after=?, batches=?, updated_at=? WHERE version=?',
+                      (json.dumps(next_after), batches + 1, time.time(), version))
+        if (batches + 1) % 20 == 0: log(f"  v{version}: 배치 {batches + 1}개 ({batch_size}행씩) 처리")
+        time.sleep(BACKFILL_PAUSE)
+
+def run_backfills(conn, batch_size=BACKFILL_BATCH, log=lambda message: None):
+    """남아 있는 채우기를 버전 순서대로 끝까지 돌리고, 끝낸 버전 리스트를 돌려줍니다."""
+    done = []
+    for version, step in MIGRATIONS:
+        # 버전보다 높은 상태 행은 예전 실행기가 채우다 멈춘 것: migrate()가 그 단계 차례에 이어서 합니다.
+        if not isinstance(step, Backfill) or version > _version(conn): continue
+        if conn.execute('SELECT 1 FROM schema_backfills WHERE version=?', (version,)).fetchone() is None: continue
+        t0 = time.perf_counter()
+        _drain_backfill(conn, version, step, batch_size, log)
+        done.append(version)
+        log(f"✅ v{version} 채우기 ({time.perf_counter() - t0:.2f}s)")
+    return done
+
+def migrate(conn, target=None, batch_size=BACKFILL_BATCH, log=lambda message: None, defer_backfills=False):
+    """
+    conn의 DB를 target 버전(기본: 최신)까지 올리고, 이번에 적용한 버전 리스트를 돌려줍니다.
+    defer_backfills=True면 Backfill 단계는 setup만 하고 넘어갑니다. 채우기는 나중에 run_backfills()로 하세요.
+    (False면 예전에 미뤄둔 채우기까지 버전 순서대로 모두 끝내고 돌아옵니다)
+    """
+    with _transaction(conn) as c:
+        _create_base_tables(c)
+    if not defer_backfills: run_backfills(conn, batch_size, log)
+    applied = []
+    for version, step in MIGRATIONS:
+        if target is not None and version > target: break
+        if _version(conn) >= version: continue
+        t0 = time.perf_counter()
+        if isinstance(step, Backfill):
+            _start_backfill(conn, version, step, log)
+            if not defer_backfills: _drain_backfill(conn, version, step, batch_size, log)
+        else:
+            with _transaction(conn) as c:
+                if _version(c) >= version: continue      # 다른 프로세스가 먼저 적용함
+                step(c)
+                c.execute(f'PRAGMA user_version={version}')
+        applied.append(version)
+        log(f"✅ v{version} ({time.perf_counter() - t0:.2f}s)")
+    return applied
+
+def status(conn):
+    """(현재 버전, 남은 버전 리스트, 진행 중인 채우기 [(버전, 끝낸 배치 수), ...])"""
+    current = _version(conn)
+    pending = [version for version, _ in MIGRATIONS if version > current]
+    backfills = []
+    if "schema_backfills" in {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}:
+        backfills = conn.execute('SELECT version, batches FROM schema_backfills ORDER BY version').fetchall()
+    return current, pending, backfills
+
+if __name__ == "__main__":
+    import argparse
+    import sqlite3
+
+    parser = argparse.ArgumentParser(description="DB 스키마를 최신 버전으로 올립니다.")
+    parser.add_argument("db_file", nargs="?", default=db.DB_NAME, help=f"DB 파일 (기본: {db.DB_NAME})")
+    parser.add_argument("--status", action="store_true", help="적용하지 않고 현재 상태만 보기")
+    parser.add_argument("--target", type=int, help="이 버전까지만 올리기")
+    parser.add_argument("--batch", type=int, default=BACKFILL_BATCH, help="채우기 배치 크기 (행)")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_file, timeout=db.BUSY_TIMEOUT_MS / 1000)
+    for pragma in db.CONNECTION_PRAGMAS: conn.execute(pragma)
+    if not args.status:
+        print(f"🧱 {args.db_file}: v{_version(conn)} -> v{args.target or LATEST_VERSION}")
+        migrate(conn, target=args.target, batch_size=args.batch, log=print)
+    current, pending, backfills = status(conn)
+    print(f"📌 현재 v{current} | 남은 단계 {pending or '없음'}" + "".join(f" | v{v} 채우는 중 (배치 {n}개)" for v, n in backfills))
+    conn.close()
@@ -1,5 +1,5 @@
-import re
-import requests
+import http_client
+import url_canon
 import yt_dlp
 import google.generativeai as genai
 from bs4 import BeautifulSoup
@@ -62,8 +62,7 @@ def get_youtube_data(url):
 def get_blog_content(url):
     """블로그 본문 추출"""
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url)
         if response.status_code == 200:
             soup = BeautifulSoup(response.text, 'html.parser')
             for script in soup(["script", "style"]):
@@ -74,11 +73,8 @@ def get_blog_content(url):
         return None, f"크롤링 에러 ({e})"
 
 def extract_video_id(url):
-    patterns = [r'(?:v=|\/)([0-9A-Za-z_-]{11}).*', r'(?:youtu\.be\/)([0-9A-Za-z_-]{11})']
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match: return match.group(1)
-    return None
+    canon = url_canon.canonicalize(url)
+    return canon.canonical_id if canon and canon.platform == "youtube" else None
 
 # ==========================================
 # 2. 👨‍🍳 주방장 (Gemini AI Processor)
@@ -0,0 +1,88 @@
+# partial_json.py
+# 🧩 스트리밍 중인(아직 덜 온) JSON 객체에서 지금까지 도착한 필드만 꺼내기
+# Gemini가 {"title": "...", "ingredients": [...], "markdown_content": "..."} 를 조각조각 보내는 동안
+# 매 조각마다 feed()하면, 완성된 필드 + 쓰는 중인 문자열 필드(앞부분) + 다 도착한 배열 원소를 돌려줍니다.
+import json
+
+_decoder = json.JSONDecoder()
+WHITESPACE = " \t\r\n"
+
+def _skip(text, pos):
+    while pos < len(text) and text[pos] in WHITESPACE: pos += 1
+    return pos
+
+def _partial_string(text, pos):
+    """pos의 여는 따옴표부터 끝까지(닫히지 않은) 문자열 앞부분을 디코딩합니다."""
+    body = text[pos + 1:]
+    # 끝에 잘린 이스케이프(\ 또는 \u12)는 다음 조각이 올 때까지 보류
+    cut = body.rfind("\\")
+    if cut != -1 and (cut == len(body) - 1 or (body[cut + 1] == "u" and len(body) - cut < 6)):
+        # 바로 앞이 또 \ 라면 "\\" 로 끝난 완성된 이스케이프일 수 있음
+        backslashes = len(body[:cut + 1]) - len(body[:cut + 1].rstrip("\\"))
+        if backslashes % 2 == 1: body = body[:cut]
+    try:
+        return json.loads('"' + body + '"')
+    except ValueError:
+        return None
+
+def parse_partial(text):
+    """
+    (fields, complete) 를 돌려줍니다.
+    fields: 지금까지 읽은 최상위 필드 dict, complete: 끝까지 도착한 필드 이름 집합
+    """
+    fields, complete = {}, set()
+    start = text.find("{")   # ```json 같은 앞부분은 건너뜀
+    if start == -1: return fields, complete
+    pos = start + 1
+    while True:
+        pos = _skip(text, pos)
+        if pos >= len(text) or text[pos] == "}": return fields, complete
+        if text[pos] == ",":
+            pos += 1
+            continue
+        try:
+            key, pos = _decoder.raw_decode(text, pos)
+        except ValueError:
+            return fields, complete          # 키가 아직 덜 옴
+        pos = _skip(text, pos)
+        if pos >= len(text) or text[pos] != ":": return fields, complete
+        pos = _skip(text, pos + 1)
+        if pos >= len(text): return fields, complete
+
+        try:
+            value, pos = _decoder.raw_decode(text, pos)
+        except ValueError:
+            pass
+        else:
+            # 숫자/true 등은 텍스트 끝에서 끝났으면 뒤에 더 올 수 있으니 보류
+            if pos >= len(text) and not isinstance(value, (str, list, dict)): return fields, complete
+            fields[key] = value
+            complete.add(key)
+            continue
+        # 값이 아직 덜 옴: 문자열이면 앞부분, 배열이면 다 도착한 원소까지만
+        if text[pos] == '"':
+            value = _partial_string(text, pos)
+            if value is not None: fields[key] = value
+        elif text[pos] == "[":
+            items, item_pos = [], pos + 1
+            while True:
+                item_pos = _skip(text, item_pos)
+                if item_pos < len(text) and text[item_pos] == ",": item_pos += 1; continue
+                try:
+                    item, item_pos = _decoder.raw_decode(text, item_pos)
+                except ValueError:
+                    break
+                items.append(item)
+            fields[key] = items
+        return fields, complete
+
+class PartialJSON:
+    """조각을 계속 이어 붙이면서 parse_partial 결과를 돌려줍니다."""
+    def __init__(self):
+        self.text = ""
+        self.fields, self.complete = {}, set()
+
+    def feed(self, chunk):
+        self.text += chunk
+        self.fields, self.complete = parse_partial(self.text)
+        return self.fields
@@ -0,0 +1,133 @@
+# quantity.py
+# ⚖️ 재료 수량 읽기 + 단위 맞춰 더하기 (장보기 목록용)
+# "1T", "2큰술", "30ml", "1 1/2컵", "½개", "2~3쪽", "한 줌", "약간" 같은 수량 글자를 Quantity(값, 단위)로 바꾸고,
+# 부피(ml 기준)/무게(g 기준)끼리는 환산해서 재료마다 하나의 합계로 만듭니다.
+# 개/쪽/대처럼 환산할 수 없는 단위는 같은 단위끼리만 더하고, "약간"처럼 숫자가 없는 건 따로(leftovers) 돌려줍니다.
+# 같은 수량 글자("1큰술", "약간"...)가 아주 자주 반복되므로 parse_quantity는 결과를 LRU 캐시에 둡니다.
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+PARSE_CACHE_SIZE = 4096
+
+# 단위 표기 -> (대표 표기, 차원, 기준 단위로 바꾸는 배수). 차원이 같은 단위끼리만 환산합니다.
+# 한국 레시피 기준: 1컵 200ml, 1큰술(T) 15ml, 1작은술(t) 5ml, 고기 1근 600g
+UNITS = {}
+for names, unit, dimension, factor in [
+    (("ml", "mL", "ML", "㎖", "cc", "밀리리터"), "ml", "volume", 1),
+    (("l", "L", "ℓ", "리터"), "L", "volume", 1000),
+    (("큰술", "T", "Ts", "TS", "tbsp", "Tbsp", "TBSP", "tbs", "밥숟가락", "밥숟갈", "숟가락", "숟갈", "스푼", "수저"), "큰술", "volume", 15),
+    (("작은술", "t", "ts", "tS", "tsp", "Tsp", "TSP", "티스푼", "찻숟가락", "찻숟갈"), "작은술", "volume", 5),
+    (("컵", "cup", "cups", "Cup", "Cups", "C"), "컵", "volume", 200),
+    (("g", "G", "그램", "gram", "grams"), "g", "mass", 1),
+    (("kg", "Kg", "KG", "킬로", "킬로그램"), "kg", "mass", 1000),
+    (("mg",), "mg", "mass", 0.001),
+    (("oz",), "oz", "mass", 28.35),
+    (("lb", "lbs"), "lb", "mass", 453.6),
+    (("근",), "근", "mass", 600),
+]:
+    for name in names: UNITS[name] = (unit, dimension, factor)
+BASE_UNITS = {"volume": ("ml", "L"), "mass": ("g", "kg")}   # (작은 값, 1000 이상일 때)
+# 표에 없는 표기는 소문자로 바꿔 다시 찾지만("TBS" -> tbs), 대문자 T(큰술)와 소문자 t(작은술)는 대소문자가 뜻을 가르므로 그대로만 찾습니다.
+CASE_SENSITIVE_UNITS = ("t", "ts")
+
+QUALITATIVE = ("약간", "적당량", "적당히", "조금", "소량", "취향껏", "기호에 따라", "톡톡", "to taste")
+NATIVE_NUMBERS = {"반": 0.5, "한": 1, "두": 2, "세": 3, "석": 3, "네": 4, "넉": 4, "다섯": 5}
+UNICODE_FRACTIONS = {"½": 0.5, "⅓": 1 / 3, "¼": 0.25, "⅔": 2 / 3, "¾": 0.75, "⅛": 0.125}
+
+NUMBER = r'\d+(?:\.\d+)?'
+VALUE = (rf'(?:{NUMBER}\s+)?\d+\s*/\s*\d+|(?:{NUMBER})?\s*[½⅓¼⅔¾⅛]|{NUMBER}|'
+         + '|'.join(sorted(NATIVE_NUMBERS, key=len, reverse=True)))
+AMOUNT_RE = re.compile(rf'^\s*(?:약\s*)?(?P<low>{VALUE})(?:\s*[~\-–]\s*(?P<high>{VALUE}))?'
+                       rf'\s*(?P<unit>[^\s\d(),/~\-–]*)\s*(?P<half>반)?')
+VALUE_PARTS_RE = re.compile(r'^(?:(\d+(?:\.\d+)?)\s+)?(\d+)\s*/\s*(\d+)$|^(\d+(?:\.\d+)?)?\s*([½⅓¼⅔¾⅛])$')
+
+@dataclass(frozen=True)
+class Quantity:
+    value: float
+    unit: str = None          # None = 단위 없이 숫자만 ("계란 3")
+
+    @property
+    def dimension(self):
+        known = UNITS.get(self.unit)
+        return known[1] if known else f"unit:{self.unit or ''}"
+
+    @property
+    def base_value(self):
+        known = UNITS.get(self.unit)
+        return self.value * known[2] if known else self.value
+
+    def __str__(self):
+        value = round(self.value, 2)
+        return f"{value:g}{self.unit or ''}"
+
+def _value(text):
+    text = text.strip()
+    if text in NATIVE_NUMBERS: return NATIVE_NUMBERS[text]
+    match = VALUE_PARTS_RE.match(text)
+    if not match: return float(text)
+    whole, num, den, lead, fraction = match.groups()
+    if num is not None:
+        return None if int(den) == 0 else float(whole or 0) + int(num) / int(den)
+    return float(lead or 0) + UNICODE_FRACTIONS[fraction]
+
+def canonical_unit(unit):
+    if not unit: return None
+    known = UNITS.get(unit) or (None if unit.lower() in CASE_SENSITIVE_UNITS else UNITS.get(unit.lower()))
+    return known[0] if known else unit
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_quantity(amount):
+    """
+    수량 글자 -> Quantity, 숫자로 읽을 수 없으면("약간", "" ...) None.
+    범위("2~3개")는 넉넉하게 큰 쪽으로 읽고, "1컵 반"/"1큰술반"의 '반'은 0.5를 더합니다.
+    """
+    amount = (amount or "").strip()
+    if not amount or amount.startswith(QUALITATIVE): return None
+    match = AMOUNT_RE.match(amount)
+    if not match: return None
+    value = _value(match.group("high") or match.group("low"))
+    if value is None: return None
+    unit, half = match.group("unit"), match.group("half")
+    if unit.endswith("반") and len(unit) > 1:
+        unit, half = unit[:-1], "반"
+    if half: value += 0.5
+    return Quantity(value, canonical_unit(unit))
+
+def combine(quantities):
+    """
+    Quantity들을 차원별로 더해 [Quantity, ...]로 돌려줍니다.
+    모두 같은 단위였으면 그 단위 그대로("3큰술"), 섞여 있으면 기준 단위(ml/L, g/kg)로 바꿉니다.
+    """
+    groups = {}
+    for q in quantities:
+        groups.setdefault(q.dimension, []).append(q)
+    totals = []
+    for dimension, group in groups.items():
+        units = {q.unit for q in group}
+        if len(units) == 1:
+            totals.append(Quantity(sum(q.value for q in group), group[0].unit))
+            continue
+        base = sum(q.base_value for q in group)
+        small, large = BASE_UNITS[dimension]
+        totals.append(Quantity(base / 1000, large) if base >= 1000 else Quantity(base, small))
+    return totals
+
+def aggregate(amounts):
+    """
+    수량 글자 리스트 -> (합계 [Quantity, ...], 숫자로 못 읽은 나머지 [글자, ...])
+    예: ["1T", "2큰술", "30ml", "약간"] -> ([Quantity(75, "ml")], ["약간"])
+    """
+    quantities, leftovers = [], []
+    for amount in amounts:
+        q = parse_quantity(amount)
+        if q is not None: quantities.append(q)
+        elif amount and amount.strip() and amount.strip() not in leftovers: leftovers.append(amount.strip())
+    return combine(quantities), leftovers
+
+def format_amounts(totals, leftovers):
+    """장보기 한 줄용: "75ml + 약간" """
+    return " + ".join([str(q) for q in totals] + list(leftovers))
+
+def cache_info():
+    return parse_quantity.cache_info()
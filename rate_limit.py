@@ -0,0 +1,224 @@
+# rate_limit.py
+# 🚦 Gemini 호출 속도 제한 + 재시도
+# 모든 모델 호출은 call_with_retry()를 거칩니다.
+#   - 토큰 버킷 두 개: 분당 요청 수(RPM)와 분당 토큰 수(TPM). 둘 다 여유가 있어야 호출합니다.
+#   - 429/5xx는 지터를 섞은 지수 백오프로 다시 시도하고, 429면 버킷을 비워서 다른 호출도 같이 쉬게 합니다.
+#   - 우선순위: 화면에서 링크 하나를 변환하는 호출(INTERACTIVE)이 기다리는 동안 여러 링크 가져오기(BULK)는 양보합니다.
+# 기본은 프로세스 안에서만 나누는 버킷이고, LINCOOK_RATE_LIMIT_SHARED=1 이면 SQLite(rate_limits 테이블)에 버킷을 둬서
+# 앱 프로세스와 워커 프로세스(jobs.py, bulk_import.py)가 같은 할당량을 나눠 씁니다. (우선순위 양보는 프로세스 안에서만)
+import os
+import random
+import threading
+import time
+
+import database as db
+import text_reducer
+
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get("LINCOOK_LLM_RPM", "15"))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get("LINCOOK_LLM_TPM", "1000000"))
+SHARED_BUCKETS = os.environ.get("LINCOOK_RATE_LIMIT_SHARED") == "1"
+
+INTERACTIVE = 0
+BULK = 1
+
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 2.0          # 초. 2, 4, 8... 범위 안에서 무작위(full jitter)
+RETRY_MAX_DELAY = 30.0
+ACQUIRE_TIMEOUT = {INTERACTIVE: 90.0, BULK: None}   # None = 자리 날 때까지 기다림
+
+OUTPUT_TOKEN_ESTIMATE = 2000    # 응답 토큰 예상치 (실제 사용량을 받으면 차이만큼 정산)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+                         "DeadlineExceeded", "BadGateway", "GatewayTimeout"}
+
+class RateLimitTimeout(Exception):
+    pass
+
+def estimate_tokens(prompt):
+    return text_reducer.estimate_tokens(prompt) + OUTPUT_TOKEN_ESTIMATE
+
+# ==========================================
+# 1. 버킷 저장소 (프로세스 메모리 / SQLite)
+# ==========================================
+# 저장소는 take(비용 dict) -> 0(가져감) 또는 기다릴 초, adjust(이름, 증감), drain(이름, 초) 세 가지만 알면 됩니다.
+
+class MemoryBuckets:
+    def __init__(self, limits):
+        self.limits = limits                          # 이름 -> 분당 허용량
+        now = time.monotonic()
+        self._state = {name: [float(limit), now] for name, limit in limits.items()}
+        self._lock = threading.Lock()
+
+    def _available(self, name, now):
+        tokens, updated_at = self._state[name]
+        limit = self.limits[name]
+        return min(limit, tokens + (now - updated_at) * limit / 60.0)
+
+    def take(self, costs):
+        with self._lock:
+            now = time.monotonic()
+            available = {name: self._available(name, now) for name in costs}
+            waits = [(cost - available[name]) * 60.0 / self.limits[name] for name, cost in costs.items() if available[name] < cost]
+            if waits: return max(waits)
+            for name, cost in costs.items():
+                self._state[name] = [available[name] - cost, now]
+            return 0
+
+    def adjust(self, name, delta):
+        with self._lock:
+            now = time.monotonic()
+            self._state[name] = [self._available(name, now) + delta, now]
+
+    def drain(self, name, seconds):
+        """seconds초 뒤에야 1개가 차도록 버킷을 비웁니다."""
+        with self._lock:
+            now = time.monotonic()
+            self._state[name] = [min(self._available(name, now), 1 - seconds * self.limits[name] / 60.0), now]
+
+class SQLiteBuckets:
+    """rate_limits 테이블(v8)에 버킷을 두고 BEGIN IMMEDIATE로 여러 프로세스가 순서대로 꺼내갑니다."""
+    def __init__(self, limits):
+        self.limits = limits
+
+    @staticmethod
+    def _begin(conn):
+        if not conn.in_transaction: conn.execute('BEGIN IMMEDIATE')
+
+    def _available(self, c, name, now):
+        limit = self.limits[name]
+        row = c.execute('SELECT tokens, updated_at FROM rate_limits WHERE name=?', (name,)).fetchone()
+        if row is None: return float(limit)
+        return min(limit, row[0] + (now - row[1]) * limit / 60.0)
+
+    def take(self, costs):
+        with db.get_connection() as conn:
+            try:
+                self._begin(conn)
+                now = time.time()
+                available = {name: self._available(conn, name, now) for name in costs}
+                waits = [(cost - available[name]) * 60.0 / self.limits[name] for name, cost in costs.items() if available[name] < cost]
+                if waits:
+                    conn.rollback()
+                    return max(waits)
+                conn.executemany('INSERT OR REPLACE INTO rate_limits (name, tokens, updated_at) VALUES (?, ?, ?)',
+                                 [(name, available[name] - cost, now) for name, cost in costs.items()])
+                conn.commit()
+                return 0
+            except Exception:
+                if conn.in_transaction: conn.rollback()
+                raise
+
+    def _update(self, name, new_tokens):
+        with db.get_connection() as conn:
+            try:
+                self._begin(conn)
+                now = time.time()
+                conn.execute('INSERT OR REPLACE INTO rate_limits (name, tokens, updated_at) VALUES (?, ?, ?)',
+                             (name, new_tokens(self._available(conn, name, now)), now))
+                conn.commit()
+            except Exception:
+                if conn.in_transaction: conn.rollback()
+                raise
+
+    def adjust(self, name, delta):
+        self._update(name, lambda available: available + delta)
+
+    def drain(self, name, seconds):
+        self._update(name, lambda available: min(available, 1 - seconds * self.limits[name] / 60.0))
+
+# ==========================================
+# 2. 제한기 (우선순위 + 대기)
+# ==========================================
+
+class RateLimiter:
+    def __init__(self, requests_per_minute=LLM_REQUESTS_PER_MINUTE, tokens_per_minute=LLM_TOKENS_PER_MINUTE, shared=SHARED_BUCKETS):
+        limits = {"requests": requests_per_minute, "tokens": tokens_per_minute}
+        self.buckets = SQLiteBuckets(limits) if shared else MemoryBuckets(limits)
+        self.limits = limits
+        self._cond = threading.Condition()
+        self._interactive_waiting = 0
+        self.stats = {"acquired": 0, "waited_seconds": 0.0, "retries": 0, "throttled": 0}
+
+    def acquire(self, tokens, priority=INTERACTIVE, timeout=None):
+        """버킷에서 요청 1개 + tokens개를 꺼낼 때까지 기다립니다. timeout 초를 넘기면 RateLimitTimeout."""
+        costs = {"requests": 1, "tokens": min(tokens, self.limits["tokens"])}
+        started = time.monotonic()
+        with self._cond:
+            if priority == INTERACTIVE: self._interactive_waiting += 1
+            try:
+                while True:
+                    # 화면 요청이 기다리는 중이면 BULK는 버킷을 건드리지 않고 양보
+                    wait = 0.5 if priority == BULK and self._interactive_waiting else self.buckets.take(costs)
+                    if wait == 0:
+                        self.stats["acquired"] += 1
+                        self.stats["waited_seconds"] += time.monotonic() - started
+                        return
+                    if timeout is not None and time.monotonic() - started + wait > timeout:
+                        raise RateLimitTimeout(f"요청이 많아 {timeout:.0f}초 안에 차례가 오지 않았어요.")
+                    self._cond.wait(min(wait, 5.0))
+            finally:
+                if priority == INTERACTIVE: self._interactive_waiting -= 1
+                self._cond.notify_all()
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """예상 토큰과 실제 사용량의 차이만큼 토큰 버킷을 정산합니다."""
+        if actual_tokens is None: return
+        delta = min(estimated_tokens, self.limits["tokens"]) - actual_tokens
+        if delta: self.buckets.adjust("tokens", delta)
+
+    def throttle(self, seconds):
+        """429를 받았을 때: 요청 버킷을 seconds초 동안 바닥으로 만들어 모든 호출이 같이 쉬게 합니다."""
+        self.stats["throttled"] += 1
+        self.buckets.drain("requests", seconds)
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_limiter():
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None: _limiter = RateLimiter()
+        return _limiter
+
+# ==========================================
+# 3. 재시도
+# ==========================================
+
+def error_status(error):
+    for attr in ("code", "status_code"):
+        value = getattr(error, attr, None)
+        try:
+            if value is not None: return int(value)
+        except (TypeError, ValueError):
+            pass
+    return None
+
+def is_retryable(error):
+    return error_status(error) in RETRYABLE_STATUS or type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+def backoff_delay(attempt):
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+def response_tokens(response):
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "total_token_count", None) if usage is not None else None
+
+def call_with_retry(fn, prompt, priority=INTERACTIVE, attempts=RETRY_ATTEMPTS, limiter=None):
+    """fn()을 속도 제한 안에서 부르고, 429/5xx면 다시 시도합니다. 마지막 에러나 다른 에러는 그대로 올립니다."""
+    limiter = limiter or get_limiter()
+    tokens = estimate_tokens(prompt)
+    for attempt in range(attempts):
+        limiter.acquire(tokens, priority, ACQUIRE_TIMEOUT[priority])
+        try:
+            response = fn()
+        except Exception as e:
+            if attempt == attempts - 1 or not is_retryable(e): raise
+            delay = backoff_delay(attempt)
+            if error_status(e) == 429 or type(e).__name__ in ("ResourceExhausted", "TooManyRequests"):
+                limiter.throttle(delay)
+            limiter.stats["retries"] += 1
+            print(f"⏳ Gemini 재시도 {attempt + 1}/{attempts - 1} ({type(e).__name__}), {delay:.1f}초 후")
+            time.sleep(delay)
+            continue
+        limiter.settle(tokens, response_tokens(response))
+        return response
@@ -0,0 +1,56 @@
+# recipe_cache.py
+# 🗂️ 요리책 화면용 레시피 목록 캐시 (Streamlit 재실행 사이에 유지)
+# 체크박스 하나만 눌러도 스크립트 전체가 다시 돌기 때문에, 예전에는 매번 폴더 목록 + 즐겨찾기 + 폴더별 페이지를 새로 조회했습니다.
+# 이제는 폴더 목록과, 목록(즐겨찾기/폴더)마다 지금까지 keyset으로 읽은 페이지(database.list_user_recipes)를 세션에 두고
+# (user_id, 데이터 버전)이 그대로면 다음 재실행에서도 그대로 씁니다. '더 보기'를 누르면 그 목록의 다음 페이지만 더 읽습니다.
+# 화면에 보여준 페이지만 들고 있으므로 레시피가 아무리 많아도 세션 메모리는 보여준 양만큼만 씁니다.
+# 데이터 버전은 database.user_write()가 레시피를 바꿀 때마다 올리므로 저장/수정/삭제 직후엔 자동으로 다시 만듭니다.
+# 이 모듈은 streamlit을 직접 쓰지 않습니다. 저장소(store)로 st.session_state 같은 dict를 넘겨주세요.
+import database as db
+
+SESSION_KEY = "recipe_library"
+FAVORITES = ("favorites",)
+
+def folder_list(folder):
+    return ("folder", folder)
+
+class RecipeLibrary:
+    """한 유저의 폴더 목록 + 목록별로 지금까지 읽은 요약 페이지"""
+    def __init__(self, user_id, version):
+        self.user_id = user_id
+        self.version = version
+        self.folders = db.get_user_folders(user_id)     # [(폴더명, 레시피 수), ...]
+        self.by_id = {}                                 # 읽어온 요약만
+        self._lists = {}                                # 목록 키 -> [요약들, 다음 커서, 끝까지 읽었는지]
+
+    def page(self, list_key, count):
+        """목록(FAVORITES 또는 folder_list(폴더명))의 앞에서 count개와 더 있는지. 모자라면 다음 페이지만 더 읽습니다."""
+        entry = self._lists.setdefault(list_key, [[], None, False])
+        filters = {"favorites_only": True} if list_key == FAVORITES else {"folder": list_key[1]}
+        while len(entry[0]) < count and not entry[2]:
+            rows, entry[1] = db.list_user_recipes(self.user_id, after=entry[1], **filters)
+            entry[0].extend(rows)
+            entry[2] = entry[1] is None
+            for recipe in rows: self.by_id[recipe['id']] = recipe
+        return entry[0][:count], len(entry[0]) > count or not entry[2]
+
+    def existing_ids(self, recipe_ids):
+        """
+        화면에 남아 있는 체크 상태 중 아직 있는 레시피 id만.
+        버전이 바뀌어 새로 만든 직후에는 페이지를 읽기 전이라 by_id가 비어 있으므로, 모르는 id는 DB에 물어봅니다.
+        """
+        unknown = [recipe_id for recipe_id in recipe_ids if recipe_id not in self.by_id]
+        found = db.find_user_recipe_ids(self.user_id, unknown)
+        return sorted(recipe_id for recipe_id in recipe_ids if recipe_id in self.by_id or recipe_id in found)
+
+def get(store, user_id):
+    """
+    store[SESSION_KEY]에 둔 RecipeLibrary를 돌려줍니다. 버전이 바뀌었거나 다른 유저 것이면 새로 만듭니다.
+    바뀐 게 없으면 버전 확인(대부분 메모리, 가끔 PK 조회 한 번)만 하고 DB 조회 없이 끝납니다.
+    """
+    version = db.get_data_version(user_id)
+    library = store.get(SESSION_KEY)
+    if library is None or library.user_id != user_id or library.version != version:
+        library = RecipeLibrary(user_id, version)
+        store[SESSION_KEY] = library
+    return library
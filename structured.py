@@ -0,0 +1,171 @@
+# structured.py
+# 🏷️ 구조화된 레시피 마크업 읽기 (AI 없이 바로 변환)
+# 요즘 레시피 블로그는 검색엔진용으로 schema.org Recipe 정보를
+# <script type="application/ld+json"> 이나 microdata(itemprop)로 같이 넣어둡니다.
+# 이게 있으면 cook_recipe 결과와 같은 모양(title, markdown_content, cuisine_type, dish_type, ingredients)으로
+# 바로 바꿔서 Gemini 호출을 건너뜁니다. 얼마나 자주 건너뛰었는지는 stats()로 확인할 수 있습니다.
+import json
+import re
+import threading
+
+import quantity
+
+# cook_recipe 프롬프트의 분류값에 맞춥니다. (앞에 있는 것부터 확인)
+CUISINE_KEYWORDS = [
+    ("한식", ("korean", "한식", "한국")),
+    ("중식", ("chinese", "중식", "중국")),
+    ("일식", ("japanese", "일식", "일본")),
+    ("아시안", ("thai", "vietnamese", "indian", "asian", "태국", "베트남", "인도", "아시안")),
+    ("양식", ("american", "italian", "french", "mexican", "spanish", "mediterranean", "western", "양식", "이탈리아", "프랑스")),
+    ("퓨전", ("fusion", "퓨전")),
+]
+DISH_KEYWORDS = [
+    ("밥/면", ("밥", "면", "국수", "파스타", "rice", "noodle", "pasta", "ramen")),   # '국수'가 '국'에 걸리지 않도록 먼저
+    ("국/탕/찌개", ("찌개", "국", "탕", "전골", "soup", "stew")),
+    ("찜/조림", ("찜", "조림", "braise", "steamed")),
+    ("볶음", ("볶음", "stir-fry", "stir fry")),
+    ("튀김", ("튀김", "fried", "tempura")),
+    ("구이/스테이크", ("구이", "스테이크", "steak", "grill", "roast", "bbq")),
+    ("샐러드", ("샐러드", "salad")),
+    ("디저트", ("디저트", "케이크", "쿠키", "dessert", "cake", "cookie", "bread", "빵")),
+]
+
+# "돼지고기 300g" / "2 cups flour" / "소금 한 줌" / "후추 취향껏" -> 이름과 수량 나누기
+AMOUNT_RE = r'[\d½⅓¼⅔¾][\d½⅓¼⅔¾./\s~-]*\s*[^\s\d,()]*'
+# "한 줌", "두큰술": 붙여 쓴 경우는 아는 단위만 (이름 끝의 "한우" 같은 단어를 수량으로 읽지 않도록)
+NATIVE_COUNTERS = "줌|움큼|꼬집|큰술|작은술|스푼|숟가락|숟갈|컵|개|쪽|알|장|모|단|대|봉|포기|마리|토막|조각"
+_natives = "|".join(sorted(quantity.NATIVE_NUMBERS, key=len, reverse=True))
+NATIVE_AMOUNT_RE = rf'(?:{_natives})(?:\s*(?:{NATIVE_COUNTERS})|\s+\S+).*'
+QUALITATIVE_RE = "|".join(re.escape(word) for word in quantity.QUALITATIVE)
+TRAILING_AMOUNT_RE = re.compile(rf'^(?P<name>.+?)\s+(?P<amount>{AMOUNT_RE}.*|{NATIVE_AMOUNT_RE}|(?:{QUALITATIVE_RE}).*)$')
+LEADING_AMOUNT_RE = re.compile(rf'^(?P<amount>{AMOUNT_RE})\s+(?P<name>.+)$')
+
+_stats = {"checked": 0, "found": 0}
+_stats_lock = threading.Lock()
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+def stats():
+    """checked: 마크업을 찾아본 페이지 수, found: 마크업으로 바로 변환해서 AI 호출을 건너뛴 수"""
+    with _stats_lock:
+        result = dict(_stats)
+    result["skip_rate"] = result["found"] / result["checked"] if result["checked"] else 0.0
+    return result
+
+# ==========================================
+# 1. 마크업 찾기 (JSON-LD, microdata)
+# ==========================================
+
+def _is_recipe(node):
+    kind = node.get("@type")
+    kinds = kind if isinstance(kind, list) else [kind]
+    return any(isinstance(k, str) and k.split("/")[-1] == "Recipe" for k in kinds)
+
+def _walk(node):
+    if isinstance(node, list):
+        for item in node: yield from _walk(item)
+    elif isinstance(node, dict):
+        yield node
+        for key in ("@graph", "mainEntity", "itemListElement"):
+            if key in node: yield from _walk(node[key])
+
+def find_json_ld(soup):
+    for script in soup.select('script[type="application/ld+json"]'):
+        raw = script.string or script.get_text()
+        try:
+            data = json.loads(raw)
+        except (TypeError, ValueError):
+            # 끝에 쉼표가 남는 등 살짝 깨진 JSON이 흔해서 한 번만 손봐서 다시 시도
+            try: data = json.loads(re.sub(r',\s*([}\]])', r'\1', raw or ""))
+            except ValueError: continue
+        for node in _walk(data):
+            if _is_recipe(node): return node
+    return None
+
+def find_microdata(soup):
+    root = soup.select_one('[itemtype*="schema.org/Recipe"]')
+    if root is None: return None
+
+    def texts(prop):
+        values = []
+        for tag in root.select(f'[itemprop="{prop}"]'):
+            value = tag.get("content") or tag.get_text(" ", strip=True)
+            if value: values.append(value)
+        return values
+
+    name = texts("name")
+    return {
+        "name": name[0] if name else None,
+        "recipeIngredient": texts("recipeIngredient") or texts("ingredients"),
+        "recipeInstructions": texts("recipeInstructions"),
+        "recipeCuisine": texts("recipeCuisine"),
+        "recipeCategory": texts("recipeCategory"),
+        "recipeYield": texts("recipeYield")[:1],
+    }
+
+# ==========================================
+# 2. cook_recipe 결과 모양으로 바꾸기
+# ==========================================
+
+def _text(value):
+    if isinstance(value, list): return ", ".join(_text(v) for v in value if v)
+    if isinstance(value, dict): return _text(value.get("text") or value.get("name"))
+    return re.sub(r'\s+', ' ', str(value or "")).strip()
+
+def instruction_steps(value):
+    """recipeInstructions(문자열 / 문자열 리스트 / HowToStep / HowToSection)를 단계 리스트로 폅니다."""
+    if isinstance(value, str):
+        return [step.strip() for step in re.split(r'\n+|(?<=[.!?])\s+(?=\d+[.)])', value) if step.strip()]
+    if isinstance(value, dict):
+        if "itemListElement" in value: return instruction_steps(value["itemListElement"])
+        return instruction_steps(value.get("text") or value.get("name") or "")
+    if isinstance(value, list):
+        return [step for item in value for step in instruction_steps(item)]
+    return []
+
+def split_ingredient(line):
+    line = _text(line)
+    match = TRAILING_AMOUNT_RE.match(line) or LEADING_AMOUNT_RE.match(line)
+    if match: return {"name": match.group("name").strip(), "amount": match.group("amount").strip()}
+    return {"name": line, "amount": ""}
+
+def _classify(text, table):
+    text = text.lower()
+    for label, keywords in table:
+        if any(keyword in text for keyword in keywords): return label
+    return "기타"
+
+def to_recipe(node):
+    """schema.org Recipe dict -> cook_recipe 결과 dict. 제목/재료/조리 순서가 다 있어야 합니다."""
+    title = _text(node.get("name"))
+    ingredients = [split_ingredient(line) for line in (node.get("recipeIngredient") or node.get("ingredients") or [])
+                   if _text(line)]
+    steps = [re.sub(r'^\d+[.)]\s*', '', step) for step in instruction_steps(node.get("recipeInstructions"))]
+    if not (title and ingredients and steps): return None
+
+    lines = [f"# {title}"]
+    servings = _text(node.get("recipeYield"))
+    if servings: lines.append(f"*{servings}*")
+    lines += ["", "## 재료"] + [f"- {i['name']} {i['amount']}".rstrip() for i in ingredients]
+    lines += ["", "## 만드는 법"] + [f"{n}. {step}" for n, step in enumerate(steps, 1)]
+    return {
+        "title": title,
+        "markdown_content": "\n".join(lines),
+        "cuisine_type": _classify(_text(node.get("recipeCuisine")), CUISINE_KEYWORDS),
+        "dish_type": _classify(f"{_text(node.get('recipeCategory'))} {title}", DISH_KEYWORDS),
+        "ingredients": ingredients,
+    }
+
+def extract_recipe(soup):
+    """페이지(BeautifulSoup)에서 구조화된 레시피를 찾아 cook_recipe 결과 모양으로 돌려줍니다. 없으면 None.
+    script 태그를 지우기 전에 불러야 합니다."""
+    _count("checked")
+    for find in (find_json_ld, find_microdata):
+        node = find(soup)
+        recipe = to_recipe(node) if node else None
+        if recipe:
+            _count("found")
+            return recipe
+    return None
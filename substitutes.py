@@ -0,0 +1,93 @@
+# substitutes.py
+# 재료 대체 그래프
+# substitutes.json("재료": ["대체 재료", ...])을 한 번만 읽어서 재료명을 정수 id로 바꿔두고(interning),
+# 입력 재료마다 1홉/2홉 대체 후보를 가중치와 함께 미리 펼쳐둡니다.
+# 재료명은 ingredient_norm.normalize로 맞춰서 "달걀"/"다진 마늘"도 찾습니다.
+# 입력한 재료는 언제나 그대로(0홉, 1.0) 남기고, 그래프에 없는 이름은 부르는 쪽이 허락할 때만(correct_typos)
+# 글자 수가 같은 오타(양배치 -> 양배추)로 보고 고친 재료를 ingredient_norm.TYPO_WEIGHT를 곱한 가중치로 덧붙입니다.
+# ("양파즙" -> "양파", "간장게장" -> "간장"처럼 다른 재료로 바꿔치기하지 않도록)
+import json
+import os
+from collections import deque
+from functools import lru_cache
+
+import ingredient_norm
+
+SUBSTITUTES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "substitutes.json")
+
+# 홉 수별 가중치: 0홉(입력 재료 그대로) 1.0, 1홉 대체 0.5, 2홉 대체 0.25
+HOP_WEIGHTS = (1.0, 0.5, 0.25)
+
+class SubstitutionGraph:
+    def __init__(self, edges):
+        self.names = []   # id -> 재료명
+        self.ids = {}     # 재료명 -> id
+        self.adjacency = []
+        self.index = ingredient_norm.NgramIndex()
+        for name, subs in edges.items():
+            src = self._intern(name)
+            self.adjacency[src] = tuple(dict.fromkeys(sub for sub in map(self._intern, subs) if sub != src))
+        self._expand_cache = {}
+
+    def _intern(self, name):
+        name = ingredient_norm.normalize(name)
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.adjacency.append(())
+            self.index.add(self.ids[name], name)
+        return self.ids[name]
+
+    def find(self, name):
+        """정규화된 이름의 그래프 id, 없으면 None"""
+        return self.ids.get(name)
+
+    def correct(self, name):
+        """그래프에 없는 이름을 글자 수가 같은 가장 비슷한 재료(자모 유사도)로 고친 id, 없으면 None"""
+        for node, _ in self.index.lookup(name, containment=False):
+            if len(self.names[node]) == len(name): return node
+        return None
+
+    def expand(self, name, weights=HOP_WEIGHTS, correct_typos=False):
+        """
+        [(재료명, 가중치, 홉 수), ...] 를 가중치가 높은 순(같은 홉 안에서는 사전에 적힌 순서)으로 돌려줍니다.
+        맨 앞은 언제나 (정규화한) 입력 재료 자신입니다. 그래프에 없는 재료는 correct_typos일 때만
+        오타를 고친 재료와 그 대체 재료를 ingredient_norm.TYPO_WEIGHT를 곱해서 덧붙입니다.
+        """
+        name = ingredient_norm.normalize(name)
+        key = (name, weights, correct_typos)
+        if key not in self._expand_cache:
+            self._expand_cache[key] = tuple(self._expand(name, weights, correct_typos))
+        return self._expand_cache[key]
+
+    def _expand(self, name, weights, correct_typos):
+        start = self.find(name)
+        if start is not None: return self._bfs(start, weights)
+        candidates = [(name, weights[0], 0)]
+        corrected = self.correct(name) if correct_typos else None
+        if corrected is not None:
+            candidates += [(sub, weight * ingredient_norm.TYPO_WEIGHT, hops) for sub, weight, hops in self._bfs(corrected, weights)]
+        return candidates
+
+    def _bfs(self, start, weights):
+        seen = {start}
+        queue = deque([(start, 0)])
+        candidates = []
+        while queue:
+            node, hops = queue.popleft()
+            candidates.append((self.names[node], weights[hops], hops))
+            if hops + 1 >= len(weights):
+                continue
+            for nxt in self.adjacency[node]:
+                if nxt not in seen:
+                    seen.add(nxt)
+                    queue.append((nxt, hops + 1))
+        return candidates
+
+def load_graph(path=SUBSTITUTES_FILE):
+    with open(path, encoding="utf-8") as f:
+        return SubstitutionGraph(json.load(f))
+
+@lru_cache(maxsize=1)
+def get_graph():
+    return load_graph()
@@ -0,0 +1,156 @@
+# text_reducer.py
+# ✂️ AI에 보내기 전 원문 줄이기
+# 블로그 get_text()에는 사이드바/댓글/광고가, 자막에는 [음악] 같은 군더더기가 잔뜩 섞여 있습니다.
+#   1) 줄 단위로 공백 정리 + 같은 줄 반복 제거 ("1큰술"처럼 수량만 있는 줄은 표 모양 재료 목록의 짝이라 남김)
+#   2) 상투 문구(공감/댓글/구독/저작권...)와 자막 효과음 제거
+#   3) 남은 줄을 덩어리(segment)로 묶어 레시피 단서(재료, 수량+단위, 조리 동작)로 점수를 매기고
+#   4) 토큰 예산 안에 점수 높은 덩어리부터 담아서 원래 순서대로 이어 붙입니다.
+# 예산 안에 다 들어가면 3~4단계 없이 정리된 전문을 그대로 보냅니다.
+import re
+import threading
+from dataclasses import dataclass
+
+SEGMENT_MAX_CHARS = 500         # 덩어리 하나의 최대 길이
+FIRST_SEGMENT_BONUS = 5.0       # 첫 덩어리(제목/소개)는 되도록 남김
+
+# 상투 문구: 이 패턴이 들어간 짧은 줄은 버립니다.
+BOILERPLATE_RE = re.compile(
+    r'공감|댓글|구독|좋아요|이웃\s*추가|이웃\s*신청|스크랩|공유하기|신고하기|저작자\s*표시|카테고리|전체\s*보기|'
+    r'로그인|회원가입|블로그\s*메뉴|맨\s*위로|이전\s*글|다음\s*글|광고|협찬\s*문의|Copyright|All rights reserved|'
+    r'cookie|privacy policy|subscribe|sign in|share this',
+    re.IGNORECASE)
+BOILERPLATE_MAX_CHARS = 40      # 이보다 긴 줄은 상투 문구가 섞여 있어도 본문일 수 있어 남김
+FILLER_RE = re.compile(r'\[(음악|박수|웃음|Music|Applause|Laughter)\]|\((음악|웃음)\)', re.IGNORECASE)
+
+# 레시피 단서
+INGREDIENT_RE = re.compile(r'재료|양념|소스|육수|준비물|ingredients?|sauce|seasoning', re.IGNORECASE)
+QUANTITY_RE = re.compile(
+    r'(?<!\d)\d+(?:[./]\d+)?\s*(?:g|kg|ml|l|cc|컵|큰술|작은술|스푼|숟가락|밥숟가락|티스푼|T|t|개|쪽|알|장|줌|꼬집|모|단|인분|'
+    r'tbsp|tsp|cups?|oz|lb|pinch)\b|[½⅓¼⅔¾]|약간|적당량|한\s*(?:줌|꼬집|스푼|큰술)',
+    re.IGNORECASE)
+# 수량만 있는 줄 ("1큰술", "2~3개", "약간"): 표 모양 재료 목록에서 재료 이름과 짝을 이루므로 반복돼도 지우지 않습니다.
+# 수량을 지운 나머지가 숫자/기호뿐인지 봅니다. (둘을 한 패턴에 +로 겹쳐 넣으면 "2024.10.18 1234..." 같은 줄에서 역추적이 폭발합니다)
+AMOUNT_REST_RE = re.compile(r'[\d./~\-\s()]*')
+STEP_RE = re.compile(
+    r'넣[고어으]|볶[아고]|끓[이여]|썰[어고]|다져|굽[고는]|구워|섞[어고]|재워|데쳐|삶[아고]|튀겨|부어|졸여|버무|간을|'
+    r'중불|약불|센불|불을|예열|\d+\s*분|^\s*\d+[.)]\s|'
+    r'\b(?:stir|bake|boil|simmer|fry|chop|mix|add|preheat|minutes?)\b',
+    re.IGNORECASE)
+
+def estimate_tokens(text):
+    # 한글은 대략 글자 2개에 토큰 1개 (rate_limit.py도 이 추정을 씁니다)
+    return (len(text) + 1) // 2
+
+@dataclass
+class ReduceResult:
+    text: str
+    tokens_in: int
+    tokens_out: int
+    duplicate_lines: int = 0
+    boilerplate_lines: int = 0
+    segments_total: int = 0
+    segments_kept: int = 0
+
+    @property
+    def tokens_saved(self):
+        return self.tokens_in - self.tokens_out
+
+    def summary(self):
+        return (f"토큰 {self.tokens_in} -> {self.tokens_out} ({self.tokens_saved} 절약) | 중복 {self.duplicate_lines}줄, "
+                f"상투 문구 {self.boilerplate_lines}줄 제거 | 덩어리 {self.segments_kept}/{self.segments_total}")
+
+_stats = {"requests": 0, "tokens_in": 0, "tokens_out": 0}
+_stats_lock = threading.Lock()
+
+def stats():
+    with _stats_lock:
+        result = dict(_stats)
+    result["tokens_saved"] = result["tokens_in"] - result["tokens_out"]
+    result["saved_ratio"] = result["tokens_saved"] / result["tokens_in"] if result["tokens_in"] else 0.0
+    return result
+
+# ==========================================
+# 1. 정리 (공백, 중복, 상투 문구)
+# ==========================================
+
+def has_recipe_cue(line):
+    return bool(QUANTITY_RE.search(line) or STEP_RE.search(line))
+
+def is_amount_line(line):
+    return bool(AMOUNT_REST_RE.fullmatch(QUANTITY_RE.sub(' ', line)))
+
+def clean_lines(text, result):
+    lines, seen = [], set()
+    for line in (text or "").splitlines():
+        line = re.sub(r'\s+', ' ', FILLER_RE.sub(' ', line)).strip()
+        if not line: continue
+        if is_amount_line(line):
+            lines.append(line)
+            continue
+        if line in seen:
+            result.duplicate_lines += 1
+            continue
+        seen.add(line)
+        # "간장 넣으면 좋아요" 같은 줄은 레시피 단서가 있으니 남김
+        if len(line) <= BOILERPLATE_MAX_CHARS and BOILERPLATE_RE.search(line) and not has_recipe_cue(line):
+            result.boilerplate_lines += 1
+            continue
+        lines.append(line)
+    return lines
+
+# ==========================================
+# 2. 덩어리 점수 매기기 + 예산 안에 담기
+# ==========================================
+
+def split_segments(lines):
+    segments, current, size = [], [], 0
+    # 한 줄짜리 긴 문단(영상 설명 등)은 잘라서 덩어리 크기를 맞춥니다.
+    pieces = (line[i:i + SEGMENT_MAX_CHARS] for line in lines for i in range(0, len(line), SEGMENT_MAX_CHARS))
+    for piece in pieces:
+        if current and size + len(piece) > SEGMENT_MAX_CHARS:
+            segments.append("\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + 1
+    if current: segments.append("\n".join(current))
+    return segments
+
+def score_segment(segment):
+    return (2.0 * len(INGREDIENT_RE.findall(segment)) + 1.5 * len(QUANTITY_RE.findall(segment))
+            + 1.0 * len(STEP_RE.findall(segment)))
+
+def pack_segments(segments, budget):
+    """점수 높은 순으로 예산 안에 담고, 원래 순서대로 돌려줍니다."""
+    scored = sorted(range(len(segments)), key=lambda i: (-(score_segment(segments[i]) + (FIRST_SEGMENT_BONUS if i == 0 else 0)), i))
+    kept, used = [], 0
+    for i in scored:
+        cost = estimate_tokens(segments[i]) + 1
+        if used + cost > budget: continue
+        kept.append(i)
+        used += cost
+    return [segments[i] for i in sorted(kept)]
+
+def reduce_text(raw_text, budget):
+    """raw_text를 budget 토큰 안으로 줄인 ReduceResult를 돌려줍니다."""
+    result = ReduceResult(text="", tokens_in=estimate_tokens(raw_text or ""), tokens_out=0)
+    lines = clean_lines(raw_text, result)
+    segments = split_segments(lines)
+    result.segments_total = len(segments)
+
+    cleaned = "\n".join(lines)
+    if estimate_tokens(cleaned) <= budget:
+        kept = segments
+    else:
+        kept = pack_segments(segments, budget)
+        if not kept and cleaned:
+            # 덩어리 하나가 예산보다 큰 경우: 앞부분만이라도 보냄
+            kept = [cleaned[:budget * 2]]
+    result.text = "\n".join(kept)
+    result.segments_kept = len(kept)
+    result.tokens_out = estimate_tokens(result.text)
+
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["tokens_in"] += result.tokens_in
+        _stats["tokens_out"] += result.tokens_out
+    return result
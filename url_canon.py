@@ -0,0 +1,106 @@
+# url_canon.py
+# 링크 정규화
+# 같은 레시피가 youtu.be/X, youtube.com/watch?v=X&t=3, youtube.com/shorts/X ... 처럼 여러 모양으로 들어와도
+# 항상 같은 (플랫폼, 고유 id, 대표 주소) 키가 나오도록 정리합니다.
+# 캐시/중복 저장 확인/링크 카드/추출기 모두 이 키를 기준으로 씁니다.
+import re
+from collections import namedtuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+CanonicalURL = namedtuple("CanonicalURL", ["platform", "canonical_id", "canonical_url"])
+
+YOUTUBE_ID = r'([0-9A-Za-z_-]{11})'
+YOUTUBE_HOSTS = {"youtube.com", "m.youtube.com", "music.youtube.com", "youtube-nocookie.com"}
+YOUTUBE_PATH_RE = re.compile(r'^/(?:shorts|embed|live|v|e)/' + YOUTUBE_ID + r'(?:[/?#]|$)')
+YOUTU_BE_PATH_RE = re.compile(r'^/' + YOUTUBE_ID + r'(?:[/?#]|$)')
+YOUTUBE_ID_RE = re.compile(r'^' + YOUTUBE_ID + r'$')
+
+INSTAGRAM_HOSTS = {"instagram.com", "m.instagram.com"}
+INSTAGRAM_PATH_RE = re.compile(r'^/(?:[A-Za-z0-9_.]+/)?(?:p|reel|reels|tv)/([A-Za-z0-9_-]+)')
+
+NAVER_BLOG_HOSTS = {"blog.naver.com", "m.blog.naver.com"}
+NAVER_BLOG_PATH_RE = re.compile(r'^/([A-Za-z0-9_-]+)/(\d+)(?:[/?#]|$)')
+NAVER_BLOG_VIEW_RE = re.compile(r'^/PostView\.(?:naver|nhn)$', re.IGNORECASE)
+
+# 추적용 파라미터는 같은 글인데 주소만 달라지게 만드므로 버립니다.
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "igsh", "si", "feature", "ref", "ref_src", "from", "trackingCode"}
+
+def _split(url):
+    url = (url or "").strip()
+    if not url: return None
+    if not re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*://', url):
+        url = "https://" + url
+    parts = urlsplit(url)
+    if not parts.netloc: return None
+    host = parts.hostname or ""
+    # "hello"처럼 점 없는 글자는 주소로 보지 않음 (IPv6 주소는 ':'로 구분)
+    if "." not in host.strip(".") and ":" not in host: return None
+    parts.port   # 포트가 숫자가 아니거나 범위를 벗어나면 여기서 ValueError
+    if host.startswith("www."): host = host[4:]
+    return parts, host
+
+def _youtube(parts, host):
+    if host == "youtu.be":
+        match = YOUTU_BE_PATH_RE.match(parts.path)
+        return match.group(1) if match else None
+    if host in YOUTUBE_HOSTS:
+        query = dict(parse_qsl(parts.query))
+        if parts.path in ("/watch", "/watch/") and YOUTUBE_ID_RE.match(query.get("v", "")):
+            return query["v"]
+        match = YOUTUBE_PATH_RE.match(parts.path)
+        return match.group(1) if match else None
+    return None
+
+def _instagram(parts, host):
+    if host not in INSTAGRAM_HOSTS: return None
+    match = INSTAGRAM_PATH_RE.match(parts.path)
+    return match.group(1) if match else None
+
+def _naver_blog(parts, host):
+    if host not in NAVER_BLOG_HOSTS: return None
+    match = NAVER_BLOG_PATH_RE.match(parts.path)
+    if match:
+        return f"{match.group(1)}/{match.group(2)}"
+    if NAVER_BLOG_VIEW_RE.match(parts.path):
+        query = dict(parse_qsl(parts.query))
+        if query.get("blogId") and query.get("logNo", "").isdigit():
+            return f"{query['blogId']}/{query['logNo']}"
+    return None
+
+def _generic(parts, host):
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k not in TRACKING_PARAMS and not k.startswith("utm_"))
+    path = parts.path.rstrip("/") or "/"
+    if ":" in host: host = f"[{host}]"   # IPv6
+    netloc = host if not parts.port or parts.port in (80, 443) else f"{host}:{parts.port}"
+    return urlunsplit(("https", netloc, path, urlencode(query), ""))
+
+def canonicalize(url):
+    """CanonicalURL(platform, canonical_id, canonical_url)을 돌려줍니다. 주소가 아니면 None."""
+    try:
+        split = _split(url)
+    except ValueError:   # "a.com:abc", "a.com:99999", "http://[::1" 처럼 urllib이 못 읽는 주소
+        return None
+    if split is None: return None
+    parts, host = split
+
+    video_id = _youtube(parts, host)
+    if video_id:
+        return CanonicalURL("youtube", video_id, f"https://www.youtube.com/watch?v={video_id}")
+
+    shortcode = _instagram(parts, host)
+    if shortcode:
+        return CanonicalURL("instagram", shortcode, f"https://www.instagram.com/p/{shortcode}/")
+
+    post_id = _naver_blog(parts, host)
+    if post_id:
+        # 모바일 주소는 iframe 없이 본문이 바로 나와서 크롤링/미리보기 모두 한 번에 끝납니다.
+        return CanonicalURL("naver_blog", post_id, f"https://m.blog.naver.com/{post_id}")
+
+    canonical_url = _generic(parts, host)
+    return CanonicalURL("web", canonical_url, canonical_url)
+
+def canonical_key(url):
+    """DB 중복 확인용 문자열 키 ("youtube:abcdefghijk"). 주소가 아니면 None."""
+    canon = canonicalize(url)
+    return f"{canon.platform}:{canon.canonical_id}" if canon else None